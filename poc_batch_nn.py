@@ -1,9 +1,14 @@
+import asyncio
 import numpy as np
 import time
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
+from connect4.async_search import search_many
+from connect4.batched_search import BatchedSearch
+from connect4.eval_cache import EvaluationCache
+from connect4.evaluator import ValueOnlyEvaluator
 from connect4.mcts import MCTSTree
 
 class MockNN(nn.Module): # SAVE WORKING, yiding hou (44 minutes ago)
@@ -65,66 +70,43 @@ tree = MCTSTree(root_board, iterations=8000)
 
 print("Initializing Neural Network...")
 nn_init_start = time.time()
-nn_runner = SimpleValueNN()
+# Repeated positions are answered from the cache, only misses reach the network
+nn_runner = EvaluationCache(SimpleValueNN(), capacity=100_000)
 nn_init_time = time.time() - nn_init_start
 print(f"Neural Network initialization took {nn_init_time:.2f} seconds")
 
 start_time = time.time()
 N = 1000
-paths = []
-leaf_boards: list[np.ndarray] = []
-total_select_expand_time = 0
-total_scoring_time = 0
-
-for i in range(N):
-    if i > 0 and i % 100  == 0:
-        # Progress update every 100 iterations, skip first
-        print(f"Sequential MCTS: {i}/{N} steps completed")
-        print("Scoring NN...")
-        scoring_start = time.time()
-        predictions = nn_runner.score(leaf_boards)
-        scoring_time = time.time() - scoring_start
-        total_scoring_time += scoring_time
-        print(f"Batch scoring took {scoring_time:.2f} seconds")
-
-        # Batch backpropagate the predictions
-        for path, prediction in zip(paths, predictions):
-            tree.backpropagate(path, prediction)
-
-        # Clear the paths and boards for next batch
-        paths = []
-        leaf_boards = []
-
-    select_expand_start = time.time()
-    leaf_node, leaf_board, path = tree.select_and_expand()
-    select_expand_time = time.time() - select_expand_start
-    total_select_expand_time += select_expand_time
-
-    paths.append(path)
-    leaf_boards.append(leaf_board)
-
-# Process final batch if there are any remaining boards
-if leaf_boards:
-    print(f"Processing final batch with {len(leaf_boards)} boards...")
-    scoring_start = time.time()
-    predictions = nn_runner.score(leaf_boards)
-    scoring_time = time.time() - scoring_start
-    total_scoring_time += scoring_time
-    print(f"Final batch scoring took {scoring_time:.2f} seconds")
-
-    for path, prediction in zip(paths, predictions):
-        tree.backpropagate(path, prediction)
+BATCH_SIZE = 100
+# Leaves are selected under virtual loss, scored 100 at a time, and the
+# virtual losses are reverted when the values are backpropagated
+search = BatchedSearch(tree, ValueOnlyEvaluator(nn_runner), batch_size=BATCH_SIZE)
+
+for i in range(0, N, BATCH_SIZE):
+    print(f"Batched MCTS: {i}/{N} steps completed")
+    search.run(BATCH_SIZE)
 
 total_time = time.time() - start_time
 print("\nPerformance Summary:")
 print(f"Total time: {total_time:.2f} seconds")
-print(f"Average select/expand time: {total_select_expand_time/N:.4f} seconds")
-print(f"Total scoring time: {total_scoring_time:.2f} seconds")
-print(f"Average scoring time per batch: {total_scoring_time/(N/100):.2f} seconds")
+print(f"Average time per batch: {total_time/(N/BATCH_SIZE):.2f} seconds")
+print(f"Evaluation cache: {nn_runner.hits} hits, {nn_runner.misses} misses "
+      f"({nn_runner.hit_rate:.1%} hit rate)")
 
 print("\nTree Analysis:")
 print(tree.to_pandas().head(40))
 
+# Concurrent MCTS: many games await leaf evaluations from one batching server,
+# which calls the network once per full batch or after the latency deadline
+N_GAMES = 16
+async_start = time.time()
+trees = [MCTSTree(root_board, iterations=N) for _ in range(N_GAMES)]
+server = asyncio.run(search_many(trees, ValueOnlyEvaluator(nn_runner), N,
+                                 max_batch_size=256, max_latency=0.002))
+async_time = time.time() - async_start
+print(f"\nAsync MCTS: {N_GAMES} games x {N} steps in {async_time:.2f} seconds")
+print(f"Inference server: {server.n_batches} batches, mean batch size {server.mean_batch_size:.1f}")
+
 # Add total script time at the end
 script_total_time = time.time() - start_time
 print(f"\nTotal script execution time: {script_total_time:.2f} seconds")
\ No newline at end of file
@@ -0,0 +1,14 @@
+from connect4.opening_book import OpeningBook, build_opening_book
+import numpy as np
+import time
+
+
+DEPTH = 4
+N = 20000
+
+start = time.time()
+n_positions = build_opening_book("opening_book", depth=DEPTH, iterations=N)
+print(f"Wrote {n_positions} positions to opening_book/ in {time.time() - start:.0f} seconds")
+
+book = OpeningBook("opening_book")
+print(f"Empty board: {book.lookup(np.zeros((6, 7), dtype=int), 1)}")
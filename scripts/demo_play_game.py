@@ -1,7 +1,10 @@
 from connect4.mcts import MCTSTree
 from connect4 import board
 from connect4 import data_collector
+from connect4.dataset import ShardWriter
+from connect4.opening_book import OpeningBook
 import numpy as np
+import os
 import time
 
 
@@ -21,28 +24,46 @@ board_arr = np.array([
 is_terminal = False
 N = 2000
 player = 1
+# Opening moves come from the book written by scripts/build_opening_book.py, if any
+book = OpeningBook("opening_book") if os.path.exists("opening_book") else None
+# One tree for the whole game, the chosen subtree is kept after every move
+tree = MCTSTree(board_arr, player=player, iterations=N, book=book)
+# Training targets of every position, written once the outcome is known
+boards, players, policies, values = [], [], [], []
 while not is_terminal:
     start = time.time()
-    tree = MCTSTree(board_arr, player=player, iterations=N)
-    # Run an MCTS step. Since the board is terminal, no expansion should occur.
-    for i in range(N):
-        tree.mcts_step()
+    entry = tree.book_entry()
+    if entry is not None:
+        best_move_col = entry.move
+        print(f"Book move for player {player}: {best_move_col}")
+        value, policy = entry.value, np.eye(7)[best_move_col]
+    else:
+        for i in range(N):
+            tree.mcts_step()
 
-    best_move_col = int(tree.select_best_child())
-    print(f"Best move for player {player}: {best_move_col}")
+        best_move_col = int(tree.select_best_child())
+        print(f"Best move for player {player}: {best_move_col}")
+        print(tree.to_pandas().head(8))
+        value, policy = data_collector.convert_mcts_nodes_data_to_target(
+            tree.node_data, player_perspective=player)
+    print((value, policy))
+    boards.append(board_arr)
+    players.append(player)
+    policies.append(policy)
+    values.append(value)
 
-    legal_moves = board.get_legal_moves(board_arr)
-    row = legal_moves[best_move_col]
-
-    board_arr = board.add_move(board_arr, player=player, loc=(row, best_move_col))
-    print(tree.to_pandas().head(8))
+    tree.advance(best_move_col)
+    board_arr = tree.root_board
     board.pretty_print(board_arr)
-    is_terminal = board.check_win(board_arr)
-    print(data_collector.convert_mcts_nodes_data_to_target(
-        tree.node_data, player_perspective=player))
+    is_terminal = tree.root_state.is_terminal
     if is_terminal:
         print(f"is terminal: {is_terminal}")
     
     player = player * -1
     print(f"Time taken for MCTS step: {time.time() - start:.2f} seconds")
-    print("--------------------------------------------------")
\ No newline at end of file
+    print("--------------------------------------------------")
+
+with ShardWriter("selfplay_data") as writer:
+    writer.add_positions(np.stack(boards), players, np.stack(policies), values,
+                         tree.root_state.result)
+print(f"Wrote {len(boards)} positions to selfplay_data/")
@@ -0,0 +1,191 @@
+"""Asyncio MCTS: many searches awaiting leaf evaluations from one batching server."""
+
+import asyncio
+
+import numpy as np
+
+from connect4.mcts import VIRTUAL_LOSS
+
+
+class InferenceServer:
+    """
+    Collects single-board evaluation requests from many coroutines and scores
+    them with one evaluator call per batch.
+
+    A batch is flushed as soon as it holds max_batch_size boards, or when
+    max_latency seconds have passed since its first request arrived. The
+    evaluator is called on the event loop thread, so searches waiting on it
+    are paused while it runs.
+
+    Use it as an async context manager, which starts and stops the batching task:
+
+        async with InferenceServer(evaluator) as server:
+            value, priors = await server.evaluate(board_arr)
+    """
+
+    def __init__(self, evaluator, max_batch_size=64, max_latency=0.005):
+        """
+        Args:
+            evaluator (Evaluator): Scores batches of boards
+            max_batch_size (int): Largest number of boards per evaluator call
+            max_latency (float): Seconds a request waits for a batch to fill
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.evaluator = evaluator
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.n_batches = 0
+        self.n_requests = 0
+        self._queue = None
+        self._task = None
+
+    @property
+    def mean_batch_size(self):
+        return self.n_requests / self.n_batches if self.n_batches > 0 else 0.0
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def start(self):
+        """
+        Start the batching task on the running event loop.
+        """
+        if self._task is not None:
+            raise RuntimeError("InferenceServer is already running")
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._serve())
+
+    async def stop(self):
+        """
+        Stop the batching task. Requests still queued are cancelled.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+        self._task = None
+
+    async def evaluate(self, board_arr):
+        """
+        Score one board, waiting until its batch has been evaluated.
+
+        Args:
+            board_arr (np.ndarray): Board to score, not modified afterwards by the caller
+
+        Returns:
+            tuple: (value, priors) with the probability that player 1 wins and
+                the (7,) move probabilities
+        """
+        if self._task is None:
+            raise RuntimeError("InferenceServer is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((board_arr, future))
+        return await future
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        batch = [(board_arr, future) for board_arr, future in batch if not future.cancelled()]
+        if not batch:
+            return
+        boards = np.stack([board_arr for board_arr, _ in batch])
+        try:
+            values, priors = self.evaluator.score(boards)
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        self.n_batches += 1
+        self.n_requests += len(batch)
+        for i, (_, future) in enumerate(batch):
+            future.set_result((float(values[i]), priors[i]))
+
+
+async def search_async(tree, server, iterations, max_pending=8, virtual_loss=VIRTUAL_LOSS):
+    """
+    Run 'iterations' MCTS iterations on a tree, with up to max_pending leaves
+    waiting on the server at once.
+
+    Pending paths carry a virtual loss so concurrent selections spread over
+    different leaves. Tree updates happen between awaits, so the searches of
+    one tree never interleave inside a selection or a backpropagation.
+    Leaves with an exact value (proven nodes, finished games and the endgames
+    solved by the tree's solver) skip the server, as in BatchedSearch.
+
+    Args:
+        tree (MCTSTree): Tree to search
+        server (InferenceServer): Running server scoring the leaves
+        iterations (int): Number of leaves to select, evaluate and backpropagate
+        max_pending (int): Leaves of this tree awaiting evaluation at once
+        virtual_loss (float): Wins removed from each node of a pending path
+    """
+    if tree.book_entry() is not None:
+        # The book answers, select_best_child plays its move
+        return
+    remaining = iterations
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            leaf_node, leaf_board, path, value = tree.select_and_expand(virtual_loss)
+            priors = None
+            try:
+                # Leaves with an exact value, see MCTSTree.leaf_value, are not
+                # sent to the server
+                if value is None:
+                    value, priors = await server.evaluate(leaf_board)
+            finally:
+                # A failed evaluation must not leave the path penalized
+                tree.revert_virtual_loss(path, virtual_loss)
+            if priors is not None:
+                tree.set_priors(leaf_node, priors)
+            tree.backpropagate(path, value)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(max_pending, iterations)))))
+
+
+async def search_many(trees, evaluator, iterations, max_batch_size=64, max_latency=0.005,
+                      max_pending=8):
+    """
+    Search several trees concurrently, sharing one InferenceServer.
+
+    Args:
+        trees (list[MCTSTree]): Trees to search, e.g. one per ongoing game
+        evaluator (Evaluator): Scores batches of leaf boards
+        iterations (int): Iterations per tree
+        max_batch_size (int): Largest number of boards per evaluator call
+        max_latency (float): Seconds a request waits for a batch to fill
+        max_pending (int): Leaves of each tree awaiting evaluation at once
+
+    Returns:
+        InferenceServer: The stopped server, for its batching statistics
+    """
+    async with InferenceServer(evaluator, max_batch_size, max_latency) as server:
+        await asyncio.gather(*(search_async(tree, server, iterations, max_pending)
+                               for tree in trees))
+    return server
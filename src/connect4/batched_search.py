@@ -0,0 +1,82 @@
+"""Batched MCTS driven by an Evaluator, with virtual loss between evaluations."""
+
+import numpy as np
+
+from connect4.mcts import VIRTUAL_LOSS
+
+
+class BatchedSearch:
+    """
+    Runs MCTS iterations on a tree in batches: select and expand up to
+    batch_size leaves under virtual loss, score them with one evaluator call,
+    then revert the virtual losses and backpropagate the values. The
+    evaluator's priors are stored on the children of each scored leaf.
+
+    Leaves with an exact value are not sent to the evaluator: proven nodes,
+    finished games and the endgames solved by the tree's solver, whose proofs
+    are recorded as in MCTSTree.mcts_step.
+    """
+
+    def __init__(self, tree, evaluator, batch_size=32, virtual_loss=VIRTUAL_LOSS):
+        """
+        Args:
+            tree (MCTSTree): Tree to search
+            evaluator (Evaluator): Scores batches of leaf boards
+            batch_size (int): Number of leaves per evaluator call
+            virtual_loss (float): Wins removed from each node of a pending path
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.tree = tree
+        self.evaluator = evaluator
+        self.batch_size = batch_size
+        self.virtual_loss = virtual_loss
+
+    def run(self, iterations):
+        """
+        Run 'iterations' MCTS iterations. Nothing is searched if the root is
+        in the tree's opening book, select_best_child plays the book move.
+
+        Args:
+            iterations (int): Number of leaves to select, evaluate and backpropagate
+        """
+        if self.tree.book_entry() is not None:
+            return
+        while iterations > 0:
+            n_leaves = min(self.batch_size, iterations)
+            self.run_batch(n_leaves)
+            iterations -= n_leaves
+
+    def run_batch(self, n_leaves):
+        """
+        Select, evaluate and backpropagate one batch of leaves.
+
+        Args:
+            n_leaves (int): Number of leaves in the batch
+
+        Returns:
+            tuple: (leaf_nodes, leaf_boards, values) for the batch, values are
+                the probability that player 1 wins
+        """
+        leaf_nodes, leaf_boards, paths, values = [], [], [], []
+        for _ in range(n_leaves):
+            leaf_node, leaf_board, path, value = self.tree.select_and_expand(self.virtual_loss)
+            leaf_nodes.append(leaf_node)
+            leaf_boards.append(leaf_board)
+            paths.append(path)
+            values.append(value)
+
+        # Leaves with an exact value, see MCTSTree.leaf_value, skip the evaluator
+        leaf_boards = np.stack(leaf_boards)
+        pending = np.array([value is None for value in values])
+        values = np.array([0.0 if value is None else value for value in values])
+        if np.any(pending):
+            scored_values, priors = self.evaluator.score(leaf_boards[pending])
+            values[pending] = scored_values
+            for i, leaf_priors in zip(np.flatnonzero(pending), priors):
+                self.tree.set_priors(leaf_nodes[i], leaf_priors)
+
+        for path, value in zip(paths, values):
+            self.tree.revert_virtual_loss(path, self.virtual_loss)
+            self.tree.backpropagate(path, value)
+        return leaf_nodes, leaf_boards, values
@@ -0,0 +1,266 @@
+"""Bitboard representation of Connect 4 boards.
+
+Each player's stones are stored as a bit mask over a 7 x (6 + 1) grid:
+column ``c`` owns bits ``c * 7`` to ``c * 7 + 6`` with row 0 at the bottom.
+The extra top bit of every column is always empty, so shifting a mask never
+carries a line from one column into the next.
+
+The functions mirror the API of ``connect4.board`` but take a ``BitBoard``
+instead of a NumPy array. Locations are still given in array coordinates
+(row 0 is the top row), so legal moves and results are interchangeable with
+the ones produced by ``connect4.board``.
+"""
+
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+HEIGHT = 6
+WIDTH = 7
+H1 = HEIGHT + 1  # bits per column, including the sentinel bit
+
+# Shifts for vertical, horizontal and the two diagonal directions
+DIRECTIONS = (1, H1, H1 - 1, H1 + 1)
+
+BOTTOM_MASK = sum(1 << (col * H1) for col in range(WIDTH))
+BOARD_MASK = BOTTOM_MASK * ((1 << HEIGHT) - 1)
+
+
+class BitBoard(NamedTuple):
+    """
+    Immutable bitboard position.
+
+    Attributes:
+        x_mask (int): Bits occupied by player 1 (X).
+        o_mask (int): Bits occupied by player 2 (O).
+        heights (Tuple[int, ...]): Number of stones in each column.
+    """
+    x_mask: int
+    o_mask: int
+    heights: Tuple[int, ...]
+
+
+def cell_bit(row: int, col: int) -> int:
+    """
+    Returns the bit for an array-coordinate cell (row 0 is the top row).
+    """
+    return 1 << (col * H1 + HEIGHT - 1 - row)
+
+
+def from_array(board_arr: np.ndarray) -> BitBoard:
+    """
+    Converts a 6 x 7 NumPy board into a BitBoard.
+
+    Args:
+        board_arr (np.ndarray): Board with 1 for X, -1 for O and 0 for empty.
+
+    Returns:
+        BitBoard: The equivalent bitboard position.
+    """
+    x_mask = 0
+    o_mask = 0
+    for row, col in zip(*np.nonzero(board_arr)):
+        if board_arr[row, col] == 1:
+            x_mask |= cell_bit(row, col)
+        else:
+            o_mask |= cell_bit(row, col)
+    heights = tuple(int(h) for h in np.count_nonzero(board_arr, axis=0))
+    return BitBoard(x_mask, o_mask, heights)
+
+
+def to_array(bb: BitBoard) -> np.ndarray:
+    """
+    Converts a BitBoard back into a 6 x 7 NumPy board.
+
+    Args:
+        bb (BitBoard): The bitboard position.
+
+    Returns:
+        np.ndarray: Board with 1 for X, -1 for O and 0 for empty.
+    """
+    board_arr = np.zeros((HEIGHT, WIDTH), dtype=int)
+    for row in range(HEIGHT):
+        for col in range(WIDTH):
+            bit = cell_bit(row, col)
+            if bb.x_mask & bit:
+                board_arr[row, col] = 1
+            elif bb.o_mask & bit:
+                board_arr[row, col] = -1
+    return board_arr
+
+
+def has_won(mask: int) -> bool:
+    """
+    Checks whether a single player's mask contains four in a row.
+
+    Args:
+        mask (int): Bits occupied by one player.
+
+    Returns:
+        bool: True if any line of four is set, False otherwise.
+    """
+    for shift in DIRECTIONS:
+        pairs = mask & (mask >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+def check_win(bb: BitBoard) -> bool:
+    """
+    Checks if either player has four in a row.
+
+    Args:
+        bb (BitBoard): The bitboard position.
+
+    Returns:
+        bool: True if there is a winning condition, False otherwise.
+    """
+    return has_won(bb.x_mask) or has_won(bb.o_mask)
+
+
+def check_incremental_win(bb: BitBoard, row: int, col: int, player: int) -> bool:
+    """
+    Checks if 'player' has a line of four passing through (row, col).
+
+    Args:
+        bb (BitBoard): The bitboard position.
+        row (int): Row index of the last move.
+        col (int): Column index of the last move.
+        player (int): The player value (1 for X, -1 for O).
+
+    Returns:
+        bool: True if the last move resulted in a win, False otherwise.
+    """
+    mask = bb.x_mask if player == 1 else bb.o_mask
+    return has_won_at(mask, cell_bit(row, col))
+
+
+def has_won_at(mask: int, bit: int) -> bool:
+    """
+    Checks whether a single player's mask has a line of four through 'bit'.
+
+    Args:
+        mask (int): Bits occupied by one player.
+        bit (int): The bit of the last move.
+
+    Returns:
+        bool: True if a line of four covers the bit, False otherwise.
+    """
+    for shift in DIRECTIONS:
+        pairs = mask & (mask >> shift)
+        starts = pairs & (pairs >> (2 * shift))
+        # A line starting at bit b covers b, b + s, b + 2s and b + 3s
+        covered = starts | (starts << shift) | (starts << (2 * shift)) | (starts << (3 * shift))
+        if covered & bit:
+            return True
+    return False
+
+
+def position_key(x_mask: int, o_mask: int) -> int:
+    """
+    Returns a unique integer key for a position, below 2**49.
+
+    In each column the occupied mask is 2**h - 1 for a column of height h, and
+    adding the X stones gives a number in [2**h - 1, 2**(h + 1) - 2]. These
+    ranges do not overlap, so the column contents can be recovered from the sum.
+
+    Args:
+        x_mask (int): Bits occupied by player 1 (X).
+        o_mask (int): Bits occupied by player 2 (O).
+
+    Returns:
+        int: The position key.
+    """
+    return x_mask + (x_mask | o_mask)
+
+
+def get_legal_moves(bb: BitBoard) -> dict[int, int]:
+    """
+    Returns a dictionary of legal moves, mapping column to landing row.
+    A won position has no legal moves.
+
+    Args:
+        bb (BitBoard): The bitboard position.
+
+    Returns:
+        dict[int, int]: A dictionary of legal moves. Empty if no moves are available.
+    """
+    if check_win(bb):
+        return {}
+    return {col: HEIGHT - 1 - h for col, h in enumerate(bb.heights) if h < HEIGHT}
+
+
+def add_move(bb: BitBoard, player: int, loc: Tuple[int, int]) -> BitBoard:
+    """
+    Adds a move to the position at the specified location.
+
+    Args:
+        bb (BitBoard): The bitboard position.
+        player (int): The player making the move (1 for player 1, -1 for player 2).
+        loc (Tuple[int, int]): The (row, col) position for the move.
+
+    Returns:
+        BitBoard: A new position with the move added.
+    """
+    row, col = loc
+    bit = cell_bit(row, col)
+    heights = bb.heights[:col] + (HEIGHT - row,) + bb.heights[col + 1:]
+    if player == 1:
+        return BitBoard(bb.x_mask | bit, bb.o_mask, heights)
+    return BitBoard(bb.x_mask, bb.o_mask | bit, heights)
+
+
+def is_full(bb: BitBoard) -> bool:
+    return (bb.x_mask | bb.o_mask) == BOARD_MASK
+
+
+def check_board_state(bb: BitBoard) -> Tuple[bool, int]:
+    """
+    Checks the state of the position.
+
+    Args:
+        bb (BitBoard): The bitboard position.
+
+    Returns:
+        is_terminal (bool): True if the game is over (win or draw), False otherwise.
+        result (int): 1 if player 1 wins, -1 if player 2 wins, 0 if draw, None if ongoing.
+    """
+    if has_won(bb.x_mask):
+        return True, 1
+    elif has_won(bb.o_mask):
+        return True, -1
+    elif is_full(bb):
+        return True, 0
+    else:
+        return False, None
+
+
+def check_board_state_incremental(bb: BitBoard, row: int, col: int, player: int) -> Tuple[bool, int]:
+    """
+    Checks the state of the position after 'player' played at (row, col).
+
+    Args:
+        bb (BitBoard): The bitboard position.
+        row (int): The row index of the last move.
+        col (int): The column index of the last move.
+        player (int): The player who made the last move (1 for player 1, -1 for player 2).
+
+    Returns:
+        is_terminal (bool): True if the game is over (win or draw), False otherwise.
+        result (int): 1 if player 1 wins, -1 if player 2 wins, 0 if draw, None if ongoing.
+    """
+    if check_incremental_win(bb, row, col, player):
+        return True, player
+    elif is_full(bb):
+        return True, 0
+    else:
+        return False, None
+
+
+def pretty_print(bb: BitBoard):
+    """
+    prints the position in the same format as board.pretty_print
+    """
+    from connect4 import board
+    board.pretty_print(to_array(bb))
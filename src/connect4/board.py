@@ -2,6 +2,8 @@
 import numpy as np
 from typing import Tuple
 
+from connect4 import bitboard
+
 
 def check_valid_board(board_arr: np.ndarray) -> bool:
     """
@@ -116,17 +118,124 @@ def check_incremental_win(board_arr: np.ndarray, row: int, col: int, player: int
         return True
     
     #get a slice of the diagonal (bottom-left to top-right)
-    diag_slice = np.diagonal(np.fliplr(board_arr), offset=col + row - (board_arr.shape[1] - 1))
+    diag_slice = np.diagonal(np.fliplr(board_arr), offset=(board_arr.shape[1] - 1) - col - row)
     if len(diag_slice) >= 4 and np.any(np.convolve(diag_slice, np.ones(4, dtype=int), 'valid') == 4 * player):
         return True
     
     return False  # No win found in the local region
 
 
-def get_legal_moves(board_arr: np.ndarray) -> dict[int, int]: #TODO no legal moves if terminal state
+def _build_win_lines() -> np.ndarray:
+    """
+    Enumerates every line of four cells on a 6 x 7 board as flat cell indices
+    (row * 7 + col).
+    """
+    lines = []
+    for row in range(6):
+        for col in range(7):
+            for d_row, d_col in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                cells = [(row + i * d_row, col + i * d_col) for i in range(4)]
+                if all(0 <= r < 6 and 0 <= c < 7 for r, c in cells):
+                    lines.append([r * 7 + c for r, c in cells])
+    return np.array(lines)
+
+
+def _build_cell_lines(win_lines: np.ndarray) -> np.ndarray:
+    """
+    For each flat cell index, lists the indices of the lines passing through it.
+    Rows are padded by repeating their first line so the result is rectangular.
+    """
+    per_cell = [np.flatnonzero((win_lines == cell).any(axis=1)) for cell in range(42)]
+    width = max(len(lines) for lines in per_cell)
+    return np.array([np.pad(lines, (0, width - len(lines)), mode="edge") for lines in per_cell])
+
+
+WIN_LINES = _build_win_lines()  # (69, 4) flat cell indices of every line of four
+CELL_LINES = _build_cell_lines(WIN_LINES)  # (42, 16) line indices through each cell
+
+
+def _has_four_batch(mask: np.ndarray) -> np.ndarray:
+    """
+    Checks a (N, 6, 7) boolean stack for four set cells in a row by AND-ing
+    shifted views of the stack in each direction.
+
+    Returns:
+        np.ndarray: (N,) boolean array.
+    """
+    horizontal = mask[:, :, :-3] & mask[:, :, 1:-2] & mask[:, :, 2:-1] & mask[:, :, 3:]
+    vertical = mask[:, :-3, :] & mask[:, 1:-2, :] & mask[:, 2:-1, :] & mask[:, 3:, :]
+    diagonal = mask[:, :-3, :-3] & mask[:, 1:-2, 1:-2] & mask[:, 2:-1, 2:-1] & mask[:, 3:, 3:]
+    anti_diagonal = mask[:, 3:, :-3] & mask[:, 2:-1, 1:-2] & mask[:, 1:-2, 2:-1] & mask[:, :-3, 3:]
+    return (horizontal.any(axis=(1, 2)) | vertical.any(axis=(1, 2))
+            | diagonal.any(axis=(1, 2)) | anti_diagonal.any(axis=(1, 2)))
+
+
+def check_win_batch(boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batched check_win over a stack of boards.
+
+    Args:
+        boards (np.ndarray): (N, 6, 7) stack of boards.
+
+    Returns:
+        has_win (np.ndarray): (N,) boolean array, True where either player has four in a row.
+        winner (np.ndarray): (N,) int8 array, 1 or -1 for the player with a line, 0 otherwise.
+    """
+    boards = np.asarray(boards)
+    x_won = _has_four_batch(boards == 1)
+    o_won = _has_four_batch(boards == -1)
+    winner = np.zeros(len(boards), dtype=np.int8)
+    winner[o_won] = -1
+    winner[x_won] = 1
+    return x_won | o_won, winner
+
+
+def check_board_state_batch(boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batched check_board_state over a stack of boards.
+
+    Args:
+        boards (np.ndarray): (N, 6, 7) stack of boards.
+
+    Returns:
+        is_terminal (np.ndarray): (N,) boolean array, True where the game is over (win or draw).
+        result (np.ndarray): (N,) int8 array, 1 if player 1 wins, -1 if player 2 wins,
+            0 for draws and ongoing games (use is_terminal to tell them apart).
+    """
+    boards = np.asarray(boards)
+    has_win, winner = check_win_batch(boards)
+    is_full = np.all(boards != 0, axis=(1, 2))
+    return has_win | is_full, winner
+
+
+def check_incremental_win_batch(boards: np.ndarray, rows: np.ndarray, cols: np.ndarray,
+                                players: np.ndarray) -> np.ndarray:
+    """
+    Batched check_incremental_win: for each board, checks whether the last move
+    by players[i] at (rows[i], cols[i]) completed a line of four.
+
+    Args:
+        boards (np.ndarray): (N, 6, 7) stack of boards.
+        rows (np.ndarray): (N,) row indices of the last moves.
+        cols (np.ndarray): (N,) column indices of the last moves.
+        players (np.ndarray): (N,) player values (1 for X, -1 for O).
+
+    Returns:
+        np.ndarray: (N,) boolean array, True where the last move won.
+    """
+    n_boards = len(boards)
+    flat = boards.reshape(n_boards, 42)
+    cells = np.asarray(rows) * 7 + np.asarray(cols)
+    lines = WIN_LINES[CELL_LINES[cells]].reshape(n_boards, -1)
+    line_sums = np.take_along_axis(flat, lines, axis=1).reshape(n_boards, -1, 4).sum(axis=2)
+    return np.any(line_sums == 4 * np.asarray(players)[:, None], axis=1)
+
+
+def get_legal_moves(board_arr: np.ndarray) -> dict[int, int]:
     """
     Returns a dictionary of legal moves for a Connect 4 board.
     The key is the column index, and the value is the row index of the next available spot.
+    A won position has no legal moves.
 
     Args:
         board_arr (np.ndarray): The input board state.
@@ -135,6 +244,8 @@ def get_legal_moves(board_arr: np.ndarray) -> dict[int, int]: #TODO no legal mov
         dict[int, int]: A dictionary of legal moves. Empty if no moves are available.
   
     """
+    if check_win(board_arr):
+        return {}
     # Find the first empty row in each column
     legal_moves = {}
     for col in range(7):
@@ -161,6 +272,19 @@ def add_move(board_arr, player: int, loc: Tuple[int, int]) -> None:
     new_board[row, col] = player
     return new_board
 
+def get_column_heights(board_arr: np.ndarray) -> list[int]:
+    """
+    Returns the number of pieces in each column of a valid board.
+    """
+    return [int(h) for h in np.count_nonzero(board_arr, axis=0)]
+
+def legal_moves_from_heights(heights) -> dict[int, int]:
+    """
+    Returns the same dictionary as get_legal_moves for a position that is not
+    won, computed from column heights instead of scanning the board.
+    """
+    return {col: 5 - h for col, h in enumerate(heights) if h < 6}
+
 def is_full(board_arr: np.ndarray) -> bool:
     return np.sum(board_arr == 0) == 0  # no empty spots left
 
@@ -210,4 +334,242 @@ def pretty_print(board_state: np.ndarray):
     """
     int_to_char = {1: 'X', -1: '0', 0: '.'}
     for row in board_state:
-        print(' '.join([int_to_char[cell] for cell in row]))
\ No newline at end of file
+        print(' '.join([int_to_char[cell] for cell in row]))
+
+
+# Zobrist keys: one random 64-bit value per (player, row, col), player 0 is X and 1 is O.
+# Seeded so hashes are stable across processes and can be stored on disk.
+ZOBRIST = np.random.default_rng(0x5EEDC4).integers(0, 2**64, size=(2, 6, 7), dtype=np.uint64)
+ZOBRIST_MIRROR = ZOBRIST[:, :, ::-1]  # key of the left-right mirrored cell
+_ZOBRIST = ZOBRIST.tolist()
+_ZOBRIST_MIRROR = ZOBRIST_MIRROR.tolist()
+
+
+def zobrist_hash_batch(boards: np.ndarray, mirror: bool = False) -> np.ndarray:
+    """
+    Computes the Zobrist hash of every board in a stack.
+
+    Args:
+        boards (np.ndarray): (N, 6, 7) stack of boards.
+        mirror (bool): Hash the left-right mirrored boards instead.
+
+    Returns:
+        np.ndarray: (N,) uint64 hashes.
+    """
+    boards = np.asarray(boards)
+    table = ZOBRIST_MIRROR if mirror else ZOBRIST
+    zero = np.uint64(0)
+    keys = np.where(boards == 1, table[0], zero) ^ np.where(boards == -1, table[1], zero)
+    return np.bitwise_xor.reduce(keys.reshape(len(boards), -1), axis=1)
+
+
+def canonical_hash_batch(boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes a hash that is equal for a board and its left-right mirror image.
+
+    Args:
+        boards (np.ndarray): (N, 6, 7) stack of boards.
+
+    Returns:
+        hashes (np.ndarray): (N,) uint64 canonical hashes, the smaller of the
+            board's hash and its mirror's hash.
+        mirrored (np.ndarray): (N,) boolean array, True where the canonical
+            hash is the mirror's, i.e. the canonical orientation is the mirrored board.
+    """
+    hashes = zobrist_hash_batch(boards)
+    mirror_hashes = zobrist_hash_batch(boards, mirror=True)
+    mirrored = mirror_hashes < hashes
+    return np.where(mirrored, mirror_hashes, hashes), mirrored
+
+
+def zobrist_hash(board_arr: np.ndarray) -> int:
+    """
+    Returns the 64-bit Zobrist hash of a board, see zobrist_hash_batch.
+    """
+    return int(zobrist_hash_batch(np.asarray(board_arr)[None])[0])
+
+
+def canonical_hash(board_arr: np.ndarray) -> int:
+    """
+    Returns the mirror-invariant hash of a board, see canonical_hash_batch.
+    """
+    return int(canonical_hash_batch(np.asarray(board_arr)[None])[0][0])
+
+
+class GameState:
+    """
+    A mutable game position: the board together with its column heights, side
+    to move, outcome and the stack of moves played on it. Legal moves and
+    landing rows come from the heights, and wins are detected on bitboards, so
+    play and undo are O(1) and never copy the board.
+
+    Attributes:
+        board (np.ndarray): 6 x 7 board with 1 for X, -1 for O and 0 for empty.
+        heights (list[int]): Number of pieces in each column.
+        player (int): The player to move (1 for player 1, -1 for player 2).
+        is_terminal (bool): True if the game is over (win or draw).
+        result (int): 1 if player 1 wins, -1 if player 2 wins, 0 if draw, None if ongoing.
+        moves (list[int]): Columns played since the state was created, oldest first.
+        hash (int): Zobrist hash of the board, updated on every play and undo.
+        mirror_hash (int): Zobrist hash of the left-right mirrored board.
+    """
+
+    def __init__(self, board_arr: np.ndarray, player: int, heights: list[int],
+                 x_mask: int, o_mask: int, is_terminal: bool = False, result: int = None,
+                 hash: int = None, mirror_hash: int = None):
+        self.board = board_arr
+        self.player = player
+        self.heights = heights
+        self.x_mask = x_mask
+        self.o_mask = o_mask
+        self.n_pieces = sum(heights)
+        self.is_terminal = is_terminal
+        self.result = result
+        self.moves = []
+        if hash is not None:
+            # Known hashes, e.g. from copy, skip the O(pieces) rebuild
+            self.hash = hash
+            self.mirror_hash = mirror_hash
+            return
+        self.hash = 0
+        self.mirror_hash = 0
+        for row, col in zip(*np.nonzero(board_arr)):
+            piece = 0 if board_arr[row, col] == 1 else 1
+            self.hash ^= _ZOBRIST[piece][row][col]
+            self.mirror_hash ^= _ZOBRIST_MIRROR[piece][row][col]
+
+    @classmethod
+    def from_array(cls, board_arr: np.ndarray, player: int = None) -> "GameState":
+        """
+        Builds a state from a board array.
+
+        Args:
+            board_arr (np.ndarray): The board, copied into the state.
+            player (int): The player to move. Inferred from the piece count if None.
+
+        Returns:
+            GameState: The state for the board.
+        """
+        if player is None:
+            player = 1 if np.sum(board_arr) == 0 else -1
+        position = bitboard.from_array(board_arr)
+        is_terminal, result = bitboard.check_board_state(position)
+        return cls(np.array(board_arr, copy=True), player, list(position.heights),
+                   position.x_mask, position.o_mask, is_terminal, result)
+
+    def copy(self) -> "GameState":
+        """
+        Returns an independent copy of the state, including its move stack.
+        """
+        state = GameState(self.board.copy(), self.player, self.heights.copy(),
+                          self.x_mask, self.o_mask, self.is_terminal, self.result,
+                          self.hash, self.mirror_hash)
+        state.moves = self.moves.copy()
+        return state
+
+    def canonical_hash(self) -> int:
+        """
+        Returns a hash shared by the position and its left-right mirror image.
+        """
+        return min(self.hash, self.mirror_hash)
+
+    def is_mirrored(self) -> bool:
+        """
+        Returns True if the canonical orientation of the position is its mirror
+        image, i.e. canonical_hash() is the mirror's hash.
+        """
+        return self.mirror_hash < self.hash
+
+    def key(self) -> int:
+        """
+        Returns a unique integer key for the position, see bitboard.position_key.
+        """
+        return bitboard.position_key(self.x_mask, self.o_mask)
+
+    def legal_moves(self) -> dict[int, int]:
+        """
+        Returns a dictionary of legal moves, mapping column to landing row.
+        Empty if the game is over.
+        """
+        if self.is_terminal:
+            return {}
+        return legal_moves_from_heights(self.heights)
+
+    def landing_row(self, col: int) -> int:
+        """
+        Returns the row a piece dropped in 'col' lands on.
+        """
+        return 5 - self.heights[col]
+
+    def play(self, col: int) -> None:
+        """
+        Plays the player to move in 'col', in place, and hands the move to the opponent.
+
+        Args:
+            col (int): Column to play, must be a legal move.
+        """
+        player = self.player
+        row = 5 - self.heights[col]
+        self.board[row, col] = player
+        self.heights[col] += 1
+        self.n_pieces += 1
+        self.moves.append(col)
+
+        piece = 0 if player == 1 else 1
+        self.hash ^= _ZOBRIST[piece][row][col]
+        self.mirror_hash ^= _ZOBRIST_MIRROR[piece][row][col]
+
+        bit = bitboard.cell_bit(row, col)
+        if player == 1:
+            self.x_mask |= bit
+            mask = self.x_mask
+        else:
+            self.o_mask |= bit
+            mask = self.o_mask
+
+        if bitboard.has_won_at(mask, bit):
+            self.is_terminal, self.result = True, player
+        elif self.n_pieces == 42:
+            self.is_terminal, self.result = True, 0
+        self.player = -player
+
+    def undo(self) -> int:
+        """
+        Takes back the last move played on this state, in place.
+
+        Returns:
+            int: The column of the move taken back.
+        """
+        col = self.moves.pop()
+        self.heights[col] -= 1
+        self.n_pieces -= 1
+        row = 5 - self.heights[col]
+        self.board[row, col] = 0
+        self.player = -self.player
+
+        piece = 0 if self.player == 1 else 1
+        self.hash ^= _ZOBRIST[piece][row][col]
+        self.mirror_hash ^= _ZOBRIST_MIRROR[piece][row][col]
+
+        bit = bitboard.cell_bit(row, col)
+        if self.player == 1:
+            self.x_mask ^= bit
+        else:
+            self.o_mask ^= bit
+        # A move was played from the previous position, so it was not terminal
+        self.is_terminal, self.result = False, None
+        return col
+
+    def add_move(self, col: int) -> "GameState":
+        """
+        Plays the player to move in 'col' on a copy of the state.
+
+        Args:
+            col (int): Column to play, must be a legal move.
+
+        Returns:
+            GameState: A new state with the move added, the opponent to move.
+        """
+        state = self.copy()
+        state.play(col)
+        return state
@@ -1,33 +1,183 @@
 import numpy as np
+from connect4 import board
 import connect4.mcts as mcts
+from connect4.node_store import NodeDataView
 
 
 def convert_mcts_nodes_data_to_target(nodes_data, player_perspective):
     """
     Convert MCTS nodes data to target format for training.
     Args:
-        nodes_data (numpy.ndarray): The MCTS nodes data.
+        nodes_data (NodeDataView | numpy.ndarray): The MCTS nodes data, e.g.
+            MCTSTree.node_data or a stacked (n, 6) table.
 
     Returns:
         (value, policy): Tuple containing:
             - value (float): The value of the board state.
             - policy (numpy.ndarray): The policy vector for the actions.
     """
+    if isinstance(nodes_data, NodeDataView):
+        # Read the root and its children straight from the node store
+        store = nodes_data.store
+        value = _root_win_rate(store)
+        actions, visits = _root_child_visits(store)
+    else:
+        nodes_data = np.asarray(nodes_data)
+        root_visits = nodes_data[0, mcts.N_VISITS_COL]
+        root_wins = nodes_data[0, mcts.WINS_COL]
+        root_children = nodes_data[:, mcts.PARENT_COL] == 0
+        actions = nodes_data[root_children, mcts.ACTION_COL].astype(np.int64)
+        visits = nodes_data[root_children, mcts.N_VISITS_COL]
+        value = float(root_wins / root_visits) if root_visits > 0 else 0
 
-    root_node = nodes_data[0]
-    value = (root_node[mcts.WINS_COL] / root_node[mcts.N_VISITS_COL]
-             if root_node[mcts.N_VISITS_COL] > 0 else 0)
     # root is always from player perspective, but in training we will keep it from p1 perspective
     # this way the model learns to predict the outcome from the perspective of player 1
     if player_perspective == 1:
         value = 1-value
 
-    policy = np.zeros(7)
-    for col in range(7):
-        child_key = col
-        child_node = nodes_data[nodes_data[:, mcts.ACTION_COL] == child_key]
-        if child_node.size > 0:
-            policy[col] = child_node[0, mcts.N_VISITS_COL]
-
+    policy = np.bincount(actions, weights=visits, minlength=7).astype(float)
     policy /= policy.sum() if policy.sum() > 0 else 1
-    return value, policy
\ No newline at end of file
+    return value, policy
+
+
+def convert_trees_to_targets(trees):
+    """
+    Batch version of convert_mcts_nodes_data_to_target for searched trees,
+    each seen from the perspective of its player to move. Proven roots and
+    children are handled as in _root_win_rate and _root_child_visits.
+
+    Every tree has its own node store, so the root fields and the contiguous
+    root-child block are still read with one slice per tree. The child rows,
+    the proof overrides and the policy scatter-add then run once over the
+    children of all roots, using offsets built from the n_children counts.
+
+    Args:
+        trees (list[MCTSTree]): Searched trees
+
+    Returns:
+        (values, policies): Tuple containing:
+            - values (numpy.ndarray): (N,) values of the root positions.
+            - policies (numpy.ndarray): (N, 7) policy vectors.
+    """
+    n_trees = len(trees)
+    if n_trees == 0:
+        return np.zeros(0), np.zeros((0, 7))
+    players = np.array([tree.player for tree in trees], dtype=np.int8)
+    root_visits, root_wins, root_proven = np.array(
+        [(tree.nodes.visits[0], tree.nodes.wins[0], tree.nodes.proven[0]) for tree in trees],
+        dtype=float).T
+    blocks = [_root_children(tree.nodes) for tree in trees]
+    actions, visits, proven = (np.concatenate(field) for field in zip(*blocks))
+    counts = np.array([len(block[0]) for block in blocks])
+
+    # Row of every child, and its index among the children of that root
+    rows = np.repeat(np.arange(n_trees), counts)
+    index = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    # A proven win takes all the weight, proven losses get none unless every move loses
+    wins = proven == 1
+    first_win = np.full(n_trees, 7)
+    np.minimum.at(first_win, rows[wins], index[wins])
+    has_win = first_win < 7
+    all_lose = np.bincount(rows, weights=proven == -1, minlength=n_trees) == counts
+    visits = np.where(has_win[rows], index == first_win[rows], visits)
+    visits[(proven == -1) & ~has_win[rows] & ~all_lose[rows]] = 0
+
+    values = np.where(root_proven != 0, root_proven == 1,
+                      root_wins / np.where(root_visits > 0, root_visits, 1))
+    values = np.where(players == 1, 1 - values, values)
+
+    # One scatter-add over the children of all roots
+    policies = np.bincount(rows * 7 + actions, weights=visits,
+                           minlength=n_trees * 7).reshape(n_trees, 7).astype(float)
+    totals = policies.sum(axis=1, keepdims=True)
+    policies /= np.where(totals > 0, totals, 1)
+    return values, policies
+
+
+def augment_with_mirrors(boards, policies, values):
+    """
+    Double a batch of training targets with the left-right mirror image of
+    every position. Mirroring a board reverses its policy and keeps its value.
+
+    Args:
+        boards (numpy.ndarray): (N, 6, 7) positions.
+        policies (numpy.ndarray): (N, 7) policy targets.
+        values (numpy.ndarray): (N,) value targets.
+
+    Returns:
+        (boards, policies, values): The N originals followed by their N mirrors.
+    """
+    boards, policies, values = np.asarray(boards), np.asarray(policies), np.asarray(values)
+    return (np.concatenate([boards, boards[:, :, ::-1]]),
+            np.concatenate([policies, policies[:, ::-1]]),
+            np.concatenate([values, values]))
+
+
+def deduplicate_targets(boards, policies, values):
+    """
+    Merge the targets of positions that are equal up to mirroring, averaging
+    their values and policies. Positions are keyed by board.canonical_hash_batch
+    and returned in their canonical orientation.
+
+    Args:
+        boards (numpy.ndarray): (N, 6, 7) positions.
+        policies (numpy.ndarray): (N, 7) policy targets.
+        values (numpy.ndarray): (N,) value targets.
+
+    Returns:
+        (boards, policies, values, counts): One row per distinct position, with
+        the number of input rows merged into it.
+    """
+    boards, policies, values = np.asarray(boards), np.asarray(policies), np.asarray(values)
+    hashes, mirrored = board.canonical_hash_batch(boards)
+    # Bring every row into the canonical orientation before averaging
+    boards = np.where(mirrored[:, None, None], boards[:, :, ::-1], boards)
+    policies = np.where(mirrored[:, None], policies[:, ::-1], policies)
+
+    _, first, inverse, counts = np.unique(hashes, return_index=True, return_inverse=True,
+                                          return_counts=True)
+    n_unique = len(first)
+    merged_values = np.bincount(inverse, weights=values, minlength=n_unique) / counts
+    n_cols = policies.shape[1]
+    flat = (inverse[:, None] * n_cols + np.arange(n_cols)).ravel()
+    merged_policies = np.bincount(flat, weights=policies.ravel(), minlength=n_unique * n_cols)
+    merged_policies = merged_policies.reshape(n_unique, n_cols) / counts[:, None]
+    return boards[first], merged_policies, merged_values, counts
+
+
+def _root_win_rate(store):
+    """
+    Win rate of the player who moved into the root, exact if the root is proven.
+    """
+    if store.proven[0] != 0:
+        return float(store.proven[0] == 1)
+    return float(store.wins[0] / store.visits[0]) if store.visits[0] > 0 else 0
+
+
+def _root_children(store):
+    """
+    Actions, visit counts and proofs of the root's children, read from their
+    contiguous block. Children sharing a position in transposition mode
+    report the node holding it.
+    """
+    start = store.first_child[0]
+    children = np.arange(start, start + store.n_children[0])
+    targets = np.where(store.alias[children] >= 0, store.alias[children], children)
+    return (store.action[children].astype(np.int64), store.visits[targets].astype(float),
+            store.proven[targets])
+
+
+def _root_child_visits(store):
+    """
+    Actions and visit counts of the root's children, see _root_children.
+
+    Proofs override the counts: a proven win gets all the weight, and proven
+    losses get none unless every move loses.
+    """
+    actions, visits, proven = _root_children(store)
+    if np.any(proven == 1):
+        visits = (np.arange(len(actions)) == np.argmax(proven == 1)).astype(float)
+    elif not np.all(proven == -1):
+        visits[proven == -1] = 0
+    return actions, visits
@@ -0,0 +1,175 @@
+"""On-disk training data: self-play positions in memory-mappable .npy shards."""
+
+import json
+import os
+
+import numpy as np
+
+# Column name -> (dtype, shape of one position)
+COLUMNS = {
+    "boards": (np.int8, (6, 7)),     # position before the move, 1 for X, -1 for O
+    "players": (np.int8, ()),        # player to move
+    "policies": (np.float16, (7,)),  # MCTS root visit distribution
+    "values": (np.float16, ()),      # search estimate that player 1 wins
+    "outcomes": (np.int8, ()),       # final game result: 1, -1 or 0 for a draw
+}
+
+INDEX_FILE = "index.json"
+
+
+def _shard_path(directory, shard, column):
+    return os.path.join(directory, f"shard_{shard:05d}.{column}.npy")
+
+
+class ShardWriter:
+    """
+    Buffers positions and writes them as fixed-size shards, one .npy file per
+    column, listed in an index file.
+
+    The index is rewritten after every shard, so readers only ever see
+    complete shards. Use it as a context manager, or call close() to write
+    the last partial shard.
+    """
+
+    def __init__(self, directory, shard_size=65536):
+        """
+        Args:
+            directory (str): Output directory, created if needed. Shards already
+                listed in its index are kept and new shards are appended
+            shard_size (int): Positions per shard
+        """
+        if shard_size < 1:
+            raise ValueError("shard_size must be at least 1")
+        self.directory = directory
+        self.shard_size = shard_size
+        os.makedirs(directory, exist_ok=True)
+        index_path = os.path.join(directory, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                self.shards = json.load(f)["shards"]
+        else:
+            self.shards = []
+        self._buffers = {name: [] for name in COLUMNS}
+        self._n_buffered = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add_positions(self, boards, players, policies, values, outcomes):
+        """
+        Add positions, one row per position in every argument.
+
+        Args:
+            boards (np.ndarray): (N, 6, 7) positions
+            players (np.ndarray): (N,) players to move
+            policies (np.ndarray): (N, 7) MCTS policies
+            values (np.ndarray): (N,) value targets
+            outcomes (np.ndarray | int): (N,) final results, or one result for all
+        """
+        n = len(boards)
+        columns = dict(boards=boards, players=players, policies=policies, values=values,
+                       outcomes=np.broadcast_to(outcomes, (n,)))
+        for name, (dtype, shape) in COLUMNS.items():
+            column = np.asarray(columns[name]).astype(dtype).reshape((n,) + shape)
+            self._buffers[name].append(column)
+        self._n_buffered += n
+        while self._n_buffered >= self.shard_size:
+            self._write_shard(self.shard_size)
+
+    def add_game(self, game):
+        """
+        Add every position of a self_play.GameRecord, labelled with its result.
+        """
+        self.add_positions(game.boards, game.players, game.policies, game.values, game.result)
+
+    def flush(self):
+        """
+        Write the buffered positions as a shard, even if it is not full.
+        """
+        if self._n_buffered > 0:
+            self._write_shard(self._n_buffered)
+
+    def close(self):
+        self.flush()
+
+    def _write_shard(self, n):
+        shard = len(self.shards)
+        for name in COLUMNS:
+            data = np.concatenate(self._buffers[name])
+            np.save(_shard_path(self.directory, shard, name), data[:n])
+            self._buffers[name] = [data[n:]]
+        self._n_buffered -= n
+        self.shards.append({"shard": shard, "size": n})
+        self._write_index()
+
+    def _write_index(self):
+        index = {
+            "columns": {name: [np.dtype(dtype).name, list(shape)]
+                        for name, (dtype, shape) in COLUMNS.items()},
+            "n_positions": sum(shard["size"] for shard in self.shards),
+            "shards": self.shards,
+        }
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp_path, index_path)
+
+
+class ShardReader:
+    """
+    Reads shards written by ShardWriter through memory maps, so only the
+    positions actually used are loaded from disk.
+    """
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory (str): Directory holding the index and shards
+        """
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            self.shards = json.load(f)["shards"]
+
+    def __len__(self):
+        return sum(shard["size"] for shard in self.shards)
+
+    def load_shard(self, i):
+        """
+        Memory-map the columns of shard i.
+
+        Returns:
+            dict[str, np.memmap]: One read-only array per column
+        """
+        shard = self.shards[i]["shard"]
+        return {name: np.load(_shard_path(self.directory, shard, name), mmap_mode="r")
+                for name in COLUMNS}
+
+    def iter_batches(self, batch_size, shuffle=False, rng=None):
+        """
+        Stream the data in batches, holding one shard's batch in memory at a time.
+
+        Args:
+            batch_size (int): Positions per batch, the last batch of every
+                shard may be smaller
+            shuffle (bool): Visit the shards, and the positions within each
+                shard, in random order
+            rng (np.random.Generator): Source of the shuffling
+
+        Yields:
+            dict[str, np.ndarray]: One array per column, as in COLUMNS
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        order = rng.permutation(len(self.shards)) if shuffle else range(len(self.shards))
+        for i in order:
+            columns = self.load_shard(i)
+            n = self.shards[i]["size"]
+            positions = rng.permutation(n) if shuffle else np.arange(n)
+            for start in range(0, n, batch_size):
+                rows = positions[start:start + batch_size]
+                if not shuffle:
+                    rows = slice(rows[0], rows[-1] + 1)
+                yield {name: np.asarray(column[rows]) for name, column in columns.items()}
@@ -0,0 +1,104 @@
+"""LRU cache of position evaluations in front of a batch scorer."""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from connect4 import board
+
+
+class EvaluationCache:
+    """
+    Wraps any object with a batch `score(boards)` method and only sends it the
+    positions it has not seen yet.
+
+    Positions are keyed by their mirror-invariant Zobrist hash, so a board and
+    its left-right mirror image share one entry. Scorers may return values
+    only, or a (values, priors) tuple with one prior per column; priors are
+    stored in the canonical orientation and mirrored back for mirrored queries.
+    """
+
+    def __init__(self, scorer, capacity=100_000):
+        """
+        Args:
+            scorer: Object with a score(boards) method taking an (N, 6, 7) array
+            capacity (int): Maximum number of cached positions, least recently
+                used entries are evicted first
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.scorer = scorer
+        self.capacity = capacity
+        self.entries = OrderedDict()  # canonical hash -> (value, canonical priors or None)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def score(self, boards):
+        """
+        Score a batch of boards, answering from the cache where possible.
+
+        Args:
+            boards: list[np.ndarray] or np.ndarray of shape (N, 6, 7)
+
+        Returns:
+            np.ndarray of shape (N,) with the values, or a (values, priors)
+            tuple with priors of shape (N, 7) if the scorer returns priors
+        """
+        if isinstance(boards, list):
+            boards = np.stack(boards) if boards else np.zeros((0, 6, 7))
+        hashes, mirrored = board.canonical_hash_batch(boards)
+        hashes = hashes.tolist()
+
+        # Collect the distinct positions missing from the cache
+        missing = {}  # canonical hash -> index of the first board with it
+        for i, key in enumerate(hashes):
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            elif key in missing:
+                self.hits += 1  # scored once for the whole batch
+            else:
+                missing[key] = i
+                self.misses += 1
+
+        new_entries = {}
+        if missing:
+            first = np.fromiter(missing.values(), dtype=np.int64, count=len(missing))
+            scored = self.scorer.score(boards[first])
+            values, priors = scored if isinstance(scored, tuple) else (scored, None)
+            for j, (key, i) in enumerate(missing.items()):
+                prior = None
+                if priors is not None:
+                    prior = priors[j][::-1].copy() if mirrored[i] else np.array(priors[j])
+                new_entries[key] = (float(values[j]), prior)
+
+        # Assemble the answers before inserting, so evictions cannot drop them
+        out_values = np.empty(len(hashes))
+        out_priors = None
+        for i, key in enumerate(hashes):
+            value, prior = new_entries[key] if key in new_entries else self.entries[key]
+            out_values[i] = value
+            if prior is not None:
+                if out_priors is None:
+                    out_priors = np.zeros((len(hashes), len(prior)))
+                out_priors[i] = prior[::-1] if mirrored[i] else prior
+
+        for key, entry in new_entries.items():
+            self.entries[key] = entry
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+        return out_values if out_priors is None else (out_values, out_priors)
@@ -0,0 +1,71 @@
+"""Leaf evaluators for MCTS: anything that scores a batch of boards."""
+
+from typing import Protocol, Tuple
+
+import numpy as np
+
+from connect4.mcts import rollout_batch
+
+
+class Evaluator(Protocol):
+    def score(self, boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a batch of boards.
+
+        Args:
+            boards (np.ndarray): (N, 6, 7) stack of boards
+
+        Returns:
+            values (np.ndarray): (N,) probability that player 1 wins from each board
+            priors (np.ndarray): (N, 7) move probabilities for the player to move
+        """
+        ...
+
+
+def players_to_move(boards: np.ndarray) -> np.ndarray:
+    """
+    Player to move on each board, inferred from the piece count.
+    """
+    return np.where(np.sum(boards, axis=(1, 2)) == 0, 1, -1)
+
+
+def uniform_priors(boards: np.ndarray) -> np.ndarray:
+    """
+    Uniform move probabilities over the legal columns of each board.
+    """
+    legal = (np.asarray(boards)[:, 0, :] == 0).astype(float)
+    return legal / np.maximum(legal.sum(axis=1, keepdims=True), 1)
+
+
+class RolloutEvaluator:
+    """
+    Evaluates boards with random rollouts and uniform priors, the classic MCTS
+    simulation expressed as an Evaluator.
+    """
+
+    def __init__(self, n_rollouts=1, rng: np.random.Generator = None):
+        self.n_rollouts = n_rollouts
+        self.rng = np.random.default_rng() if rng is None else rng
+
+    def score(self, boards):
+        boards = np.asarray(boards)
+        repeated = np.repeat(boards, self.n_rollouts, axis=0)
+        players = np.repeat(players_to_move(boards), self.n_rollouts)
+        results = rollout_batch(repeated, players, rng=self.rng).reshape(len(boards), self.n_rollouts)
+        values = ((results + 1) / 2).mean(axis=1)
+        return values, uniform_priors(boards)
+
+
+class ValueOnlyEvaluator:
+    """
+    Adapts a value-only scorer, such as SimpleValueNN in poc_batch_nn.py, to
+    the Evaluator protocol by adding uniform priors.
+    """
+
+    def __init__(self, scorer):
+        self.scorer = scorer
+
+    def score(self, boards):
+        boards = np.asarray(boards)
+        values = np.asarray(self.scorer.score(boards), dtype=float).reshape(len(boards))
+        return values, uniform_priors(boards)
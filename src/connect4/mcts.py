@@ -1,10 +1,13 @@
 """Monte Carlo Tree Search (MCTS) for Connect 4 game."""
 
 from connect4 import board
+from connect4.node_store import NodeDataView, NodeStore
+from connect4.transposition import TranspositionTable
 import numpy as np
 import random
 import math
 
+# Columns of the MCTSTree.node_data table view
 global PARENT_COL, ACTION_COL, N_VISITS_COL, WINS_COL, PRIOR_COL, EXPANDED_COL
 PARENT_COL = 0
 ACTION_COL = 1
@@ -13,48 +16,282 @@ WINS_COL = 3
 PRIOR_COL = 4
 EXPANDED_COL = 5
 
+INITIAL_CAPACITY = 1 << 14  # nodes preallocated at most, before doubling growth
+VIRTUAL_LOSS = 0.1  # wins removed per pending evaluation during batched selection
+
 class MCTSTree:
-    def __init__(self, root_board, player=1, iterations=10, exploration_factor=math.sqrt(2)):
+    def __init__(self, root_board, player=1, iterations=10, exploration_factor=math.sqrt(2),
+                 transpositions=False, transposition_capacity=1 << 20,
+                 selection="uct", evaluator=None, dirichlet_alpha=None, dirichlet_epsilon=0.25,
+                 rollouts_per_leaf=1, rng: np.random.Generator = None, nodes=None,
+                 solver=None, solver_threshold=12, book=None):
+        """
+        Args:
+            root_board (np.ndarray): Board to search from
+            player (int): Player to move at the root
+            iterations (int): Expected number of iterations, used to size the node store
+            exploration_factor (float): UCT exploration constant, or c_puct in PUCT mode
+            transpositions (bool): Share one node between all move orders reaching
+                the same position, see TranspositionTable
+            transposition_capacity (int): Maximum number of positions in the table
+            selection (str): "uct", or "puct" to weight exploration by the
+                children's priors, see puct_scores
+            evaluator (Evaluator): Scores leaves in mcts_step instead of a random
+                rollout, and its priors are stored on the leaf's children
+            dirichlet_alpha (float): If set, mix Dir(alpha) noise into the root priors
+            dirichlet_epsilon (float): Weight of the noise in the root priors
+            rollouts_per_leaf (int): Random rollouts played from each leaf in one
+                vectorized batch, backed up as that many visits
+            rng (np.random.Generator): Source of the Dirichlet noise and batched rollouts
+            nodes (NodeStore): Store to keep the tree in, e.g. a SharedNodeStore.
+                An empty store gets a root node, otherwise node 0 must be the root
+            solver (Solver): Exact solver used instead of rollouts or the
+                evaluator for leaves with few empty cells
+            solver_threshold (int): Leaves with at most this many empty cells are solved
+            book (opening_book.OpeningBook): Root positions found in the book
+                are answered from it by select_best_child, see book_entry
+        """
+        if selection not in ("uct", "puct"):
+            raise ValueError(f"Unknown selection rule {selection!r}, expected 'uct' or 'puct'")
+        if rollouts_per_leaf < 1:
+            raise ValueError("rollouts_per_leaf must be at least 1")
         self.root_board = root_board
         self.player = player  # player who moves from root
-        self.children_map = {}  # Maps (parent_idx, action) to child_idx
-        
-        data_size = iterations * 7 + 1  # Each iteration can have up to 7 children (one for each column), adding 1 for the root node
-        self.node_data = np.zeros((data_size, 6), dtype=float)
-
-        self.node_data[0, PARENT_COL] = -1
-        self.node_data[0, ACTION_COL] = -1 
-        self.node_count = 1
+        self.root_state = board.GameState.from_array(root_board, player)
+        # Each iteration can add up to 7 children, the store grows past this hint if needed
+        if nodes is None:
+            nodes = NodeStore(capacity=min(iterations * 7 + 1, INITIAL_CAPACITY))
+        self.nodes = nodes
+        if self.nodes.size == 0:
+            self.nodes.add_nodes(1)  # root: no parent, no action
+            self.nodes.action[0] = -1
         self.exploration_factor = exploration_factor
+        self.selection = selection
+        self.evaluator = evaluator
+        self.dirichlet_alpha = dirichlet_alpha
+        self.dirichlet_epsilon = dirichlet_epsilon
+        self.rollouts_per_leaf = rollouts_per_leaf
+        self.solver = solver
+        self.solver_threshold = solver_threshold
+        self.book = book
+        self.rng = np.random.default_rng() if rng is None else rng
+
+        self.transpositions = None
+        if transpositions:
+            self.transpositions = TranspositionTable(transposition_capacity)
+            self.transpositions.put(self.root_state.key(), 0)
+
+    @property
+    def node_count(self):
+        return self.nodes.size
+
+    @property
+    def node_data(self):
+        """
+        The node statistics as an (node_count, 6) table indexed with the *_COL
+        constants. Single-column indexing reads and writes the node store.
+        """
+        return NodeDataView(self.nodes)
+
+    def memory_usage(self):
+        """
+        Report the memory held by the node store, see NodeStore.memory_usage.
+        """
+        return self.nodes.memory_usage()
+
+    def advance(self, col):
+        """
+        Play 'col' from the root and keep searching from the resulting position.
+
+        The subtree of the chosen child becomes the new tree: its nodes are
+        compacted to the front of the node store in breadth-first order, which
+        keeps every child block contiguous, and all statistics it gathered are
+        kept. Everything else is discarded.
+
+        Args:
+            col (int): Column played from the root position
+        """
+        if col not in self.root_state.legal_moves():
+            raise ValueError(f"Column {col} is not a legal move from the root")
+        children = self.get_children(0)
+        chosen = children[self.nodes.action[children] == col]
+
+        self.root_board = board.add_move(
+            self.root_board, self.player, (self.root_state.landing_row(col), col))
+        self.player = -self.player
+        self.root_state = board.GameState.from_array(self.root_board, self.player)
+
+        if len(chosen) == 0:
+            # Never expanded: start over from an empty tree
+            self.nodes.compact([])
+            self.nodes.add_nodes(1)
+            self.nodes.action[0] = -1
+            if self.transpositions is not None:
+                self.transpositions.clear()
+                self.transpositions.put(self.root_state.key(), 0)
+            return
+
+        # Breadth-first walk of the subtree, one level at a time
+        keep = [chosen]
+        frontier = chosen
+        while len(frontier) > 0:
+            starts = self.nodes.first_child[frontier]
+            counts = self.nodes.n_children[frontier].astype(np.int64)
+            has_children = counts > 0
+            if not np.any(has_children):
+                break
+            starts, counts = starts[has_children], counts[has_children]
+            # Concatenate the ranges start..start+count of every parent
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            frontier = np.repeat(starts, counts) + offsets
+            keep.append(frontier)
+
+        # Transposition links into the discarded part of the tree are dropped,
+        # those nodes then collect their own statistics again
+        old_to_new = self.nodes.compact(np.concatenate(keep))
+        self.nodes.parent[0] = -1
+        self.nodes.action[0] = -1
+        if self.transpositions is not None:
+            self.transpositions.remap(old_to_new)
+        if self.dirichlet_alpha is not None and self.nodes.n_children[0] > 0:
+            children = self.get_children(0)
+            self.nodes.prior[children] = self._add_root_noise(self.nodes.prior[children])
 
     def mcts_step(self):
         """
         Perform one complete MCTS iteration: select, expand, simulate, and backpropagate.
+
+        The iteration plays moves in place on root_state and takes them back at
+        the end, so no boards are allocated.
         """
-        # 1 & 2. Selection and Expansion (with virtual loss)
-        leaf_node, leaf_board, path = self.select_and_expand()
-        
-        # 3. Simulation - random rollout from leaf
-        result = rollout(leaf_board.copy(), self.player)
-        value = (result + 1) / 2
+        state = self.root_state
+
+        # 1. Selection
+        leaf_node, path = self._descend(0, state)
+
+        # 2 & 3. Expansion and Simulation
+        value, count = self.evaluate_leaf(leaf_node, state)
 
         # 4. Backpropagation - update statistics along path
-        self.backpropagate(path, value)
+        self.backpropagate(path, value, count)
+        _rewind(state, len(path) - 1)
     
-    def select_and_expand(self):
+    def leaf_value(self, node_idx, state):
+        """
+        Exact value of a selected leaf, if it is known without evaluation: the
+        proven value of a proven node, the result of a finished game, or the
+        solver's result for an endgame. Wins found this way are recorded as
+        proofs, which backpropagate then carries up the path.
+
+        Args:
+            node_idx (int): Index of the leaf
+            state (board.GameState): State at the leaf
+
+        Returns:
+            float: Probability that player 1 wins, None if the leaf needs a
+                rollout or the evaluator
+        """
+        nodes = self.nodes
+        if nodes.proven[node_idx] != 0:
+            return self._proven_value(node_idx, state)
+        if state.is_terminal:
+            if state.result != 0:
+                # A win for the player who made the last move
+                nodes.proven[node_idx] = 1
+            return (state.result + 1) / 2
+        value = self.solved_value(state)
+        if value is not None and value != 0.5:
+            # A solved win for either side is a proof for the node
+            nodes.proven[node_idx] = 1 if (value == 1) == (state.player == -1) else -1
+        return value
+
+    def evaluate_leaf(self, node_idx, state, value=None):
+        """
+        Value of a selected leaf for backpropagation, expanding it if needed.
+
+        Leaves with an exact value (see leaf_value) are not expanded, their
+        children would never be visited, except for the root, whose children
+        the move is chosen from. Other leaves are expanded and scored with
+        random rollouts, or with the evaluator, whose priors are stored on
+        the new children.
+
+        Args:
+            node_idx (int): Index of the leaf
+            state (board.GameState): State at the leaf, left as it was
+            value (float): Exact value already found with leaf_value, if any
+
+        Returns:
+            tuple: (value, count) with the probability that player 1 wins and
+                the number of simulations it stands for
+        """
+        count = self.rollouts_per_leaf if self.evaluator is None else 1
+        if value is None:
+            value = self.leaf_value(node_idx, state)
+        if value is None or node_idx == 0:
+            self._expand(node_idx, state)
+        if value is not None:
+            return value, count
+        if self.evaluator is not None:
+            values, priors = self.evaluator.score(state.board[None].copy())
+            self.set_priors(node_idx, priors[0])
+            return float(values[0]), count
+        if count == 1:
+            return (rollout_state(state) + 1) / 2, count
+        boards = np.repeat(state.board[None], count, axis=0)
+        results = rollout_batch(boards, state.player, rng=self.rng)
+        return float(np.mean((results + 1) / 2)), count
+
+    def solved_value(self, state):
+        """
+        Exact value of a non-terminal position with at most solver_threshold
+        empty cells, if the tree has a solver.
+
+        Args:
+            state (board.GameState | np.ndarray): Position to solve
+
+        Returns:
+            float: Probability that player 1 wins (1, 0.5 or 0), None if the
+                position is not solved
+        """
+        if self.solver is None:
+            return None
+        if not isinstance(state, board.GameState):
+            state = board.GameState.from_array(state)
+        if state.is_terminal or 42 - state.n_pieces > self.solver_threshold:
+            return None
+        outcome = self.solver.solve(state).outcome * state.player
+        return (outcome + 1) / 2
+
+    def select_and_expand(self, virtual_loss=VIRTUAL_LOSS):
         """
         Select a leaf node and expand it. Used for batching simulations.
-        
+
+        A virtual loss is applied along the path so that further selections
+        before the leaf is evaluated spread to other leaves. The caller must
+        call revert_virtual_loss with the same loss before backpropagating.
+
+        Leaves with an exact value (see leaf_value) need no evaluation and
+        are only expanded at the root, as in evaluate_leaf.
+
+        Args:
+            virtual_loss (float): Wins removed from each node on the path
+
         Returns:
-            tuple: (leaf_node_idx, leaf_board_state, path)
+            tuple: (leaf_node_idx, leaf_board_state, path, value) where value
+                is the leaf's exact value, None if it must be evaluated
         """
-        leaf_node, leaf_board, path = self.select_leaf(0, self.root_board)
-        
-        # Apply virtual loss and expand
-        self.apply_virtual_loss(path)
-        self.expand_node(leaf_node, leaf_board)
+        state = self.root_state
+        leaf_node, path = self._descend(0, state)
 
-        return leaf_node, leaf_board, path
+        # Apply virtual loss, resolve the leaf and expand it if needed
+        self.apply_virtual_loss(path, virtual_loss)
+        value = self.leaf_value(leaf_node, state)
+        if value is None or leaf_node == 0:
+            self._expand(leaf_node, state)
+
+        leaf_board = state.board.copy()
+        _rewind(state, len(path) - 1)
+        return leaf_node, leaf_board, path, value
 
     def select_leaf(self, node_idx, node_board):
         """
@@ -67,39 +304,82 @@ class MCTSTree:
         Returns:
             tuple: (leaf_node_idx, leaf_board_state, path)
         """
-        current_player = self.player
+        if node_board is self.root_board:
+            state = self.root_state
+        else:
+            state = board.GameState.from_array(node_board, self.player)
+
+        leaf_node, path = self._descend(node_idx, state)
+        leaf_board = state.board.copy()
+        _rewind(state, len(path) - 1)
+        return leaf_node, leaf_board, path
+
+    def _descend(self, node_idx, state):
+        """
+        Walk down the tree from node_idx using UCT selection, playing each
+        selected move on 'state' in place.
+
+        Proven nodes below the start are leaves. The start node is searched
+        even when proven: its proven-winning child is selected, or all its
+        children if they all lose, so the root keeps gathering visits.
+
+        Args:
+            node_idx (int): Starting node index
+            state (board.GameState): State at the starting node, left at the leaf
+
+        Returns:
+            tuple: (leaf_node_idx, path)
+        """
         current_node = node_idx
-        current_board = node_board.copy()
         path = [current_node]
 
-        # Keep traversing until we find a leaf
-        while self.node_data[current_node, EXPANDED_COL] == 1:
-            legal_moves = board.get_legal_moves(current_board)
-            if not legal_moves:
-                break  # Terminal node
-            
-            # Gather children and corresponding UCT scores
-            child_scores = {}
-            parent_visits = self.node_data[current_node, N_VISITS_COL]
-            for col in legal_moves.keys():
-                child_key = (current_node, col)
-                if child_key in self.children_map:
-                    child_idx = self.children_map[child_key]
-                    score = uct_score(self.node_data, child_idx, parent_visits, self.exploration_factor)
-                    child_scores[col] = score
-
-            if not child_scores:
+        # Keep traversing until we find a leaf. Expanded nodes are never terminal,
+        # and proven nodes are leaves: their value is known
+        nodes = self.nodes
+        while nodes.expanded[current_node] and (nodes.proven[current_node] == 0
+                                                or current_node == node_idx):
+            n_children = nodes.n_children[current_node]
+            if n_children == 0:
                 raise ValueError(f"Node {current_node} is marked expanded but has no children")
 
-            # Select column with highest UCT score
-            selected_col = weighted_sample(child_scores)
-            row = legal_moves[selected_col]
-            current_board = board.add_move(current_board, current_player, (row, selected_col))
-            current_node = self.children_map[(current_node, selected_col)]
-            current_player = -current_player
+            # Score all children at once and pick the highest UCT score
+            start = nodes.first_child[current_node]
+            end = start + n_children
+            parent_visits = nodes.visits[current_node]
+            # Children may point at the node that holds their position in
+            # transposition mode, priors belong to the move and stay on the child slot
+            children = np.arange(start, end)
+            targets = self._child_targets(current_node)
+            scores = self._child_scores(nodes.wins[targets], nodes.visits[targets],
+                                        nodes.prior[start:end], parent_visits)
+            proven = nodes.proven[targets]
+            if nodes.proven[current_node] == 0:
+                # Proven subtrees need no more search
+                scores[proven != 0] = -np.inf
+                if np.all(proven != 0):
+                    # Children proven through another path of a transposition
+                    # graph, or by a batched leaf not yet backpropagated, do
+                    # not prove the node yet: prove it now and stop here
+                    self._prove_from_children(current_node)
+                    break
+            elif np.any(proven == 1):
+                scores[proven != 1] = -np.inf
+            k = argmax_random_tie(scores)
+            selected = int(children[k])
+            current_node = int(targets[k])
+
+            state.play(int(nodes.action[selected]))
             path.append(current_node)
 
-        return current_node, current_board, path
+        return current_node, path
+
+    def _child_scores(self, wins, visits, priors, parent_visits):
+        """
+        Selection scores of the children of one node under the tree's rule.
+        """
+        if self.selection == "puct":
+            return puct_scores(wins, visits, priors, parent_visits, self.exploration_factor)
+        return uct_scores(wins, visits, parent_visits, self.exploration_factor)
 
     def expand_node(self, node_idx, board_state):
         """
@@ -109,36 +389,172 @@ class MCTSTree:
             node_idx (int): Index of node to expand
             board_state (np.ndarray): Board state at this node
         """
-        is_terminal, _ = board.check_board_state(board_state)
-        if is_terminal:
+        self._expand(node_idx, board.GameState.from_array(board_state))
+
+    def _expand(self, node_idx, state):
+        """
+        Expand a node from its game state, see expand_node. A terminal node
+        is not expanded.
+        """
+        if state.is_terminal:
             return
-        
-        legal_moves = board.get_legal_moves(board_state)
-        
+
         # Create child for each legal move
-        for col in legal_moves.keys():
-            if (node_idx, col) not in self.children_map:
-                self._create_new_node(node_idx, col)
+        if self.nodes.n_children[node_idx] == 0:
+            children = self._create_children(node_idx, list(state.legal_moves()))
+            if self.transpositions is not None:
+                for child_idx in children:
+                    state.play(int(self.nodes.action[child_idx]))
+                    self._link_transposition(child_idx, state.key())
+                    state.undo()
         
         # Mark this node as expanded
-        self.node_data[node_idx, EXPANDED_COL] = 1
+        self.nodes.expanded[node_idx] = True
         
-    def backpropagate(self, path, value):
+    def _create_children(self, parent_idx, cols):
+        """
+        Create the children of a node as one block of the node store. The
+        parent's first_child is set before n_children, so a reader that sees
+        the children count also sees where they are.
+
+        In PUCT mode children start with uniform priors until an evaluator
+        provides better ones through set_priors.
+
+        Args:
+            parent_idx (int): Index of the parent node, without children
+            cols (list[int]): Columns of the child moves
+
+        Returns:
+            np.ndarray: Indices of the new children
+        """
+        nodes = self.nodes
+        start = nodes.add_nodes(len(cols))
+        children = np.arange(start, start + len(cols))
+        nodes.parent[children] = parent_idx
+        nodes.action[children] = cols
+        if self.selection == "puct":
+            priors = np.full(len(cols), 1 / len(cols))
+            if parent_idx == 0 and self.dirichlet_alpha is not None:
+                priors = self._add_root_noise(priors)
+            nodes.prior[children] = priors
+        nodes.first_child[parent_idx] = start
+        nodes.n_children[parent_idx] = len(cols)
+        return children
+
+    def set_priors(self, node_idx, priors):
+        """
+        Store policy priors on the children of an expanded node.
+
+        Priors of illegal columns are dropped and the rest renormalized, falling
+        back to uniform priors if nothing is left. At the root, Dirichlet noise
+        is mixed in when dirichlet_alpha is set.
+
+        Args:
+            node_idx (int): Index of the node whose children get the priors
+            priors (np.ndarray): (7,) move probabilities indexed by column
         """
-        Backpropagate the result through the path using forward iteration.
+        children = self.get_children(node_idx)
+        if len(children) == 0:
+            return
+        child_priors = np.asarray(priors, dtype=float)[self.nodes.action[children]]
+        total = child_priors.sum()
+        if total > 0:
+            child_priors = child_priors / total
+        else:
+            child_priors = np.full(len(children), 1 / len(children))
+        if node_idx == 0 and self.dirichlet_alpha is not None:
+            child_priors = self._add_root_noise(child_priors)
+        self.nodes.prior[children] = child_priors
+
+    def _add_root_noise(self, priors):
+        """
+        Mix Dirichlet noise into the root priors so self-play keeps trying moves
+        the policy rules out.
+        """
+        noise = self.rng.dirichlet(np.full(len(priors), self.dirichlet_alpha))
+        return (1 - self.dirichlet_epsilon) * priors + self.dirichlet_epsilon * noise
+
+    def _link_transposition(self, node_idx, key):
+        """
+        Point a new node at the node already holding its position, or register
+        it as the holder if the position is new.
+
+        Args:
+            node_idx (int): Index of the new node
+            key (int): Position key of the node
+        """
+        holder = self.transpositions.get(key)
+        if holder is None:
+            self.transpositions.put(key, node_idx)
+        else:
+            self.nodes.alias[node_idx] = holder
+
+    def backpropagate(self, path, value, count=1):
+        """
+        Backpropagate the result through the path using forward iteration,
+        adding 'count' visits to every node.
 
         Args:
             path (list): List of node indices from root to leaf
-            result (int): Game result (1 for player 1 win, -1 for player 2 win,
+            value (float): Probability that player 1 wins, 1 for a player 1 win,
+                0 for a player 2 win and 0.5 for a draw. With count > 1, the
+                average over that many simulations
+            count (int): Number of simulations the value stands for
         """
+        self.nodes.visits[path] += count
 
         # If root player is -1, flip the initial pattern       fix back prop log
         if self.player == -1:
-            self.node_data[path[::2], WINS_COL] += value     # P2's turns
-            self.node_data[path[1::2], WINS_COL] += (1-value) # P1's turns
+            self.nodes.wins[path[::2]] += count * value     # P2's turns
+            self.nodes.wins[path[1::2]] += count * (1-value) # P1's turns
+        else:
+            self.nodes.wins[path[1::2]] += count * value     # P1's turns
+            self.nodes.wins[path[::2]] += count * (1-value) # P2's turns
+
+        if self.nodes.proven[path[-1]] != 0:
+            self._update_proven(path)
+
+    def _update_proven(self, path):
+        """
+        Propagate a proof at the end of a path towards the root (MCTS-Solver).
+
+        A child won by the player to move proves a loss for the player who
+        moved into the parent, and a parent whose children are all lost for
+        the player to move is proven won for the player who moved into it.
+
+        Args:
+            path (list): List of node indices from root to leaf
+        """
+        nodes = self.nodes
+        for depth in range(len(path) - 1, 0, -1):
+            parent = path[depth - 1]
+            if nodes.proven[parent] != 0 or not self._prove_from_children(parent):
+                break
+
+    def _prove_from_children(self, node_idx):
+        """
+        Mark a node proven if its children prove it, see _update_proven.
+
+        Returns:
+            bool: True if the node is now proven
+        """
+        proven = self.nodes.proven[self._child_targets(node_idx)]
+        if len(proven) == 0:
+            return False
+        if np.any(proven == 1):
+            self.nodes.proven[node_idx] = -1
+        elif np.all(proven == -1):
+            self.nodes.proven[node_idx] = 1
         else:
-            self.node_data[path[1::2], WINS_COL] += value     # P1's turns
-            self.node_data[path[::2], WINS_COL] += (1-value) # P2's turns
+            return False
+        return True
+
+    def _proven_value(self, node_idx, state):
+        """
+        Probability that player 1 wins at a proven node, from the state at the node.
+        """
+        mover = -state.player
+        return (self.nodes.proven[node_idx] * mover + 1) / 2
 
     def _create_new_node(self, parent_idx, action_col):
         """
@@ -151,30 +567,64 @@ class MCTSTree:
         Returns:
             int: Index of newly created node
         """
-        # Create new node
-        new_node_idx = self.node_count
-        self.children_map[(parent_idx, action_col)] = new_node_idx
-
-        # Initialize node data
-        self.node_data[new_node_idx, PARENT_COL] = parent_idx
-        self.node_data[new_node_idx, ACTION_COL] = action_col
-        self.node_data[new_node_idx, N_VISITS_COL] = 0
-        self.node_data[new_node_idx, WINS_COL] = 0
-        self.node_data[new_node_idx, PRIOR_COL] = 0
-        self.node_data[new_node_idx, EXPANDED_COL] = (
-            0  # New nodes start unexpanded
-        )
-
-        self.node_count += 1
+        # Create new node, appended to the parent's contiguous block of children
+        nodes = self.nodes
+        new_node_idx = nodes.add_nodes(1)
+        n_siblings = nodes.n_children[parent_idx]
+        if n_siblings == 0:
+            nodes.first_child[parent_idx] = new_node_idx
+        elif nodes.first_child[parent_idx] + n_siblings != new_node_idx:
+            raise ValueError(f"Children of node {parent_idx} must be created consecutively")
+        nodes.n_children[parent_idx] += 1
+
+        # Initialize node data, statistics start at zero and new nodes start unexpanded
+        nodes.parent[new_node_idx] = parent_idx
+        nodes.action[new_node_idx] = action_col
         return new_node_idx
 
-    def apply_virtual_loss(self, path, loss=0.1):
+    def apply_virtual_loss(self, path, loss=VIRTUAL_LOSS):
+        """
+        Apply a virtual loss to each node along the path: one pending visit
+        that counts as a loss, making the path less attractive to selection
+        until the leaf is evaluated. Undo it with revert_virtual_loss.
+        """
+        self.nodes.visits[path] += 1
+        # Subtract virtual loss from wins for the player's turn
+        self.nodes.wins[path] -= loss
+
+    def revert_virtual_loss(self, path, loss=VIRTUAL_LOSS):
+        """
+        Remove a virtual loss applied with apply_virtual_loss, before the real
+        result is backpropagated along the same path.
+        """
+        self.nodes.visits[path] -= 1
+        self.nodes.wins[path] += loss
+
+    @property
+    def children_map(self):
         """
-        Apply a virtual loss to each node along the path.
+        Maps (parent_idx, action) to child_idx, built from the child blocks.
+        Meant for inspection, search uses first_child and n_children directly.
         """
-        self.node_data[path, N_VISITS_COL] += 1
-        # For example, subtract virtual loss from wins for the player's turn
-        self.node_data[path, WINS_COL] -= loss
+        children_map = {}
+        for parent_idx in np.flatnonzero(self.nodes.n_children[:self.node_count]):
+            for child_idx in self.get_children(parent_idx):
+                action = int(self.nodes.action[child_idx])
+                children_map[(int(parent_idx), action)] = int(child_idx)
+        return children_map
+
+    def get_children(self, node_idx):
+        """
+        Returns the indices of the children of a node.
+
+        Args:
+            node_idx (int): Index of the parent node
+
+        Returns:
+            np.ndarray: Child node indices, in creation order
+        """
+        start = self.nodes.first_child[node_idx]
+        return np.arange(start, start + self.nodes.n_children[node_idx])
 
     def to_pandas(self):
         """
@@ -187,22 +637,56 @@ class MCTSTree:
         columns = [
             "parent_idx", "action_col", "n_visits", "wins", "prior", "expanded"
         ]
-        return pd.DataFrame(self.node_data, columns=columns)
+        return pd.DataFrame(self.nodes.to_array(), columns=columns)
+
+    def book_entry(self):
+        """
+        Look up the root position in the opening book. Callers can skip the
+        search of positions found in the book.
+
+        Returns:
+            opening_book.BookEntry: The book move and value, None without a
+                book or if the root is not in it
+        """
+        if self.book is None:
+            return None
+        return self.book.lookup(self.root_state)
 
     def select_best_child(self):
         """
         Select the child with the highest visit count from the root node.
+        A proven win comes first, then the book move if the root is in the
+        opening book.
 
         Returns:
             int: Column index of the best child action
         """
-        # root children are when parent_idx is 0 and 
-        root_children = self.node_data[:10]
-        root_children = root_children[~np.all(root_children == 0, axis=1)]
-        root_children = root_children[root_children[:, PARENT_COL]==0]
-        wins = root_children[:, WINS_COL] / root_children[:, N_VISITS_COL]
-        best_child = root_children[np.argmax(wins), ACTION_COL]
-        return best_child
+        root_children = self.get_children(0)
+        targets = self._child_targets(0)
+        proven = self.nodes.proven[targets]
+        if np.any(proven == 1):
+            # A proven win beats any estimate
+            return int(self.nodes.action[root_children[np.argmax(proven == 1)]])
+        entry = self.book_entry()
+        if entry is not None:
+            return entry.move
+        visits = self.nodes.visits[targets]
+        # Unvisited children have no win rate, never pick them over visited ones,
+        # and proven losses only when every move loses
+        wins = np.where(visits > 0, self.nodes.wins[targets] / np.maximum(visits, 1), -1e9)
+        if not np.all(proven == -1):
+            wins[proven == -1] = -np.inf
+        best_child = self.nodes.action[root_children[np.argmax(wins)]]
+        return int(best_child)
+
+    def _child_targets(self, node_idx):
+        """
+        Nodes holding the statistics of a node's children: the children, or
+        the nodes their aliases point at in transposition mode.
+        """
+        children = self.get_children(node_idx)
+        aliases = self.nodes.alias[children]
+        return np.where(aliases >= 0, aliases, children)
 
 def rollout(board_arr: np.ndarray, player: int, debug=False) -> int:
     """
@@ -215,25 +699,98 @@ def rollout(board_arr: np.ndarray, player: int, debug=False) -> int:
     Returns:
         int: The result of the rollout (1 for player 1 win, -1 for player 2 win, 0 for draw).
     """
-    is_terminal, result = board.check_board_state(board_arr)
-    while not is_terminal:
-        legal_moves = board.get_legal_moves(board_arr)
-        col, row = random.choice(list(legal_moves.items()))
+    return rollout_state(board.GameState.from_array(board_arr, player), debug=debug)
 
-        board_arr = board.add_move(board_arr, player=player, loc=(row, col))
-        if debug:
-            print(board_arr)
-            print(f"Player {player} added move at ({row}, {col})")
-            assert board.check_valid_board(board_arr)
 
-        is_terminal, result = board.check_board_state_incremental(
-            board_arr, row, col, player
-        )
-        player *= -1
+def rollout_state(state: board.GameState, debug=False) -> int:
+    """
+    Perform a random rollout in place on a game state. Every move played is
+    taken back before returning, so the state is left as it was.
+
+    Args:
+        state (board.GameState): The state to roll out from.
+
+    Returns:
+        int: The result of the rollout (1 for player 1 win, -1 for player 2 win, 0 for draw).
+    """
+    n_moves = 0
+    while not state.is_terminal:
+        col = random.choice(list(state.legal_moves()))
+        state.play(col)
+        n_moves += 1
+        if debug:
+            print(state.board)
+            print(f"Player {-state.player} added move at ({state.landing_row(col) + 1}, {col})")
+            assert board.check_valid_board(state.board)
 
+    result = state.result
+    _rewind(state, n_moves)
     return result
 
 
+def _rewind(state: board.GameState, n_moves: int) -> None:
+    """
+    Take back the last n_moves moves played on a state.
+    """
+    for _ in range(n_moves):
+        state.undo()
+
+
+def rollout_batch(boards: np.ndarray, players, rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Play random rollouts from a stack of boards, advancing all games in lockstep.
+
+    Every step picks a uniformly random legal column for each unfinished game,
+    drops the pieces with one vectorized write and checks only the lines through
+    the new pieces. Finished games are dropped from the working set.
+
+    Args:
+        boards (np.ndarray): (N, 6, 7) stack of board states.
+        players (np.ndarray | int): (N,) players to make the first move in each
+            rollout, or a single player for all of them.
+        rng (np.random.Generator): Random generator, a fresh one if None.
+
+    Returns:
+        np.ndarray: (N,) results (1 for player 1 win, -1 for player 2 win, 0 for draw).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    boards = np.asarray(boards)
+    n_games = len(boards)
+    results = np.zeros(n_games, dtype=np.int8)
+
+    work = boards.reshape(n_games, 42).astype(np.int8)
+    players = np.broadcast_to(np.asarray(players, dtype=np.int8), (n_games,)).copy()
+    heights = np.count_nonzero(boards, axis=1).astype(np.int8)
+    game_idx = np.arange(n_games)
+
+    # Leaves may already be terminal
+    is_terminal, results[:] = board.check_board_state_batch(boards)
+    active = ~is_terminal
+    work, players, heights, game_idx = work[active], players[active], heights[active], game_idx[active]
+
+    while len(game_idx) > 0:
+        n_active = len(game_idx)
+        active_rows = np.arange(n_active)
+
+        # Uniform choice among legal columns: argmax over random keys of legal columns
+        keys = rng.random((n_active, 7))
+        keys[heights >= 6] = -1
+        cols = keys.argmax(axis=1)
+        rows = 5 - heights[active_rows, cols]
+
+        work[active_rows, rows * 7 + cols] = players
+        heights[active_rows, cols] += 1
+
+        won = board.check_incremental_win_batch(work, rows, cols, players)
+        results[game_idx[won]] = players[won]
+        active = ~(won | (heights.sum(axis=1) == 42))
+
+        players = -players
+        work, players, heights, game_idx = work[active], players[active], heights[active], game_idx[active]
+
+    return results
+
+
 def weighted_sample(child_scores: dict) -> int:
     """
     If multiple actions share the maximum UCT score, choose one uniformly at random.
@@ -253,6 +810,64 @@ def weighted_sample(child_scores: dict) -> int:
     return candidates[0]
 
 
+def argmax_random_tie(scores: np.ndarray) -> int:
+    """
+    Index of the maximum score. If multiple entries share the maximum, choose
+    one uniformly at random.
+
+    Args:
+        scores (np.ndarray): 1D array of scores
+
+    Returns:
+        int: a selected index
+    """
+    # Using a tolerance since scores are floats
+    candidates = np.flatnonzero(scores >= scores.max() - 1e-8)
+    if len(candidates) > 1:
+        return int(random.choice(candidates))
+    return int(candidates[0])
+
+
+def uct_scores(wins: np.ndarray, visits: np.ndarray, parent_visits, exploration_factor):
+    """
+    Vectorized uct_score for all children of one node.
+
+    Args:
+        wins (np.ndarray): Wins of each child
+        visits (np.ndarray): Visits of each child
+        parent_visits (int): Number of visits to the parent node
+        exploration_factor (float): Exploration constant (typically sqrt(2))
+
+    Returns:
+        np.ndarray: UCT score of each child, unexplored children score 10e6
+    """
+    safe_visits = np.maximum(visits, 1)
+    log_parent = math.log(max(parent_visits, 1))
+    scores = wins / safe_visits + exploration_factor * np.sqrt(log_parent / safe_visits)
+    # Favor unexplored children
+    scores[visits == 0] = 10e6
+    return scores
+
+
+def puct_scores(wins: np.ndarray, visits: np.ndarray, priors: np.ndarray, parent_visits, c_puct):
+    """
+    PUCT scores for all children of one node, as in AlphaZero:
+    Q + c_puct * P * sqrt(N_parent) / (1 + N_child).
+
+    Args:
+        wins (np.ndarray): Wins of each child
+        visits (np.ndarray): Visits of each child
+        priors (np.ndarray): Policy prior of the move into each child
+        parent_visits (int): Number of visits to the parent node
+        c_puct (float): Exploration constant
+
+    Returns:
+        np.ndarray: PUCT score of each child, unexplored children count as a draw (Q = 0.5)
+    """
+    q = np.where(visits > 0, wins / np.maximum(visits, 1), 0.5)
+    return q + c_puct * priors * math.sqrt(parent_visits) / (1 + visits)
+
+
 def uct_score(node_data, child_idx, parent_visits, exploration_factor):
     """
     Calculate the UCT (Upper Confidence Bound applied to Trees) score for a child node.
@@ -0,0 +1,266 @@
+"""Growable structure-of-arrays storage for MCTS tree nodes."""
+
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Field name -> dtype. Each field is its own contiguous array.
+FIELDS = {
+    "parent": np.int32,       # index of the parent node, -1 for the root
+    "action": np.int8,        # column played to reach the node, -1 for the root
+    "visits": np.uint32,      # number of visits
+    "wins": np.float32,       # accumulated value for the player who moved into the node
+    "prior": np.float32,      # policy prior of the move into the node
+    "expanded": np.bool_,     # True once the children have been created
+    "first_child": np.int32,  # index of the first child, -1 if none
+    "n_children": np.int8,    # number of children, stored contiguously from first_child
+    "alias": np.int32,        # node holding this position's statistics in transposition mode, -1 if none
+    "proven": np.int8,        # game-theoretic result for the player who moved into the node: 1 win, -1 loss, 0 unknown
+}
+
+# Fields holding node indices, remapped when the store is compacted
+LINK_FIELDS = ("parent", "first_child", "alias")
+
+# Order of the columns of the legacy (n, 6) node_data table
+COLUMN_FIELDS = ("parent", "action", "visits", "wins", "prior", "expanded")
+
+
+class NodeStore:
+    """
+    Node statistics stored as one NumPy array per field, grown by doubling.
+
+    Arrays are reallocated when the store grows, so callers should index the
+    fields through the store instead of keeping references to them.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = max(int(capacity), 1)
+        self.size = 0
+        for name, dtype in FIELDS.items():
+            setattr(self, name, self._empty_field(name, dtype, self.capacity))
+
+    @staticmethod
+    def _empty_field(name, dtype, capacity):
+        fill = -1 if name in LINK_FIELDS else 0
+        return np.full(capacity, fill, dtype=dtype)
+
+    def reserve(self, capacity):
+        """
+        Make room for at least 'capacity' nodes, at least doubling the capacity
+        when growth is needed so appends stay amortized O(1).
+
+        Args:
+            capacity (int): Number of nodes the store must be able to hold
+        """
+        if capacity <= self.capacity:
+            return
+        new_capacity = max(capacity, 2 * self.capacity)
+        for name, dtype in FIELDS.items():
+            field = self._empty_field(name, dtype, new_capacity)
+            field[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, field)
+        self.capacity = new_capacity
+
+    def add_nodes(self, count):
+        """
+        Append 'count' fresh nodes.
+
+        Args:
+            count (int): Number of nodes to append
+
+        Returns:
+            int: Index of the first new node
+        """
+        start = self.size
+        self.reserve(start + count)
+        self.size += count
+        return start
+
+    def compact(self, keep):
+        """
+        Keep only the nodes in 'keep', renumbered 0..len(keep)-1 in that order.
+        Node links (LINK_FIELDS) are remapped to the new indices, links to
+        dropped nodes become -1. The freed slots are reset for reuse.
+
+        Args:
+            keep (np.ndarray): Indices of the nodes to keep
+
+        Returns:
+            np.ndarray: Map from old node index to new index, -1 for dropped nodes
+        """
+        keep = np.asarray(keep, dtype=np.int64)
+        old_to_new = np.full(self.size + 1, -1, dtype=np.int32)  # last slot maps link -1
+        old_to_new[keep] = np.arange(len(keep), dtype=np.int32)
+
+        for name, dtype in FIELDS.items():
+            field = getattr(self, name)
+            kept = field[keep]
+            if name in LINK_FIELDS:
+                kept = old_to_new[kept]
+            field[:len(keep)] = kept
+            field[len(keep):self.size] = self._empty_field(name, dtype, 1)[0]
+        self.size = len(keep)
+        return old_to_new[:-1]
+
+    def memory_usage(self):
+        """
+        Report the memory held by the store.
+
+        Returns:
+            dict: Bytes allocated per field, plus 'total', 'capacity' (nodes
+            allocated) and 'size' (nodes in use)
+        """
+        usage = {name: getattr(self, name).nbytes for name in FIELDS}
+        usage["total"] = sum(usage.values())
+        usage["capacity"] = self.capacity
+        usage["size"] = self.size
+        return usage
+
+    def to_array(self):
+        """
+        Stack the used nodes into the legacy (size, 6) float table, with
+        columns ordered as COLUMN_FIELDS.
+        """
+        return np.stack([getattr(self, name)[:self.size].astype(float)
+                         for name in COLUMN_FIELDS], axis=1)
+
+
+def _shared_layout(capacity):
+    """
+    Byte offset of every field in a SharedNodeStore block, and the block size.
+    The first 8 bytes hold the node count.
+    """
+    offsets = {}
+    offset = 8
+    for name, dtype in FIELDS.items():
+        offset = -(-offset // 8) * 8  # keep every field 8-byte aligned
+        offsets[name] = offset
+        offset += capacity * np.dtype(dtype).itemsize
+    return offsets, offset
+
+
+class SharedNodeStore(NodeStore):
+    """
+    NodeStore kept in one multiprocessing.shared_memory block, so several
+    processes can work on the same tree.
+
+    The capacity is fixed, since the block cannot grow. Node allocation is
+    serialized by a lock shared between the processes; updates to the node
+    fields are left to the caller.
+
+    Create the store in one process and open it in others with its name,
+    capacity and lock:
+
+        store = SharedNodeStore(capacity)
+        # in a worker process
+        worker_store = SharedNodeStore(capacity, name=store.name, lock=store.lock)
+    """
+
+    def __init__(self, capacity, name=None, lock=None):
+        """
+        Args:
+            capacity (int): Maximum number of nodes
+            name (str): Name of an existing block to attach to, a new block
+                is created if None
+            lock (multiprocessing.Lock): Allocation lock shared by all
+                processes using the block, a new lock if None
+        """
+        self.capacity = max(int(capacity), 1)
+        offsets, nbytes = _shared_layout(self.capacity)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=nbytes)
+        self.lock = multiprocessing.Lock() if lock is None else lock
+
+        self._size = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf)
+        for field_name, dtype in FIELDS.items():
+            field = np.ndarray((self.capacity,), dtype=dtype, buffer=self.shm.buf,
+                               offset=offsets[field_name])
+            if self.owner:
+                field[:] = self._empty_field(field_name, dtype, 1)[0]
+            setattr(self, field_name, field)
+        if self.owner:
+            self._size[0] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def size(self):
+        return int(self._size[0])
+
+    @size.setter
+    def size(self, value):
+        self._size[0] = value
+
+    def reserve(self, capacity):
+        if capacity > self.capacity:
+            raise MemoryError(f"SharedNodeStore is full ({self.capacity} nodes)")
+
+    def add_nodes(self, count):
+        with self.lock:
+            return super().add_nodes(count)
+
+    def to_node_store(self):
+        """
+        Copy the used nodes into a private NodeStore.
+        """
+        store = NodeStore(capacity=self.size)
+        store.add_nodes(self.size)
+        for name in FIELDS:
+            getattr(store, name)[:] = getattr(self, name)[:self.size]
+        return store
+
+    def close(self):
+        """
+        Detach from the block. The owner also frees it.
+        """
+        # Views into the block must be released before it can be closed
+        self._size = None
+        for name in FIELDS:
+            setattr(self, name, None)
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class NodeDataView:
+    """
+    Array-like view of a NodeStore with the layout of the legacy (n, 6) float
+    node_data table. Indexing with (rows, column) reads or writes the
+    underlying field directly; any other index reads from a stacked copy.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    @property
+    def shape(self):
+        return (self.store.size, len(COLUMN_FIELDS))
+
+    def __len__(self):
+        return self.store.size
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.store.to_array()
+        return arr if dtype is None else arr.astype(dtype)
+
+    def _field(self, key):
+        if isinstance(key, tuple) and len(key) == 2 and isinstance(key[1], (int, np.integer)):
+            rows, col = key
+            field = getattr(self.store, COLUMN_FIELDS[col])[:self.store.size]
+            return field, rows
+        return None, None
+
+    def __getitem__(self, key):
+        field, rows = self._field(key)
+        if field is not None:
+            return field[rows]
+        return self.store.to_array()[key]
+
+    def __setitem__(self, key, value):
+        field, rows = self._field(key)
+        if field is None:
+            raise TypeError("node_data only supports assignment to a single column")
+        field[rows] = value
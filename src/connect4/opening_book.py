@@ -0,0 +1,184 @@
+"""Opening book: best moves of early positions, precomputed and memory-mapped.
+
+The book is a directory of .npy files sorted by canonical position hash, so a
+position and its left-right mirror image share one entry. Moves are stored
+for the canonical orientation and mirrored back on lookup.
+"""
+
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from connect4 import board, data_collector
+from connect4.mcts import MCTSTree
+
+# Field name -> dtype, one entry per position
+FIELDS = {
+    "hashes": np.uint64,  # canonical Zobrist hash, sorted
+    "moves": np.int8,     # best column in the canonical orientation
+    "values": np.float32, # probability that player 1 wins
+}
+
+META_FILE = "book.json"
+
+
+class BookEntry(NamedTuple):
+    """
+    Book answer for a position.
+
+    Attributes:
+        move (int): Best column for the player to move
+        value (float): Probability that player 1 wins
+    """
+    move: int
+    value: float
+
+
+def _field_path(directory, name):
+    return os.path.join(directory, f"{name}.npy")
+
+
+def _state(position, player):
+    if isinstance(position, board.GameState):
+        return position
+    return board.GameState.from_array(position, player)
+
+
+def opening_positions(root_board=None, player=1, depth=4):
+    """
+    Non-terminal positions reachable from the root in at most 'depth' moves,
+    one per canonical hash.
+
+    Args:
+        root_board (np.ndarray): Start position, the empty board if None
+        player (int): Player to move at the root
+        depth (int): Number of moves to look ahead
+
+    Returns:
+        list[board.GameState]: Positions in breadth-first order
+    """
+    root_board = np.zeros((6, 7), dtype=int) if root_board is None else root_board
+    root = board.GameState.from_array(root_board, player)
+    if root.is_terminal:
+        return []
+    seen = {root.canonical_hash()}
+    positions = [root]
+    frontier = [root]
+    for _ in range(depth):
+        next_frontier = []
+        for state in frontier:
+            for col in state.legal_moves():
+                child = state.copy()
+                child.play(col)
+                key = child.canonical_hash()
+                if child.is_terminal or key in seen:
+                    continue
+                seen.add(key)
+                next_frontier.append(child)
+        positions.extend(next_frontier)
+        frontier = next_frontier
+    return positions
+
+
+def build_opening_book(directory, depth=4, iterations=20000, solver=None, root_board=None,
+                       player=1, **tree_kwargs):
+    """
+    Search every position up to 'depth' moves from the root and write the
+    results as an opening book. Meant to run offline, once.
+
+    Args:
+        directory (str): Output directory, created if needed
+        depth (int): Number of moves from the root covered by the book
+        iterations (int): MCTS iterations per position
+        solver (solver.Solver): Exact solver used instead of MCTS if given,
+            only practical for positions close to the end of the game
+        root_board (np.ndarray): Start position, the empty board if None
+        player (int): Player to move at the root
+        **tree_kwargs: Extra MCTSTree arguments, e.g. selection="puct"
+
+    Returns:
+        int: Number of positions in the book
+    """
+    positions = opening_positions(root_board, player, depth)
+    n = len(positions)
+    hashes = np.zeros(n, dtype=FIELDS["hashes"])
+    moves = np.zeros(n, dtype=FIELDS["moves"])
+    values = np.zeros(n, dtype=FIELDS["values"])
+    for i, state in enumerate(positions):
+        if solver is not None:
+            move, result = solver.best_move(state)
+            value = (result.outcome * state.player + 1) / 2
+        else:
+            tree = MCTSTree(state.board, player=state.player, iterations=iterations,
+                            **tree_kwargs)
+            for _ in range(iterations):
+                tree.mcts_step()
+            move = tree.select_best_child()
+            value, _ = data_collector.convert_mcts_nodes_data_to_target(
+                tree.node_data, player_perspective=state.player)
+        hashes[i] = state.canonical_hash()
+        moves[i] = 6 - move if state.is_mirrored() else move
+        values[i] = value
+
+    order = np.argsort(hashes)
+    os.makedirs(directory, exist_ok=True)
+    for name, data in (("hashes", hashes), ("moves", moves), ("values", values)):
+        np.save(_field_path(directory, name), data[order])
+    max_pieces = max((state.n_pieces for state in positions), default=-1)
+    with open(os.path.join(directory, META_FILE), "w") as f:
+        json.dump({"n_positions": n, "max_pieces": max_pieces}, f, indent=1)
+    return n
+
+
+class OpeningBook:
+    """
+    Read-only opening book written by build_opening_book.
+
+    The fields are memory-mapped, so only the pages touched by the binary
+    search of a lookup are read from disk. A pickled book is reopened from
+    its directory, so worker processes map the files themselves.
+    """
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory (str): Directory holding the book
+        """
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE)) as f:
+            self.max_pieces = json.load(f)["max_pieces"]
+        self.hashes, self.moves, self.values = (
+            np.load(_field_path(directory, name), mmap_mode="r") for name in FIELDS)
+
+    def __reduce__(self):
+        # Reopen the memory maps from the directory instead of pickling the arrays
+        return OpeningBook, (self.directory,)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __contains__(self, position):
+        return self.lookup(position) is not None
+
+    def lookup(self, position, player=None):
+        """
+        Find a position in the book, in O(log n).
+
+        Args:
+            position (board.GameState | np.ndarray): Position to look up
+            player (int): Player to move for an array, inferred if None
+
+        Returns:
+            BookEntry: The book move and value, None if the position is not in the book
+        """
+        state = _state(position, player)
+        if state.is_terminal or state.n_pieces > self.max_pieces:
+            return None
+        key = np.uint64(state.canonical_hash())
+        i = int(np.searchsorted(self.hashes, key))
+        if i == len(self.hashes) or self.hashes[i] != key:
+            return None
+        move = int(self.moves[i])
+        return BookEntry(6 - move if state.is_mirrored() else move, float(self.values[i]))
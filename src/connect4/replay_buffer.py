@@ -0,0 +1,136 @@
+"""Fixed-capacity replay buffer of training positions, memory-mapped on disk."""
+
+import os
+
+import numpy as np
+
+# Field name -> (dtype, shape of one sample)
+FIELDS = {
+    "boards": (np.int8, (6, 7)),     # position, 1 for X, -1 for O
+    "policies": (np.float16, (7,)),  # policy target
+    "values": (np.float16, ()),      # value target, probability that player 1 wins
+    "inserted_at": (np.int64, ()),   # insertion step: samples appended before this one
+}
+
+COUNTER_FILE = "appended.npy"
+
+
+class ReplayBuffer:
+    """
+    Ring buffer of the most recent 'capacity' training samples, with one
+    np.memmap .npy file per field in a directory.
+
+    Appends overwrite the oldest sample in O(1). The number of samples ever
+    appended is kept in its own memmap, so other processes opening the same
+    directory with readonly=True sample from the live buffer without copying.
+    A sample's age is the number of samples appended after it, i.e.
+    n_appended - 1 - inserted_at.
+    """
+
+    def __init__(self, directory, capacity=None, readonly=False):
+        """
+        Args:
+            directory (str): Directory holding the buffer, created if needed
+            capacity (int): Number of samples of a new buffer, ignored when the
+                directory already holds one
+            readonly (bool): Open an existing buffer for sampling only
+        """
+        self.directory = directory
+        counter_path = os.path.join(directory, COUNTER_FILE)
+        if os.path.exists(counter_path):
+            mode = "r" if readonly else "r+"
+            self._appended = np.load(counter_path, mmap_mode=mode)
+            for name in FIELDS:
+                setattr(self, name, np.load(self._path(name), mmap_mode=mode))
+        else:
+            if readonly:
+                raise FileNotFoundError(f"No replay buffer in {directory}")
+            if capacity is None or capacity < 1:
+                raise ValueError("capacity must be at least 1 for a new replay buffer")
+            os.makedirs(directory, exist_ok=True)
+            for name, (dtype, shape) in FIELDS.items():
+                setattr(self, name, np.lib.format.open_memmap(
+                    self._path(name), mode="w+", dtype=dtype, shape=(capacity,) + shape))
+            self._appended = np.lib.format.open_memmap(counter_path, mode="w+", dtype=np.int64,
+                                                       shape=(1,))
+        self.capacity = len(self.boards)
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.npy")
+
+    @property
+    def n_appended(self):
+        return int(self._appended[0])
+
+    def __len__(self):
+        return min(self.n_appended, self.capacity)
+
+    def append(self, board_arr, policy, value):
+        """
+        Append one sample, overwriting the oldest one when the buffer is full.
+        """
+        slot = self.n_appended % self.capacity
+        self.boards[slot] = board_arr
+        self.policies[slot] = policy
+        self.values[slot] = value
+        self.inserted_at[slot] = self.n_appended
+        self._appended[0] += 1
+
+    def extend(self, boards, policies, values):
+        """
+        Append a batch of samples with one vectorized write per field.
+
+        Args:
+            boards (np.ndarray): (N, 6, 7) positions
+            policies (np.ndarray): (N, 7) policy targets
+            values (np.ndarray): (N,) value targets
+        """
+        n = len(boards)
+        start = self.n_appended
+        # Only the last 'capacity' samples of a large batch survive
+        keep = slice(max(0, n - self.capacity), n)
+        steps = np.arange(start, start + n)[keep]
+        slots = steps % self.capacity
+        self.boards[slots] = np.asarray(boards)[keep]
+        self.policies[slots] = np.asarray(policies)[keep]
+        self.values[slots] = np.asarray(values)[keep]
+        self.inserted_at[slots] = steps
+        self._appended[0] += n
+
+    def sample(self, batch_size, half_life=None, rng=None):
+        """
+        Draw a minibatch with replacement.
+
+        Args:
+            batch_size (int): Number of samples
+            half_life (float): If set, weight samples by 0.5 ** (age / half_life),
+                favouring recent positions. Uniform over the buffer if None
+            rng (np.random.Generator): Source of the sampled indices
+
+        Returns:
+            dict[str, np.ndarray]: One array per field, copied out of the buffer
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        n = len(self)
+        if n == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+        last = self.n_appended - 1
+        if half_life is None:
+            ages = rng.integers(0, n, size=batch_size)
+        else:
+            # Inverse transform sampling of an exponential distribution over
+            # ages 0..n-1, truncated to the filled part of the buffer
+            ratio = 0.5 ** (1 / half_life)
+            u = rng.random(batch_size)
+            ages = np.floor(np.log1p(-u * (1 - ratio ** n)) / np.log(ratio)).astype(np.int64)
+            ages = np.minimum(ages, n - 1)
+        slots = (last - ages) % self.capacity
+        return {name: np.asarray(getattr(self, name)[slots]) for name in FIELDS}
+
+    def flush(self):
+        """
+        Write pending changes to disk.
+        """
+        for name in FIELDS:
+            getattr(self, name).flush()
+        self._appended.flush()
@@ -0,0 +1,153 @@
+"""Root-parallel MCTS: independent trees in worker processes, merged at the root."""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+from typing import NamedTuple
+
+import numpy as np
+
+from connect4.mcts import MCTSTree
+
+
+class RootStatistics(NamedTuple):
+    """
+    Root child statistics indexed by column, summed over trees.
+
+    Attributes:
+        visits (np.ndarray): (7,) visits of the child reached by each column
+        wins (np.ndarray): (7,) wins of those children, for the root player
+        n_trees (int): Number of trees merged
+        proven (np.ndarray): (7,) proven result of each column for the root
+            player, 1 win, -1 loss, 0 unknown. None if no tree proved anything
+    """
+    visits: np.ndarray
+    wins: np.ndarray
+    n_trees: int
+    proven: np.ndarray = None
+
+    def best_move(self):
+        """
+        Column with the best merged win rate, the rule of MCTSTree.select_best_child:
+        a proven win first, and proven losses only if every visited column loses.
+        """
+        proven = np.zeros(7, dtype=np.int8) if self.proven is None else self.proven
+        if np.any(proven == 1):
+            return int(np.argmax(proven == 1))
+        win_rate = np.where(self.visits > 0, self.wins / np.maximum(self.visits, 1), -np.inf)
+        lost = proven == -1
+        if np.any(~lost & (self.visits > 0)):
+            win_rate[lost] = -np.inf
+        return int(np.argmax(win_rate))
+
+    def merge(self, other):
+        # Proofs are exact, a column proven in any tree is proven in the merge
+        if self.proven is None or other.proven is None:
+            proven = other.proven if self.proven is None else self.proven
+        else:
+            proven = np.where(self.proven != 0, self.proven, other.proven)
+        return RootStatistics(self.visits + other.visits, self.wins + other.wins,
+                              self.n_trees + other.n_trees, proven)
+
+
+def root_statistics(tree):
+    """
+    Collect the root child statistics of a searched tree.
+
+    Args:
+        tree (MCTSTree): Searched tree
+
+    Returns:
+        RootStatistics: Statistics of a single tree
+    """
+    children = tree.get_children(0)
+    actions = tree.nodes.action[children].astype(np.int64)
+    visits = np.zeros(7, dtype=np.int64)
+    wins = np.zeros(7)
+    proven = np.zeros(7, dtype=np.int8)
+    # Children sharing a position in transposition mode read the node holding it
+    aliases = tree.nodes.alias[children]
+    targets = np.where(aliases >= 0, aliases, children)
+    visits[actions] = tree.nodes.visits[targets]
+    wins[actions] = tree.nodes.wins[targets]
+    proven[actions] = tree.nodes.proven[targets]
+    return RootStatistics(visits, wins, 1, proven)
+
+
+def search_tree(root_board, player, iterations, seed, tree_kwargs=None):
+    """
+    Build and search one tree with its own random seed. Runs in the worker
+    processes of root_parallel_search.
+
+    Args:
+        root_board (np.ndarray): Board to search from
+        player (int): Player to move at the root
+        iterations (int): Number of MCTS iterations
+        seed (int): Seed for the rollouts and the tree's generator
+        tree_kwargs (dict): Extra MCTSTree arguments
+
+    Returns:
+        RootStatistics: Root child statistics of the tree
+    """
+    random.seed(seed)
+    tree = MCTSTree(root_board, player=player, iterations=iterations,
+                    rng=np.random.default_rng(seed), **(tree_kwargs or {}))
+    for _ in range(iterations):
+        tree.mcts_step()
+    return root_statistics(tree)
+
+
+def root_parallel_search(root_board, player=1, iterations=1000, n_trees=None, seed=None,
+                         executor=None, **tree_kwargs):
+    """
+    Search 'n_trees' independent trees from the same position in parallel and
+    merge their root statistics.
+
+    Each tree runs 'iterations' iterations in a worker process with its own
+    seed, so K trees give K times the playouts per move in the time of one.
+
+    Args:
+        root_board (np.ndarray): Board to search from
+        player (int): Player to move at the root
+        iterations (int): MCTS iterations per tree
+        n_trees (int): Number of trees, one per CPU if None
+        seed (int): Base seed, tree i uses seed + i. Drawn at random if None
+        executor (concurrent.futures.Executor): Executor to run the trees on,
+            a ProcessPoolExecutor with one worker per tree if None
+        **tree_kwargs: Extra MCTSTree arguments, e.g. exploration_factor
+
+    Returns:
+        RootStatistics: Merged statistics, best_move() picks the move. If the
+            position is in the opening book given as tree_kwargs["book"],
+            nothing is searched: the statistics of no tree hold a single
+            visit of the book move, with the book value
+    """
+    book = tree_kwargs.get("book")
+    entry = book.lookup(root_board, player) if book is not None else None
+    if entry is not None:
+        visits = np.zeros(7, dtype=np.int64)
+        wins = np.zeros(7)
+        visits[entry.move] = 1
+        wins[entry.move] = entry.value if player == 1 else 1 - entry.value
+        return RootStatistics(visits, wins, 0)
+
+    n_trees = n_trees or os.cpu_count() or 1
+    if seed is None:
+        seed = random.randrange(2 ** 31)
+    seeds = [seed + i for i in range(n_trees)]
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=n_trees)
+    try:
+        futures = [executor.submit(search_tree, root_board, player, iterations, s, tree_kwargs)
+                   for s in seeds]
+        stats = [future.result() for future in futures]
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    merged = stats[0]
+    for other in stats[1:]:
+        merged = merged.merge(other)
+    return merged
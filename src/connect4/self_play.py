@@ -0,0 +1,299 @@
+"""Self-play game generation on Ray actors or a local process pool."""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import random
+from typing import NamedTuple
+
+import numpy as np
+
+from connect4 import data_collector
+from connect4.mcts import MCTSTree
+from connect4.opening_book import OpeningBook
+
+
+class GameRecord(NamedTuple):
+    """
+    One self-play game, one entry per position played from.
+
+    Attributes:
+        boards (np.ndarray): (T, 6, 7) int8 positions before each move
+        players (np.ndarray): (T,) player to move in each position
+        policies (np.ndarray): (T, 7) root visit distributions
+        values (np.ndarray): (T,) search estimates that player 1 wins
+        result (int): 1 if player 1 won, -1 if player 2 won, 0 for a draw
+        weights_version (int): Version of the model weights that played the game
+    """
+    boards: np.ndarray
+    players: np.ndarray
+    policies: np.ndarray
+    values: np.ndarray
+    result: int
+    weights_version: int
+
+
+def play_game(iterations=200, evaluator=None, exploration_moves=0, rng=None,
+              weights_version=0, book=None, **tree_kwargs):
+    """
+    Play one game of MCTS against itself, reusing the tree between moves.
+
+    Args:
+        iterations (int): MCTS iterations per move
+        evaluator (Evaluator): Leaf evaluator, random rollouts if None
+        exploration_moves (int): Number of opening moves sampled from the root
+            visit distribution instead of picking the best child
+        rng (np.random.Generator): Source of the sampled moves
+        weights_version (int): Recorded in the returned GameRecord
+        book (opening_book.OpeningBook): Positions found in the book after the
+            exploration moves are played from it without searching, with the
+            book move as policy target. Sampled moves are always searched, so
+            games still differ in their openings
+        **tree_kwargs: Extra MCTSTree arguments, e.g. selection="puct"
+
+    Returns:
+        GameRecord: The positions, search targets and result of the game
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    tree = MCTSTree(np.zeros((6, 7), dtype=int), player=1, iterations=iterations,
+                    evaluator=evaluator, rng=rng, book=book, **tree_kwargs)
+    boards, players, policies, values = [], [], [], []
+    while not tree.root_state.is_terminal:
+        explore = len(boards) < exploration_moves
+        entry = None if explore else tree.book_entry()
+        if entry is not None:
+            value, policy = entry.value, np.eye(7)[entry.move]
+        else:
+            for _ in range(iterations):
+                tree.mcts_step()
+            value, policy = data_collector.convert_mcts_nodes_data_to_target(
+                tree.node_data, player_perspective=tree.player)
+        boards.append(tree.root_board.astype(np.int8))
+        players.append(tree.player)
+        policies.append(policy)
+        values.append(value)
+
+        if explore:
+            col = int(rng.choice(7, p=policy))
+        else:
+            col = tree.select_best_child()
+        tree.advance(col)
+
+    return GameRecord(np.stack(boards), np.array(players, dtype=np.int8), np.stack(policies),
+                      np.array(values), int(tree.root_state.result), weights_version)
+
+
+class GameCollector:
+    """
+    Gathers finished games from the self-play workers.
+    """
+
+    def __init__(self):
+        self.games = []
+        self.n_positions = 0
+
+    def add(self, game):
+        self.games.append(game)
+        self.n_positions += len(game.boards)
+
+    def count(self):
+        return len(self.games)
+
+    def drain(self):
+        """
+        Return the collected games and start over.
+        """
+        games, self.games = self.games, []
+        return games
+
+
+class SelfPlayWorker:
+    """
+    Plays self-play games with the latest model weights it was sent.
+
+    The evaluator is built from the weights by 'evaluator_factory', a picklable
+    callable taking the weights and returning an Evaluator. Without a factory
+    the games use random rollouts and the weights are only versioned.
+    """
+
+    def __init__(self, evaluator_factory=None, iterations=200, exploration_moves=0, seed=None,
+                 tree_kwargs=None, book_path=None):
+        """
+        Args:
+            evaluator_factory (callable): Builds an Evaluator from model weights
+            iterations (int): MCTS iterations per move
+            exploration_moves (int): Opening moves sampled from the visit distribution
+            seed (int): Seed for the rollouts and sampled moves
+            tree_kwargs (dict): Extra MCTSTree arguments
+            book_path (str): Opening book directory, memory-mapped by each worker
+        """
+        self.evaluator_factory = evaluator_factory
+        self.iterations = iterations
+        self.exploration_moves = exploration_moves
+        self.tree_kwargs = tree_kwargs or {}
+        self.book = OpeningBook(book_path) if book_path is not None else None
+        self.rng = np.random.default_rng(seed)
+        if seed is not None:
+            random.seed(seed)
+        self.evaluator = None
+        self.weights_version = 0
+
+    def set_weights(self, weights, version):
+        """
+        Switch to new model weights for the following games.
+        """
+        if self.evaluator_factory is not None:
+            self.evaluator = self.evaluator_factory(weights)
+        self.weights_version = version
+
+    def play(self, n_games, collector=None):
+        """
+        Play 'n_games' games, sending each finished game to the collector.
+
+        Args:
+            n_games (int): Number of games to play
+            collector (GameCollector): Local collector or Ray actor handle to
+                stream the games to, if None the games are returned
+
+        Returns:
+            list[GameRecord] | int: The games, or their number if a collector was given
+        """
+        games, pending = [], []
+        for _ in range(n_games):
+            game = play_game(self.iterations, self.evaluator, self.exploration_moves, self.rng,
+                             self.weights_version, self.book, **self.tree_kwargs)
+            if collector is None:
+                games.append(game)
+            elif hasattr(collector.add, "remote"):
+                pending.append(collector.add.remote(game))
+            else:
+                collector.add(game)
+        if pending:
+            # Games are streamed as they finish, wait until the collector has them all
+            import ray
+            ray.get(pending)
+        return games if collector is None else n_games
+
+
+def _play_games(worker_kwargs, weights, version, n_games):
+    """
+    Play games in a pool process, see SelfPlayPool.
+    """
+    worker = SelfPlayWorker(**worker_kwargs)
+    if weights is not None:
+        worker.set_weights(weights, version)
+    return worker.play(n_games)
+
+
+class SelfPlayPool:
+    """
+    Runs self-play workers in parallel and gathers their games.
+
+    With backend="ray", every worker is a Ray actor streaming its games to a
+    GameCollector actor, and broadcast_weights puts the weights in the object
+    store once for all actors. ray.init() must have been called, local_mode=True
+    works for tests. With backend="process", the games are played by a
+    ProcessPoolExecutor and every task is sent the latest weights.
+    backend="auto" picks Ray when it is installed and initialized.
+    """
+
+    def __init__(self, n_workers=2, backend="auto", evaluator_factory=None, iterations=200,
+                 exploration_moves=0, seed=None, tree_kwargs=None, book_path=None):
+        """
+        Args:
+            n_workers (int): Number of parallel workers
+            backend (str): "ray", "process" or "auto"
+            evaluator_factory (callable): Builds an Evaluator from model weights
+            iterations (int): MCTS iterations per move
+            exploration_moves (int): Opening moves sampled from the visit distribution
+            seed (int): Base seed, worker i uses seed + i
+            tree_kwargs (dict): Extra MCTSTree arguments
+            book_path (str): Opening book directory, see SelfPlayWorker
+        """
+        if backend == "auto":
+            backend = "ray" if _ray_initialized() else "process"
+        if backend not in ("ray", "process"):
+            raise ValueError(f"Unknown backend {backend!r}, expected 'ray', 'process' or 'auto'")
+        self.backend = backend
+        self.n_workers = n_workers
+        self.weights = None
+        self.weights_version = 0
+        seed = random.randrange(2 ** 31) if seed is None else seed
+        self._worker_kwargs = [dict(evaluator_factory=evaluator_factory, iterations=iterations,
+                                    exploration_moves=exploration_moves, seed=seed + i,
+                                    tree_kwargs=tree_kwargs, book_path=book_path)
+                              for i in range(n_workers)]
+        self._task = 0  # varies the seeds of successive process tasks
+
+        if backend == "ray":
+            import ray
+            RemoteWorker = ray.remote(SelfPlayWorker)
+            self.actors = [RemoteWorker.remote(**kwargs) for kwargs in self._worker_kwargs]
+            self.collector = ray.remote(GameCollector).remote()
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=n_workers)
+            self.collector = GameCollector()
+
+    def broadcast_weights(self, weights):
+        """
+        Send new model weights to all workers, used by the games started afterwards.
+
+        Returns:
+            int: The new weights version
+        """
+        self.weights = weights
+        self.weights_version += 1
+        if self.backend == "ray":
+            import ray
+            weights_ref = ray.put(weights)
+            ray.get([actor.set_weights.remote(weights_ref, self.weights_version)
+                     for actor in self.actors])
+        return self.weights_version
+
+    def generate(self, n_games):
+        """
+        Play 'n_games' games spread over the workers.
+
+        Returns:
+            list[GameRecord]: The finished games, in completion order
+        """
+        shares = [n_games // self.n_workers + (i < n_games % self.n_workers)
+                  for i in range(self.n_workers)]
+        if self.backend == "ray":
+            import ray
+            ray.get([actor.play.remote(share, self.collector)
+                     for actor, share in zip(self.actors, shares) if share > 0])
+            return ray.get(self.collector.drain.remote())
+
+        futures = []
+        for kwargs, share in zip(self._worker_kwargs, shares):
+            if share > 0:
+                task_kwargs = dict(kwargs, seed=kwargs["seed"] + self._task * self.n_workers)
+                futures.append(self.executor.submit(
+                    _play_games, task_kwargs, self.weights, self.weights_version, share))
+        self._task += 1
+        for future in as_completed(futures):
+            for game in future.result():
+                self.collector.add(game)
+        return self.collector.drain()
+
+    def close(self):
+        if self.backend == "ray":
+            import ray
+            for actor in self.actors:
+                ray.kill(actor)
+            ray.kill(self.collector)
+        else:
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _ray_initialized():
+    try:
+        import ray
+    except ImportError:
+        return False
+    return ray.is_initialized()
@@ -0,0 +1,231 @@
+"""Exact Connect 4 solver: negamax alpha-beta search on bitboards.
+
+Positions are stored as two bit masks in the layout of ``connect4.bitboard``:
+``current`` holds the stones of the player to move and ``mask`` all stones.
+
+Scores follow the usual convention for solved Connect 4: a position won by
+the player to move scores 22 minus the number of stones the winner has
+placed, counting the winning stone, i.e. ``(43 - n) // 2`` for a win placed
+after ``n`` stones. Losses score the negative of the opponent's win, draws
+score 0. Larger wins are faster wins.
+"""
+
+from typing import NamedTuple
+
+from connect4 import bitboard, board
+from connect4.bitboard import BOARD_MASK, BOTTOM_MASK, DIRECTIONS, H1, HEIGHT, WIDTH
+from connect4.transposition import TranspositionTable
+
+N_CELLS = WIDTH * HEIGHT
+
+# Center columns first, they take part in more lines
+COLUMN_ORDER = tuple(sorted(range(WIDTH), key=lambda col: abs(col - WIDTH // 2)))
+BOTTOM_BITS = tuple(1 << (col * H1) for col in range(WIDTH))
+TOP_BITS = tuple(1 << (col * H1 + HEIGHT - 1) for col in range(WIDTH))
+COLUMN_MASKS = tuple(((1 << HEIGHT) - 1) << (col * H1) for col in range(WIDTH))
+
+
+class SolveResult(NamedTuple):
+    """
+    Exact value of a position for the player to move.
+
+    Attributes:
+        outcome (int): 1 for a win, -1 for a loss, 0 for a draw
+        score (int): Solver score, see the module docstring
+        distance (int): Number of moves until the game ends under perfect play,
+            the winner winning as fast and the loser losing as slowly as possible
+    """
+    outcome: int
+    score: int
+    distance: int
+
+
+def winning_cells(position, mask):
+    """
+    Empty cells that would complete a line of four for the stones in 'position'.
+    """
+    # Vertical: three stones below the cell
+    cells = (position << 1) & (position << 2) & (position << 3)
+    for shift in DIRECTIONS[1:]:
+        pair = (position << shift) & (position << 2 * shift)
+        cells |= pair & (position << 3 * shift)
+        cells |= pair & (position >> shift)
+        pair = (position >> shift) & (position >> 2 * shift)
+        cells |= pair & (position << shift)
+        cells |= pair & (position >> 3 * shift)
+    return cells & (BOARD_MASK ^ mask)
+
+
+def _score_distance(score, n_moves):
+    """
+    Moves until the end of the game for a solved score, see SolveResult.
+    """
+    if score == 0:
+        return N_CELLS - n_moves
+    # The winning stone is placed after N_CELLS + 1 - 2 * |score| or one stone
+    # fewer, the count with the winner's parity: the player to move places
+    # stones n_moves, n_moves + 2, ...
+    before_win = N_CELLS + 1 - 2 * abs(score)
+    if (before_win - n_moves) % 2 != (0 if score > 0 else 1):
+        before_win -= 1
+    return before_win - n_moves + 1
+
+
+class Solver:
+    """
+    Solves positions exactly with a null-window negamax search.
+
+    The search runs repeated null-window searches that narrow the range of
+    possible scores, trying the faster wins and losses first (iterative
+    deepening on the game length). Moves are ordered center first, moves that
+    let the opponent win at once are pruned, and upper bounds are kept in a
+    TranspositionTable that persists between calls.
+    """
+
+    def __init__(self, tt_capacity=1 << 20):
+        """
+        Args:
+            tt_capacity (int): Maximum number of positions in the transposition table
+        """
+        self.table = TranspositionTable(tt_capacity)
+        self.node_count = 0
+
+    def solve(self, position, player=None):
+        """
+        Solve a position.
+
+        Args:
+            position (board.GameState | np.ndarray): Position to solve
+            player (int): Player to move for an array, inferred if None
+
+        Returns:
+            SolveResult: Exact result for the player to move
+        """
+        state = self._state(position, player)
+        if state.is_terminal:
+            # The previous move ended the game
+            score = 0 if state.result == 0 else -((N_CELLS + 2 - state.n_pieces) // 2)
+            return SolveResult(0 if score == 0 else -1, score, 0)
+
+        current, mask = self._masks(state)
+        score = self._solve(current, mask, state.n_pieces)
+        return SolveResult((score > 0) - (score < 0), score, _score_distance(score, state.n_pieces))
+
+    def best_move(self, position, player=None):
+        """
+        Find a move reaching the position's exact value, the most central one
+        if several do.
+
+        Args:
+            position (board.GameState | np.ndarray): Non-terminal position
+            player (int): Player to move for an array, inferred if None
+
+        Returns:
+            tuple: (col, SolveResult) with the move and the position's result
+        """
+        state = self._state(position, player)
+        if state.is_terminal:
+            raise ValueError("Cannot pick a move in a finished game")
+        current, mask = self._masks(state)
+        n_moves = state.n_pieces
+        best_col, best_score = None, None
+        for col in COLUMN_ORDER:
+            if mask & TOP_BITS[col]:
+                continue
+            if self._is_winning_move(current, mask, col):
+                best_col, best_score = col, (N_CELLS + 1 - n_moves) // 2
+                break
+            new_mask = mask | (mask + BOTTOM_BITS[col])
+            score = -self._solve(current ^ mask, new_mask, n_moves + 1)
+            if best_score is None or score > best_score:
+                best_col, best_score = col, score
+        outcome = (best_score > 0) - (best_score < 0)
+        return best_col, SolveResult(outcome, best_score, _score_distance(best_score, n_moves))
+
+    @staticmethod
+    def _state(position, player):
+        if isinstance(position, board.GameState):
+            return position
+        return board.GameState.from_array(position, player)
+
+    @staticmethod
+    def _masks(state):
+        current = state.x_mask if state.player == 1 else state.o_mask
+        return current, state.x_mask | state.o_mask
+
+    @staticmethod
+    def _is_winning_move(current, mask, col):
+        bit = (mask + BOTTOM_BITS[col]) & COLUMN_MASKS[col]
+        return bitboard.has_won(current | bit)
+
+    def _solve(self, current, mask, n_moves):
+        if n_moves == N_CELLS:
+            return 0
+        for col in range(WIDTH):
+            if not mask & TOP_BITS[col] and self._is_winning_move(current, mask, col):
+                return (N_CELLS + 1 - n_moves) // 2
+
+        low = -((N_CELLS - n_moves) // 2)
+        high = (N_CELLS + 1 - n_moves) // 2
+        while low < high:
+            # Probe for fast wins and losses first, they need the shallowest searches
+            med = low + (high - low) // 2
+            if med <= 0 and int(low / 2) < med:
+                med = int(low / 2)
+            elif med >= 0 and int(high / 2) > med:
+                med = int(high / 2)
+            score = self._negamax(current, mask, n_moves, med, med + 1)
+            if score <= med:
+                high = score
+            else:
+                low = score
+        return low
+
+    def _negamax(self, current, mask, n_moves, alpha, beta):
+        """
+        Score of a position without an immediate win for the player to move,
+        exact inside (alpha, beta), an upper bound below alpha and a lower
+        bound above beta.
+        """
+        self.node_count += 1
+        opponent = current ^ mask
+        possible = (mask + BOTTOM_MASK) & BOARD_MASK
+        threats = winning_cells(opponent, mask)
+        forced = possible & threats
+        if forced:
+            if forced & (forced - 1):
+                # Two threats cannot both be blocked
+                return -((N_CELLS - n_moves) // 2)
+            possible = forced
+        # Never play below a cell where the opponent would win
+        possible &= ~(threats >> 1)
+        if not possible:
+            return -((N_CELLS - n_moves) // 2)
+        if n_moves >= N_CELLS - 2:
+            return 0
+
+        low = -((N_CELLS - 2 - n_moves) // 2)
+        if alpha < low:
+            alpha = low
+            if alpha >= beta:
+                return alpha
+        high = (N_CELLS - 1 - n_moves) // 2
+        key = bitboard.position_key(current, opponent)
+        bound = self.table.get(key)
+        if bound is not None:
+            high = bound
+        if beta > high:
+            beta = high
+            if alpha >= beta:
+                return beta
+
+        for col in COLUMN_ORDER:
+            move = possible & COLUMN_MASKS[col]
+            if move:
+                score = -self._negamax(opponent, mask | move, n_moves + 1, -beta, -alpha)
+                if score >= beta:
+                    return score
+                if score > alpha:
+                    alpha = score
+        self.table.put(key, alpha)
+        return alpha
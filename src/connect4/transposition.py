@@ -0,0 +1,82 @@
+"""Bounded transposition table mapping positions to MCTS nodes."""
+
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    """
+    Maps position keys to the index of the node holding that position's
+    statistics, so the same position reached through different move orders
+    shares a single node.
+
+    Eviction policy: the table holds at most 'capacity' entries and evicts the
+    least recently used one (inserted or looked up longest ago) to make room.
+    Evicting an entry never invalidates the tree, nodes already linked keep
+    sharing statistics; the position is only no longer merged when it is
+    reached again through a new move order.
+    """
+
+    def __init__(self, capacity=1 << 20):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """
+        Look up a position.
+
+        Args:
+            key (int): Position key
+
+        Returns:
+            int: Node index for the position, None if it is not in the table
+        """
+        node_idx = self.entries.get(key)
+        if node_idx is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return node_idx
+
+    def put(self, key, node_idx):
+        """
+        Record the node holding a position, evicting the least recently used
+        entry if the table is full.
+
+        Args:
+            key (int): Position key
+            node_idx (int): Node index
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+        elif len(self.entries) >= self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        self.entries[key] = node_idx
+
+    def remap(self, old_to_new):
+        """
+        Renumber the stored nodes after the node store was compacted, dropping
+        entries whose node was discarded.
+
+        Args:
+            old_to_new (np.ndarray): Map from old node index to new index, -1 for dropped nodes
+        """
+        self.entries = OrderedDict(
+            (key, int(old_to_new[node_idx])) for key, node_idx in self.entries.items()
+            if old_to_new[node_idx] >= 0
+        )
+
+    def clear(self):
+        self.entries.clear()
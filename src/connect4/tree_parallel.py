@@ -0,0 +1,151 @@
+"""Tree-parallel MCTS: worker processes searching one tree in shared memory."""
+
+import multiprocessing
+import os
+import random
+
+import numpy as np
+
+from connect4 import board
+from connect4.evaluator import players_to_move
+from connect4.mcts import MCTSTree, VIRTUAL_LOSS
+from connect4.node_store import SharedNodeStore
+
+
+class SharedMCTSTree(MCTSTree):
+    """
+    MCTSTree whose updates are safe when several processes search the same
+    SharedNodeStore.
+
+    Selection reads the statistics without locking and may see slightly stale
+    values. Statistics updates and expansions take the lock of the node's
+    stripe, node i using locks[i % len(locks)], and node allocation takes the
+    store's lock, so concurrent workers neither lose updates nor create a
+    node's children twice.
+    """
+
+    def __init__(self, root_board, locks, player=1, nodes=None, **kwargs):
+        """
+        Args:
+            root_board (np.ndarray): Board to search from
+            locks (list[multiprocessing.Lock]): Striped locks shared by all workers
+            player (int): Player to move at the root
+            nodes (SharedNodeStore): Store holding the tree
+            **kwargs: Extra MCTSTree arguments, transpositions are not supported
+        """
+        if kwargs.get("transpositions"):
+            raise ValueError("SharedMCTSTree does not support transpositions")
+        super().__init__(root_board, player=player, nodes=nodes, **kwargs)
+        self.locks = locks
+
+    def _lock(self, node_idx):
+        return self.locks[int(node_idx) % len(self.locks)]
+
+    def _expand(self, node_idx, state):
+        with self._lock(node_idx):
+            super()._expand(node_idx, state)
+
+    def apply_virtual_loss(self, path, loss=VIRTUAL_LOSS):
+        for node_idx in path:
+            with self._lock(node_idx):
+                self.nodes.visits[node_idx] += 1
+                self.nodes.wins[node_idx] -= loss
+
+    def revert_virtual_loss(self, path, loss=VIRTUAL_LOSS):
+        for node_idx in path:
+            with self._lock(node_idx):
+                self.nodes.visits[node_idx] -= 1
+                self.nodes.wins[node_idx] += loss
+
+    def backpropagate(self, path, value, count=1):
+        # Nodes at odd depths were reached by a move of the root player
+        root_player_moved = np.arange(len(path)) % 2 == 1
+        values = np.where(root_player_moved == (self.player == 1), value, 1 - value)
+        for node_idx, node_value in zip(path, values):
+            with self._lock(node_idx):
+                self.nodes.visits[node_idx] += count
+                self.nodes.wins[node_idx] += count * node_value
+        # Proofs only ever go from unknown to proven, racing workers agree on them
+        if self.nodes.proven[path[-1]] != 0:
+            self._update_proven(path)
+
+
+def _search_worker(name, capacity, alloc_lock, locks, root_board, player, iterations, seed,
+                   virtual_loss, tree_kwargs):
+    """
+    Attach to the shared tree and run 'iterations' iterations on it.
+    """
+    store = SharedNodeStore(capacity, name=name, lock=alloc_lock)
+    try:
+        random.seed(seed)
+        rng = np.random.default_rng(seed)
+        tree = SharedMCTSTree(root_board, locks, player=player, nodes=store, rng=rng,
+                              **tree_kwargs)
+        for _ in range(iterations):
+            leaf_node, leaf_board, path, value = tree.select_and_expand(virtual_loss)
+            state = board.GameState.from_array(leaf_board, int(players_to_move(leaf_board[None])[0]))
+            value, count = tree.evaluate_leaf(leaf_node, state, value)
+            tree.revert_virtual_loss(path, virtual_loss)
+            tree.backpropagate(path, value, count)
+        del tree
+    finally:
+        store.close()
+
+
+def tree_parallel_search(root_board, player=1, iterations=1000, n_workers=None, seed=None,
+                         n_stripes=64, virtual_loss=VIRTUAL_LOSS, **tree_kwargs):
+    """
+    Search one tree with several worker processes sharing its node store.
+
+    Each worker selects under virtual loss, so workers spread over different
+    leaves, and scores its leaves like MCTSTree.mcts_step: exact values for
+    proven, finished and solved positions, otherwise random rollouts or the
+    evaluator given in tree_kwargs, which must be picklable.
+
+    Args:
+        root_board (np.ndarray): Board to search from
+        player (int): Player to move at the root
+        iterations (int): Total MCTS iterations, split between the workers
+        n_workers (int): Number of worker processes, one per CPU if None
+        seed (int): Base seed, worker i uses seed + i. Drawn at random if None
+        n_stripes (int): Number of locks guarding the node statistics
+        virtual_loss (float): Wins removed from each node of a pending path
+        **tree_kwargs: Extra MCTSTree arguments, e.g. exploration_factor
+
+    Returns:
+        MCTSTree: The searched tree, on a private copy of the shared nodes.
+            Unsearched if the position is in the opening book given as
+            tree_kwargs["book"]
+    """
+    book = tree_kwargs.get("book")
+    if book is not None and book.lookup(root_board, player) is not None:
+        # The book answers, select_best_child plays its move
+        return MCTSTree(root_board, player=player, **tree_kwargs)
+
+    n_workers = n_workers or os.cpu_count() or 1
+    if seed is None:
+        seed = random.randrange(2 ** 31)
+    # Every iteration expands at most one node, adding at most 7 children
+    capacity = iterations * 7 + 1
+    shares = [iterations // n_workers + (i < iterations % n_workers) for i in range(n_workers)]
+
+    store = SharedNodeStore(capacity)
+    try:
+        MCTSTree(root_board, player=player, nodes=store)  # creates the root
+        locks = [multiprocessing.Lock() for _ in range(n_stripes)]
+        workers = [multiprocessing.Process(
+            target=_search_worker,
+            args=(store.name, capacity, store.lock, locks, root_board, player, share, seed + i,
+                  virtual_loss, tree_kwargs))
+            for i, share in enumerate(shares)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        failed = [worker.exitcode for worker in workers if worker.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"{len(failed)} search workers failed, exit codes {failed}")
+        nodes = store.to_node_store()
+    finally:
+        store.close()
+    return MCTSTree(root_board, player=player, nodes=nodes, **tree_kwargs)
@@ -0,0 +1,104 @@
+from connect4 import bitboard, board
+import numpy as np
+import random
+import pytest
+
+X=1
+O=-1
+
+
+def random_game_boards(random_state, n_games, seed=0):
+    """Yield every intermediate (board, row, col, player) from random games."""
+    rng = random.Random(seed)
+    for _ in range(n_games):
+        game = random_state(42, rng, allow_end=True)
+        board_arr = np.zeros((6, 7), dtype=int)
+        player = X
+        for col in game.moves:
+            row = board.get_legal_moves(board_arr)[col]
+            board_arr = board.add_move(board_arr, player, (row, col))
+            yield board_arr, row, col, player
+            player *= -1
+
+
+def test_round_trip_empty(empty_board_arr):
+    bb = bitboard.from_array(empty_board_arr)
+    assert bb.x_mask == 0 and bb.o_mask == 0
+    assert bb.heights == (0,) * 7
+    assert np.array_equal(bitboard.to_array(bb), empty_board_arr)
+
+
+def test_round_trip_random_games(random_state):
+    for board_arr, _, _, _ in random_game_boards(random_state, 20):
+        bb = bitboard.from_array(board_arr)
+        assert np.array_equal(bitboard.to_array(bb), board_arr)
+        assert bb.heights == tuple(np.count_nonzero(board_arr, axis=0))
+
+
+def test_matches_array_engine_on_random_games(random_state):
+    for board_arr, row, col, player in random_game_boards(random_state, 50, seed=1):
+        bb = bitboard.from_array(board_arr)
+        assert bitboard.check_win(bb) == board.check_win(board_arr)
+        assert bitboard.get_legal_moves(bb) == board.get_legal_moves(board_arr)
+        assert bitboard.is_full(bb) == board.is_full(board_arr)
+        assert (bitboard.check_board_state_incremental(bb, row, col, player)
+                == board.check_board_state_incremental(board_arr, row, col, player))
+
+
+def test_add_move_matches_array_engine(empty_board_arr):
+    bb = bitboard.from_array(empty_board_arr)
+    board_arr = empty_board_arr
+    for player, col in [(X, 3), (O, 3), (X, 4), (O, 0)]:
+        row = bitboard.get_legal_moves(bb)[col]
+        bb = bitboard.add_move(bb, player, (row, col))
+        board_arr = board.add_move(board_arr, player, (row, col))
+    assert np.array_equal(bitboard.to_array(bb), board_arr)
+    assert bb.heights == (1, 0, 0, 2, 1, 0, 0)
+
+
+@pytest.mark.parametrize("player", [X, O])
+def test_no_wrap_between_columns(player):
+    # Three stones on top of column 0 and one at the bottom of column 1 are
+    # adjacent bits, but not a vertical line.
+    board_arr = np.array([
+        [player, 0, 0, 0, 0, 0, 0],
+        [player, 0, 0, 0, 0, 0, 0],
+        [player, 0, 0, 0, 0, 0, 0],
+        [-player, 0, 0, 0, 0, 0, 0],
+        [-player, 0, 0, 0, 0, 0, 0],
+        [-player, player, 0, 0, 0, 0, 0],
+    ], dtype=int)
+    bb = bitboard.from_array(board_arr)
+    assert bitboard.check_win(bb) is False
+    assert bitboard.check_board_state(bb) == (False, None)
+
+
+def test_incremental_win_only_checks_lines_through_cell():
+    board_arr = np.array([
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [X, X, X, X, 0, 0, 0],
+    ], dtype=int)
+    bb = bitboard.from_array(board_arr)
+    for i in range(4):
+        assert bitboard.check_incremental_win(bb, row=5, col=i, player=X) is True
+        assert bitboard.check_incremental_win(bb, row=5, col=i, player=O) is False
+    assert bitboard.check_incremental_win(bb, row=4, col=1, player=X) is False
+    assert bitboard.check_board_state(bb) == (True, 1)
+
+
+def test_draw_board():
+    board_arr = np.array([
+        [O, O, O, X, O, O, O],
+        [X, X, X, O, X, X, X],
+        [O, O, O, X, O, O, O],
+        [X, X, X, O, X, X, X],
+        [O, O, O, X, O, O, O],
+        [X, X, X, O, X, X, X]
+    ], dtype=int)
+    bb = bitboard.from_array(board_arr)
+    assert bitboard.get_legal_moves(bb) == {}
+    assert bitboard.check_board_state(bb) == (True, 0)
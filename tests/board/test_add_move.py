@@ -19,8 +19,8 @@ def test_get_legal_moves_some_full_columns():
     starting_board = np.array([
         [X, 0, 0, O, 0, 0, 0],
         [X, 0, 0, O, 0, 0, 0],
-        [X, 0, 0, O, 0, 0, 0],
-        [X, 0, 0, O, 0, 0, 0],
+        [O, 0, 0, X, 0, 0, 0],
+        [O, 0, 0, X, 0, 0, 0],
         [X, 0, 0, O, 0, 0, 0],
         [X, 0, 0, O, 0, 0, 0],
     ])
@@ -0,0 +1,68 @@
+from connect4.board import (
+    check_board_state, check_board_state_batch, check_incremental_win_batch, check_win,
+    check_win_batch, CELL_LINES, WIN_LINES,
+)
+from connect4 import bitboard
+import numpy as np
+import random
+
+X=1
+O=-1
+
+
+def test_win_line_tables():
+    assert WIN_LINES.shape == (69, 4)
+    # Every line through a cell really contains that cell
+    for cell in range(42):
+        assert np.all((WIN_LINES[CELL_LINES[cell]] == cell).any(axis=1))
+
+
+def test_check_incremental_win_batch_matches_single():
+    rng = np.random.default_rng(0)
+    boards = rng.choice([X, O, 0], size=(300, 6, 7))
+    rows = rng.integers(0, 6, size=300)
+    cols = rng.integers(0, 7, size=300)
+    players = rng.choice([X, O], size=300)
+
+    batched = check_incremental_win_batch(boards, rows, cols, players)
+    # Only lines through the given cell count, as in the bitboard engine
+    expected = [bitboard.check_incremental_win(bitboard.from_array(b), r, c, p)
+                for b, r, c, p in zip(boards, rows, cols, players)]
+    assert batched.tolist() == expected
+
+
+def random_valid_boards(random_state, n_boards, seed=0):
+    rng = random.Random(seed)
+    return np.stack([random_state(rng.randint(0, 42), rng, allow_end=True).board
+                     for _ in range(n_boards)])
+
+
+def test_check_win_batch_matches_single(random_state):
+    boards = random_valid_boards(random_state, 300)
+    has_win, winner = check_win_batch(boards)
+    assert has_win.tolist() == [check_win(b) for b in boards]
+    assert np.all((winner != 0) == has_win)
+
+
+def test_check_board_state_batch_matches_single(random_state):
+    boards = random_valid_boards(random_state, 300, seed=1)
+    is_terminal, result = check_board_state_batch(boards)
+    for board_arr, terminal, res in zip(boards, is_terminal, result):
+        expected_terminal, expected_result = check_board_state(board_arr)
+        assert terminal == expected_terminal
+        assert res == (expected_result or 0)
+
+
+def test_check_win_batch_winner_per_player():
+    boards = np.zeros((3, 6, 7), dtype=int)
+    boards[0, 5, 0:4] = X         # horizontal X
+    boards[1, 2:6, 6] = O         # vertical O
+    boards[2, 5, 0:3] = X         # no win
+    has_win, winner = check_win_batch(boards)
+    assert has_win.tolist() == [True, True, False]
+    assert winner.tolist() == [1, -1, 0]
+
+
+def test_check_board_state_batch_empty_stack():
+    is_terminal, result = check_board_state_batch(np.zeros((0, 6, 7), dtype=int))
+    assert is_terminal.shape == (0,) and result.shape == (0,)
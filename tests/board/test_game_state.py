@@ -0,0 +1,112 @@
+from connect4.board import GameState, get_legal_moves, add_move
+import numpy as np
+
+X=1
+O=-1
+
+
+def test_from_array_empty(empty_board_arr):
+    state = GameState.from_array(empty_board_arr)
+    assert state.player == X
+    assert state.heights == [0] * 7
+    assert state.is_terminal is False
+    assert state.legal_moves() == get_legal_moves(empty_board_arr)
+
+
+def test_from_array_infers_player_and_heights():
+    board_arr = np.zeros((6, 7), dtype=int)
+    board_arr[5, 3] = X
+    board_arr[4, 3] = O
+    board_arr[5, 0] = X
+    state = GameState.from_array(board_arr)
+    assert state.player == O
+    assert state.heights == [1, 0, 0, 2, 0, 0, 0]
+    assert state.landing_row(3) == 3
+    assert state.legal_moves() == get_legal_moves(board_arr)
+
+
+def test_add_move_tracks_heights(empty_board_arr):
+    state = GameState.from_array(empty_board_arr)
+    board_arr = empty_board_arr
+    player = X
+    for col in [3, 3, 3, 2, 0, 6, 3]:
+        row = state.landing_row(col)
+        board_arr = add_move(board_arr, player, (row, col))
+        state = state.add_move(col)
+        player = -player
+        assert np.array_equal(state.board, board_arr)
+        assert state.player == player
+        assert state.legal_moves() == get_legal_moves(board_arr)
+
+
+def test_add_move_does_not_modify_parent(empty_board_arr):
+    state = GameState.from_array(empty_board_arr)
+    child = state.add_move(4)
+    assert state.heights == [0] * 7
+    assert not np.any(state.board)
+    assert child.heights[4] == 1
+
+
+def test_no_legal_moves_when_won(winning_board):
+    state = GameState.from_array(winning_board, player=X)
+    assert len(state.legal_moves()) == 7
+
+    won = state.add_move(3)
+    assert won.is_terminal is True
+    assert won.result == X
+    assert won.legal_moves() == {}
+
+
+def test_play_undo_restores_position(empty_board_arr):
+    state = GameState.from_array(empty_board_arr)
+    snapshots = []
+    for col in [3, 2, 3, 4, 3, 6, 0]:
+        snapshots.append((state.board.copy(), state.heights.copy(), state.player,
+                          state.x_mask, state.o_mask))
+        state.play(col)
+    assert state.moves == [3, 2, 3, 4, 3, 6, 0]
+
+    for board_arr, heights, player, x_mask, o_mask in reversed(snapshots):
+        state.undo()
+        assert np.array_equal(state.board, board_arr)
+        assert state.heights == heights
+        assert state.player == player
+        assert (state.x_mask, state.o_mask) == (x_mask, o_mask)
+    assert state.moves == []
+
+
+def test_play_in_place_shares_board(empty_board_arr):
+    state = GameState.from_array(empty_board_arr)
+    board_arr = state.board
+    state.play(2)
+    assert state.board is board_arr
+    assert board_arr[5, 2] == X
+    # from_array copies its input
+    assert not np.any(empty_board_arr)
+
+
+def test_undo_clears_terminal_state():
+    board_arr = np.zeros((6, 7), dtype=int)
+    board_arr[3:6, 6] = O
+    board_arr[5, 0:3] = X
+    state = GameState.from_array(board_arr, player=O)
+    state.play(6)
+    assert state.is_terminal is True
+    assert state.result == O
+    assert state.legal_moves() == {}
+
+    assert state.undo() == 6
+    assert state.is_terminal is False
+    assert state.result is None
+    assert state.player == O
+
+
+def test_copy_is_independent(empty_board_arr):
+    state = GameState.from_array(empty_board_arr)
+    state.play(0)
+    clone = state.copy()
+    clone.play(1)
+    clone.undo()
+    clone.undo()
+    assert state.moves == [0]
+    assert state.board[5, 0] == X
@@ -18,8 +18,8 @@ def test_get_legal_moves_some_full_columns():
     starting_board = np.array([
         [X, 0, 0, O, 0, 0, 0],
         [X, 0, 0, O, 0, 0, 0],
-        [X, 0, 0, O, 0, 0, 0],
-        [X, 0, 0, O, 0, 0, 0],
+        [O, 0, 0, X, 0, 0, 0],
+        [O, 0, 0, X, 0, 0, 0],
         [X, 0, 0, O, 0, 0, 0],
         [X, 0, 0, O, 0, 0, 0],
     ])
@@ -41,3 +41,16 @@ def test_get_legal_moves_all_full():
     legal_moves = get_legal_moves(starting_board)
     expected = {}
     assert legal_moves == expected
+
+
+def test_get_legal_moves_won_board():
+    # X has four in a row on the bottom, columns still have room
+    starting_board = np.array([
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [O, O, O, 0, 0, 0, 0],
+        [X, X, X, X, 0, 0, 0],
+    ])
+    assert get_legal_moves(starting_board) == {}
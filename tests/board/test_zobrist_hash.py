@@ -0,0 +1,78 @@
+from connect4.board import (
+    GameState, canonical_hash, canonical_hash_batch, zobrist_hash, zobrist_hash_batch,
+)
+import numpy as np
+
+X=1
+O=-1
+
+
+def test_incremental_hash_matches_full_hash(empty_board_arr):
+    state = GameState.from_array(empty_board_arr)
+    assert state.hash == zobrist_hash(empty_board_arr) == 0
+    hashes = [state.hash]
+    for col in [3, 3, 2, 4, 6, 0, 3, 1]:
+        state.play(col)
+        assert state.hash == zobrist_hash(state.board)
+        assert state.mirror_hash == zobrist_hash(state.board[:, ::-1])
+        hashes.append(state.hash)
+    assert len(set(hashes)) == len(hashes)
+
+    for expected in reversed(hashes[:-1]):
+        state.undo()
+        assert state.hash == expected
+
+
+def test_hash_is_independent_of_move_order(empty_board_arr):
+    a = GameState.from_array(empty_board_arr)
+    b = GameState.from_array(empty_board_arr)
+    for col in [0, 1, 2, 3]:
+        a.play(col)
+    for col in [2, 3, 0, 1]:
+        b.play(col)
+    assert a.hash == b.hash
+
+
+def test_canonical_hash_equates_mirror_images(empty_board_arr):
+    left = GameState.from_array(empty_board_arr)
+    right = GameState.from_array(empty_board_arr)
+    for col in [0, 1, 1]:
+        left.play(col)
+        right.play(6 - col)
+    assert left.hash != right.hash
+    assert left.canonical_hash() == right.canonical_hash()
+    assert left.is_mirrored() != right.is_mirrored()
+    assert canonical_hash(left.board) == left.canonical_hash()
+
+
+def test_symmetric_position_is_its_own_mirror(empty_board_arr):
+    state = GameState.from_array(empty_board_arr)
+    state.play(3)
+    assert state.hash == state.mirror_hash
+    assert not state.is_mirrored()
+
+
+def test_batch_hashes():
+    rng = np.random.default_rng(0)
+    boards = rng.choice([X, O, 0], size=(50, 6, 7))
+    hashes = zobrist_hash_batch(boards)
+    assert hashes.dtype == np.uint64
+    assert [int(h) for h in hashes] == [zobrist_hash(b) for b in boards]
+
+    canonical, mirrored = canonical_hash_batch(boards)
+    mirrored_canonical, mirrored_flags = canonical_hash_batch(boards[:, :, ::-1])
+    assert np.array_equal(canonical, mirrored_canonical)
+    asymmetric = zobrist_hash_batch(boards) != zobrist_hash_batch(boards, mirror=True)
+    assert np.all(mirrored[asymmetric] != mirrored_flags[asymmetric])
+
+
+def test_copy_keeps_hashes(empty_board_arr):
+    state = GameState.from_array(empty_board_arr)
+    for col in [3, 2, 2, 6]:
+        state.play(col)
+    clone = state.copy()
+    assert (clone.hash, clone.mirror_hash) == (state.hash, state.mirror_hash)
+    clone.play(0)
+    assert clone.hash == zobrist_hash(clone.board)
+    assert clone.mirror_hash == zobrist_hash(clone.board[:, ::-1])
+    assert state.hash == zobrist_hash(state.board)
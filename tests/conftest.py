@@ -1,7 +1,85 @@
 import pytest
 import numpy as np
 
+from connect4 import board
+
+X=1
+O=-1
+
+
+class ConstantScorer:
+    """Same value for every board, records the size of each batch."""
+
+    def __init__(self, value):
+        self.value = value
+        self.batch_sizes = []
+
+    def score(self, boards):
+        self.batch_sizes.append(len(boards))
+        return np.full(len(boards), self.value)
+
+
+class PolicyScorer:
+    """Neutral values and a fixed policy for every board."""
+
+    def __init__(self, policy):
+        self.policy = np.asarray(policy, dtype=float)
+        self.calls = 0
+
+    def score(self, boards):
+        self.calls += 1
+        return np.full(len(boards), 0.5), np.tile(self.policy, (len(boards), 1))
+
+
+def play_random_moves(n_pieces, rng, allow_end=False):
+    """
+    Random play from the empty board, X first, until the board holds
+    'n_pieces' pieces. Games that end earlier are replayed unless 'allow_end'.
+    """
+    while True:
+        state = board.GameState.from_array(np.zeros((6, 7), dtype=int), X)
+        while state.n_pieces < n_pieces and not state.is_terminal:
+            state.play(rng.choice(list(state.legal_moves())))
+        if allow_end or not state.is_terminal:
+            return state
+
+
 @pytest.fixture
 def empty_board_arr():
     return np.zeros((6, 7), dtype=int)
 
+
+@pytest.fixture
+def winning_board():
+    # X to move wins in column 3
+    board_arr = np.zeros((6, 7), dtype=int)
+    board_arr[5, 0:3] = X
+    board_arr[4, 0:3] = O
+    return board_arr
+
+
+@pytest.fixture
+def lost_board():
+    # X to move cannot stop O's open three on the bottom row
+    board_arr = np.zeros((6, 7), dtype=int)
+    board_arr[5, 2:5] = O
+    board_arr[4, 2:5] = X
+    return board_arr
+
+
+@pytest.fixture
+def constant_scorer():
+    """ConstantScorer(value)"""
+    return ConstantScorer
+
+
+@pytest.fixture
+def policy_scorer():
+    """PolicyScorer(policy)"""
+    return PolicyScorer
+
+
+@pytest.fixture
+def random_state():
+    """play_random_moves(n_pieces, rng, allow_end=False)"""
+    return play_random_moves
@@ -0,0 +1,57 @@
+from connect4 import board
+from connect4.data_collector import augment_with_mirrors, deduplicate_targets
+import numpy as np
+
+X=1
+O=-1
+
+
+def test_augment_with_mirrors(empty_board_arr):
+    left = empty_board_arr.copy()
+    left[5, 0] = X
+    boards = np.stack([left, empty_board_arr])
+    policies = np.array([[0.5, 0.5, 0, 0, 0, 0, 0], np.full(7, 1 / 7)])
+    values = np.array([0.25, 0.5])
+    aug_boards, aug_policies, aug_values = augment_with_mirrors(boards, policies, values)
+    assert aug_boards.shape == (4, 6, 7)
+    assert aug_boards[2, 5, 6] == X and aug_boards[2, 5, 0] == 0
+    assert aug_policies[2].tolist() == [0, 0, 0, 0, 0, 0.5, 0.5]
+    assert aug_values.tolist() == [0.25, 0.5, 0.25, 0.5]
+    assert np.array_equal(aug_boards[:2], boards)
+
+
+def test_deduplicate_merges_mirrors(empty_board_arr):
+    left = empty_board_arr.copy()
+    left[5, 0] = X
+    right = left[:, ::-1].copy()
+    center = empty_board_arr.copy()
+    center[5, 3] = X
+    boards = np.stack([left, center, right, left])
+    policies = np.array([
+        [1, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 1, 0, 0, 0],
+        [0, 0, 0, 0, 0, 1, 0],  # column 5 on the right is column 1 on the left
+        [0, 1, 0, 0, 0, 0, 0],
+    ], dtype=float)
+    values = np.array([0.2, 0.9, 0.4, 0.6])
+
+    out_boards, out_policies, out_values, counts = deduplicate_targets(boards, policies, values)
+    assert len(out_boards) == 2 and sorted(counts.tolist()) == [1, 3]
+    side = int(np.argmax(counts))
+    canonical = out_boards[side]
+    assert board.canonical_hash(canonical) == board.canonical_hash(left)
+    # Policies are expressed in the orientation of the returned board
+    expected = np.array([1 / 3, 2 / 3, 0, 0, 0, 0, 0])
+    if canonical[5, 6] == X:
+        expected = expected[::-1]
+    assert np.allclose(out_policies[side], expected)
+    assert np.isclose(out_values[side], 0.4)
+    assert np.isclose(out_values[1 - side], 0.9)
+
+
+def test_augment_then_deduplicate_symmetrizes(empty_board_arr):
+    policies = np.array([[0.7, 0.3, 0, 0, 0, 0, 0]])
+    boards, policies, values = augment_with_mirrors(empty_board_arr[None], policies, np.array([0.5]))
+    out_boards, out_policies, out_values, counts = deduplicate_targets(boards, policies, values)
+    assert counts.tolist() == [2]
+    assert np.allclose(out_policies[0], [0.35, 0.15, 0, 0, 0, 0.15, 0.35])
@@ -0,0 +1,120 @@
+from connect4 import data_collector
+from connect4.mcts import ACTION_COL, N_VISITS_COL, MCTSTree
+import numpy as np
+import pytest
+
+X=1
+O=-1
+
+
+def reference_target(nodes_data, player_perspective):
+    """The original per-column scan, for comparison."""
+    root_node = nodes_data[0]
+    value = root_node[3] / root_node[2] if root_node[2] > 0 else 0
+    if player_perspective == 1:
+        value = 1 - value
+    policy = np.zeros(7)
+    for col in range(7):
+        child_node = nodes_data[nodes_data[:, ACTION_COL] == col]
+        if child_node.size > 0:
+            policy[col] = child_node[0, N_VISITS_COL]
+    policy /= policy.sum() if policy.sum() > 0 else 1
+    return value, policy
+
+
+def searched_tree(player, iterations, **kwargs):
+    board_arr = np.zeros((6, 7), dtype=int)
+    board_arr[:, 2] = [O, X, O, X, O, X]
+    if player == O:
+        board_arr[5, 3] = X
+    tree = MCTSTree(board_arr, player=player, iterations=iterations, **kwargs)
+    for _ in range(iterations):
+        tree.mcts_step()
+    return tree
+
+
+@pytest.mark.parametrize("player", [X, O])
+def test_matches_reference(player):
+    tree = searched_tree(player, 200)
+    expected = reference_target(np.asarray(tree.node_data), player)
+    for nodes_data in (tree.node_data, np.asarray(tree.node_data)):
+        value, policy = data_collector.convert_mcts_nodes_data_to_target(nodes_data, player)
+        assert np.isclose(value, expected[0])
+        assert np.allclose(policy, expected[1])
+        assert policy[2] == 0
+
+
+def test_unsearched_tree(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, player=X)
+    value, policy = data_collector.convert_mcts_nodes_data_to_target(tree.node_data, X)
+    assert value == 1
+    assert np.array_equal(policy, np.zeros(7))
+
+
+def test_transposition_children_use_holder_visits():
+    tree = searched_tree(X, 300, transpositions=True)
+    _, policy = data_collector.convert_mcts_nodes_data_to_target(tree.node_data, X)
+    children = tree.get_children(0)
+    targets = np.where(tree.nodes.alias[children] >= 0, tree.nodes.alias[children], children)
+    visits = tree.nodes.visits[targets]
+    assert np.allclose(policy[tree.nodes.action[children]], visits / visits.sum())
+
+
+def test_batch_matches_single():
+    trees = [searched_tree(X, 50), searched_tree(O, 80), MCTSTree(np.zeros((6, 7)), player=X)]
+    values, policies = data_collector.convert_trees_to_targets(trees)
+    assert values.shape == (3,) and policies.shape == (3, 7)
+    for tree, value, policy in zip(trees, values, policies):
+        expected = data_collector.convert_mcts_nodes_data_to_target(tree.node_data, tree.player)
+        assert np.isclose(value, expected[0])
+        assert np.allclose(policy, expected[1])
+
+    values, policies = data_collector.convert_trees_to_targets([])
+    assert values.shape == (0,) and policies.shape == (0, 7)
+
+
+def test_targets_follow_proofs(winning_board):
+    tree = MCTSTree(winning_board, player=X, iterations=60)
+    for _ in range(60):
+        tree.mcts_step()
+    assert tree.nodes.proven[0] == -1
+    value, policy = data_collector.convert_mcts_nodes_data_to_target(tree.node_data, X)
+    assert value == 1
+    assert policy.tolist() == np.eye(7)[3].tolist()
+    values, policies = data_collector.convert_trees_to_targets([tree])
+    assert values.tolist() == [1]
+    assert np.array_equal(policies[0], policy)
+
+
+def test_targets_skip_proven_losses(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, player=X, iterations=20)
+    tree.expand_node(0, empty_board_arr)
+    children = tree.get_children(0)
+    tree.nodes.visits[children] = [1, 2, 3, 4, 3, 2, 1]
+    tree.nodes.proven[children[3]] = -1
+    _, policy = data_collector.convert_mcts_nodes_data_to_target(tree.node_data, X)
+    assert np.allclose(policy, np.array([1, 2, 3, 0, 3, 2, 1]) / 12)
+    # Every move losing keeps the visit counts
+    tree.nodes.proven[children] = -1
+    _, policy = data_collector.convert_mcts_nodes_data_to_target(tree.node_data, X)
+    assert np.allclose(policy, np.array([1, 2, 3, 4, 3, 2, 1]) / 16)
+
+
+def test_batch_matches_single_with_proofs(empty_board_arr):
+    proofs = [[0, 0, 1, 0, -1, 1, 0], [0, -1, 0, 0, -1, 0, 0], [-1] * 7, [0] * 7]
+    trees = []
+    for proven in proofs:
+        tree = MCTSTree(empty_board_arr, player=X, iterations=20)
+        tree.expand_node(0, empty_board_arr)
+        children = tree.get_children(0)
+        tree.nodes.visits[children] = [1, 2, 3, 4, 3, 2, 1]
+        tree.nodes.proven[children] = proven
+        trees.append(tree)
+    trees.append(MCTSTree(empty_board_arr, player=O))
+    values, policies = data_collector.convert_trees_to_targets(trees)
+    for tree, value, policy in zip(trees, values, policies):
+        expected = data_collector.convert_mcts_nodes_data_to_target(tree.node_data, tree.player)
+        assert np.isclose(value, expected[0])
+        assert np.allclose(policy, expected[1])
+    # The first proven win takes all the weight
+    assert policies[0].tolist() == np.eye(7)[2].tolist()
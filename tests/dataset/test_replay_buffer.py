@@ -0,0 +1,77 @@
+from connect4.replay_buffer import ReplayBuffer
+import numpy as np
+import pytest
+
+
+def samples(start, n):
+    """Samples whose boards and values encode their sequence number."""
+    steps = np.arange(start, start + n)
+    boards = np.zeros((n, 6, 7), dtype=np.int8)
+    boards[:, 0, 0] = steps % 3 - 1
+    boards[:, 5, :] = (steps[:, None] >> np.arange(7)) & 1
+    policies = np.tile(np.full(7, 1 / 7), (n, 1))
+    values = steps / 1000
+    return boards, policies, values
+
+
+def test_append_and_wrap_around(tmp_path):
+    buffer = ReplayBuffer(tmp_path, capacity=5)
+    boards, policies, values = samples(0, 7)
+    for i in range(7):
+        buffer.append(boards[i], policies[i], values[i])
+    assert len(buffer) == 5 and buffer.n_appended == 7
+    # The two oldest samples were overwritten
+    assert sorted(buffer.inserted_at.tolist()) == [2, 3, 4, 5, 6]
+    assert buffer.inserted_at[0] == 5 and np.array_equal(buffer.boards[0], boards[5])
+
+
+def test_extend_matches_append(tmp_path):
+    appended = ReplayBuffer(tmp_path / "a", capacity=8)
+    extended = ReplayBuffer(tmp_path / "b", capacity=8)
+    boards, policies, values = samples(0, 19)
+    for i in range(19):
+        appended.append(boards[i], policies[i], values[i])
+    extended.extend(boards[:3], policies[:3], values[:3])
+    extended.extend(boards[3:], policies[3:], values[3:])
+    for name in ("boards", "policies", "values", "inserted_at"):
+        assert np.array_equal(getattr(appended, name), getattr(extended, name))
+
+
+def test_uniform_sampling(tmp_path):
+    buffer = ReplayBuffer(tmp_path, capacity=50)
+    buffer.extend(*samples(0, 30))
+    batch = buffer.sample(2000, rng=np.random.default_rng(0))
+    assert batch["boards"].shape == (2000, 6, 7)
+    assert set(batch["inserted_at"].tolist()) == set(range(30))
+    assert np.allclose(batch["values"], batch["inserted_at"] / 1000, atol=1e-3)
+
+
+def test_recency_weighted_sampling(tmp_path):
+    buffer = ReplayBuffer(tmp_path, capacity=100)
+    buffer.extend(*samples(0, 250))
+    batch = buffer.sample(20000, half_life=10, rng=np.random.default_rng(0))
+    ages = buffer.n_appended - 1 - batch["inserted_at"]
+    assert ages.min() >= 0 and ages.max() < 100
+    # Half of the samples are younger than the half-life
+    assert abs(np.mean(ages < 10) - 0.5) < 0.02
+
+
+def test_reopen_readonly(tmp_path):
+    buffer = ReplayBuffer(tmp_path, capacity=10)
+    buffer.extend(*samples(0, 4))
+    buffer.flush()
+    reader = ReplayBuffer(tmp_path, readonly=True)
+    assert reader.capacity == 10 and len(reader) == 4
+    # Appends are visible to the reader without reopening
+    buffer.extend(*samples(4, 3))
+    assert len(reader) == 7
+    with pytest.raises(ValueError):
+        reader.append(*[x[0] for x in samples(7, 1)])
+
+
+def test_empty_buffer(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ReplayBuffer(tmp_path / "missing", readonly=True)
+    buffer = ReplayBuffer(tmp_path, capacity=3)
+    with pytest.raises(ValueError):
+        buffer.sample(1)
@@ -0,0 +1,68 @@
+from connect4.dataset import ShardReader, ShardWriter
+from connect4.self_play import play_game
+import json
+import numpy as np
+import os
+
+
+def random_positions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    boards = rng.integers(-1, 2, size=(n, 6, 7))
+    players = np.where(rng.random(n) < 0.5, 1, -1)
+    policies = rng.dirichlet(np.ones(7), size=n)
+    values = rng.random(n)
+    outcomes = rng.integers(-1, 2, size=n)
+    return boards, players, policies, values, outcomes
+
+
+def test_write_and_read_back(tmp_path):
+    boards, players, policies, values, outcomes = random_positions(25)
+    with ShardWriter(tmp_path, shard_size=10) as writer:
+        writer.add_positions(boards[:7], players[:7], policies[:7], values[:7], outcomes[:7])
+        writer.add_positions(boards[7:], players[7:], policies[7:], values[7:], outcomes[7:])
+
+    with open(os.path.join(tmp_path, "index.json")) as f:
+        index = json.load(f)
+    assert index["n_positions"] == 25
+    assert [shard["size"] for shard in index["shards"]] == [10, 10, 5]
+
+    reader = ShardReader(tmp_path)
+    assert len(reader) == 25
+    shard = reader.load_shard(0)
+    assert isinstance(shard["boards"], np.memmap)
+    assert shard["boards"].dtype == np.int8 and shard["policies"].dtype == np.float16
+
+    batches = list(reader.iter_batches(4))
+    assert [len(batch["boards"]) for batch in batches] == [4, 4, 2, 4, 4, 2, 4, 1]
+    read = {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+    assert np.array_equal(read["boards"], boards)
+    assert np.array_equal(read["players"], players)
+    assert np.array_equal(read["outcomes"], outcomes)
+    assert np.allclose(read["policies"], policies, atol=1e-3)
+    assert np.allclose(read["values"], values, atol=1e-3)
+
+
+def test_shuffled_batches_cover_everything(tmp_path):
+    boards, players, policies, values, outcomes = random_positions(30, seed=1)
+    boards[:, 0, 0] = np.arange(30) % 3 - 1
+    with ShardWriter(tmp_path, shard_size=8) as writer:
+        writer.add_positions(boards, players, policies, values, outcomes)
+    reader = ShardReader(tmp_path)
+    batches = list(reader.iter_batches(5, shuffle=True, rng=np.random.default_rng(0)))
+    read = np.concatenate([batch["boards"] for batch in batches])
+    assert len(read) == 30
+    # Same positions, in another order
+    assert sorted(map(bytes, read)) == sorted(map(bytes, boards.astype(np.int8)))
+
+
+def test_appends_to_existing_run(tmp_path):
+    game = play_game(iterations=10, rng=np.random.default_rng(0))
+    with ShardWriter(tmp_path) as writer:
+        writer.add_game(game)
+    with ShardWriter(tmp_path) as writer:
+        writer.add_game(game)
+    reader = ShardReader(tmp_path)
+    assert len(reader) == 2 * len(game.boards)
+    shard = reader.load_shard(1)
+    assert np.array_equal(shard["boards"], game.boards)
+    assert np.all(shard["outcomes"] == game.result)
@@ -0,0 +1,84 @@
+from connect4.eval_cache import EvaluationCache
+import numpy as np
+
+X=1
+O=-1
+
+
+class CountingScorer:
+    """Value is a function of the board, priors favour the leftmost empty column."""
+
+    def __init__(self, with_priors=False):
+        self.with_priors = with_priors
+        self.scored = 0
+        self.calls = 0
+
+    def score(self, boards):
+        self.calls += 1
+        self.scored += len(boards)
+        values = np.abs(boards).sum(axis=(1, 2)) / 42
+        if not self.with_priors:
+            return values
+        priors = np.tile(np.arange(7, 0, -1, dtype=float), (len(boards), 1))
+        return values, priors / priors.sum(axis=1, keepdims=True)
+
+
+def board_with(*cells):
+    board_arr = np.zeros((6, 7), dtype=int)
+    for row, col, player in cells:
+        board_arr[row, col] = player
+    return board_arr
+
+
+def test_only_misses_reach_the_scorer():
+    scorer = CountingScorer()
+    cache = EvaluationCache(scorer)
+    a = board_with((5, 0, X))
+    b = board_with((5, 0, X), (5, 1, O))
+
+    values = cache.score([a, b, a])
+    assert scorer.scored == 2
+    assert values.tolist() == [1 / 42, 2 / 42, 1 / 42]
+
+    values = cache.score(np.stack([b, a]))
+    assert scorer.scored == 2 and scorer.calls == 1
+    assert values.tolist() == [2 / 42, 1 / 42]
+    assert (cache.hits, cache.misses) == (3, 2)
+
+
+def test_mirrored_boards_share_an_entry():
+    scorer = CountingScorer()
+    cache = EvaluationCache(scorer)
+    left = board_with((5, 0, X), (5, 1, O))
+    cache.score([left])
+    cache.score([left[:, ::-1]])
+    assert scorer.scored == 1
+    assert len(cache) == 1
+
+
+def test_priors_are_mirrored_back():
+    scorer = CountingScorer(with_priors=True)
+    cache = EvaluationCache(scorer)
+    left = board_with((5, 0, X))
+    right = left[:, ::-1]
+
+    _, priors = cache.score([left])
+    _, mirrored_priors = cache.score([right])
+    assert scorer.scored == 1
+    assert np.allclose(mirrored_priors[0], priors[0][::-1])
+
+
+def test_lru_eviction():
+    scorer = CountingScorer()
+    cache = EvaluationCache(scorer, capacity=2)
+    a, b, c = board_with((5, 0, X)), board_with((5, 1, X)), board_with((5, 2, X))
+    cache.score([a])
+    cache.score([b])
+    cache.score([a])  # a is now the most recently used
+    cache.score([c])  # evicts b
+    assert len(cache) == 2
+    cache.score([a])
+    assert scorer.scored == 3
+    cache.score([b])
+    assert scorer.scored == 4
+    assert cache.hit_rate == 2 / 6
@@ -0,0 +1,76 @@
+from connect4.mcts import MCTSTree
+from connect4 import board
+import numpy as np
+import pytest
+
+
+def subtree_stats(tree, node_idx, depth=3):
+    """Nested (action, visits, wins) statistics below a node."""
+    if depth == 0:
+        return []
+    return [(int(tree.nodes.action[c]), int(tree.nodes.visits[c]), float(tree.nodes.wins[c]),
+             subtree_stats(tree, c, depth - 1)) for c in tree.get_children(node_idx)]
+
+
+def test_advance_keeps_chosen_subtree(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, player=1, iterations=300)
+    for i in range(300):
+        tree.mcts_step()
+
+    chosen = tree.children_map[(0, 3)]
+    visits = int(tree.nodes.visits[chosen])
+    expected = subtree_stats(tree, chosen)
+
+    tree.advance(3)
+    assert tree.player == -1
+    assert tree.root_board[5, 3] == 1
+    assert np.array_equal(tree.root_state.board, tree.root_board)
+    assert tree.nodes.parent[0] == -1 and tree.nodes.action[0] == -1
+    assert tree.nodes.visits[0] == visits
+    assert subtree_stats(tree, 0) == expected
+
+
+def test_advance_remaps_links(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, player=1, iterations=300)
+    for i in range(300):
+        tree.mcts_step()
+    tree.advance(2)
+
+    n = tree.node_count
+    assert np.all(tree.nodes.parent[1:n] < np.arange(1, n))
+    for node_idx in range(n):
+        children = tree.get_children(node_idx)
+        assert np.all(children < n)
+        assert np.all(tree.nodes.parent[children] == node_idx)
+    # Freed slots are reset
+    assert np.all(tree.nodes.visits[n:] == 0)
+    assert np.all(tree.nodes.first_child[n:] == -1)
+
+
+def test_search_continues_after_advance(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, player=1, iterations=200)
+    for i in range(200):
+        tree.mcts_step()
+    tree.advance(int(tree.select_best_child()))
+    for i in range(200):
+        tree.mcts_step()
+    assert tree.root_state.moves == []
+    best = int(tree.select_best_child())
+    assert best in board.get_legal_moves(tree.root_board)
+
+
+def test_advance_unexpanded_root_starts_fresh(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, player=1, iterations=10)
+    tree.advance(0)
+    assert tree.node_count == 1
+    assert tree.nodes.n_children[0] == 0
+    assert not tree.nodes.expanded[0]
+    assert tree.root_board[5, 0] == 1
+
+
+def test_advance_illegal_column():
+    board_arr = np.zeros((6, 7), dtype=int)
+    board_arr[:, 0] = [1, -1, 1, -1, 1, -1]
+    tree = MCTSTree(board_arr, player=1, iterations=10)
+    with pytest.raises(ValueError):
+        tree.advance(0)
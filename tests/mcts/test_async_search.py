@@ -0,0 +1,107 @@
+from connect4.async_search import InferenceServer, search_async, search_many
+from connect4.evaluator import ValueOnlyEvaluator
+from connect4.mcts import MCTSTree
+from connect4.solver import Solver
+import asyncio
+import numpy as np
+import pytest
+
+X=1
+O=-1
+
+
+def test_server_flushes_full_batches(empty_board_arr, constant_scorer):
+    scorer = constant_scorer(0.25)
+
+    async def main():
+        async with InferenceServer(ValueOnlyEvaluator(scorer), max_batch_size=4,
+                                   max_latency=10.0) as server:
+            return await asyncio.gather(*(server.evaluate(empty_board_arr) for _ in range(8)))
+
+    results = asyncio.run(main())
+    assert scorer.batch_sizes == [4, 4]
+    assert [value for value, _ in results] == [0.25] * 8
+    assert np.allclose(results[0][1], 1 / 7)
+
+
+def test_server_flushes_at_deadline(empty_board_arr, constant_scorer):
+    scorer = constant_scorer(0.5)
+
+    async def main():
+        async with InferenceServer(ValueOnlyEvaluator(scorer), max_batch_size=64,
+                                   max_latency=0.01) as server:
+            return await asyncio.wait_for(server.evaluate(empty_board_arr), timeout=5)
+
+    value, _ = asyncio.run(main())
+    assert value == 0.5
+    assert scorer.batch_sizes == [1]
+
+
+def test_server_propagates_scorer_errors(empty_board_arr):
+    class FailingScorer:
+        def score(self, boards):
+            raise RuntimeError("model failed")
+
+    async def main():
+        async with InferenceServer(ValueOnlyEvaluator(FailingScorer()), max_latency=0.001) as server:
+            await server.evaluate(empty_board_arr)
+
+    with pytest.raises(RuntimeError, match="model failed"):
+        asyncio.run(main())
+
+
+def test_search_async_visit_counts(empty_board_arr, constant_scorer):
+    tree = MCTSTree(empty_board_arr, player=X, iterations=100)
+
+    async def main():
+        async with InferenceServer(ValueOnlyEvaluator(constant_scorer(0.5)), max_batch_size=8) as server:
+            await search_async(tree, server, 100, max_pending=8)
+
+    asyncio.run(main())
+    assert tree.nodes.visits[0] == 100
+    n = tree.node_count
+    # Virtual losses are gone: every visit carried exactly 0.5
+    assert np.allclose(tree.nodes.wins[:n], 0.5 * tree.nodes.visits[:n], atol=1e-4)
+
+
+def test_search_many_shares_batches(empty_board_arr, constant_scorer):
+    trees = [MCTSTree(empty_board_arr, player=X, iterations=50) for _ in range(6)]
+    scorer = constant_scorer(0.5)
+    server = asyncio.run(search_many(trees, ValueOnlyEvaluator(scorer), 50,
+                                     max_batch_size=32, max_latency=0.01, max_pending=4))
+    assert all(tree.nodes.visits[0] == 50 for tree in trees)
+    assert server.n_requests == sum(scorer.batch_sizes)
+    # Leaves of different trees end up in the same evaluator call
+    assert max(scorer.batch_sizes) > 4
+    assert server.mean_batch_size > 1
+
+
+def test_search_many_finds_winning_move(winning_board, constant_scorer):
+    tree = MCTSTree(winning_board, player=X, iterations=200)
+    asyncio.run(search_many([tree], ValueOnlyEvaluator(constant_scorer(0.0)), 200))
+    assert tree.select_best_child() == 3
+
+
+def test_solved_leaves_skip_the_server(lost_board, constant_scorer):
+    tree = MCTSTree(lost_board, player=X, iterations=20, solver=Solver(), solver_threshold=42)
+    server = asyncio.run(search_many([tree], ValueOnlyEvaluator(constant_scorer(0.5)), 20))
+    assert server.n_requests == 0
+    assert tree.nodes.visits[0] == 20
+
+
+def test_failed_evaluation_reverts_virtual_loss(empty_board_arr):
+    class FailingScorer:
+        def score(self, boards):
+            raise RuntimeError("model failed")
+
+    tree = MCTSTree(empty_board_arr, player=X, iterations=4)
+
+    async def main():
+        async with InferenceServer(ValueOnlyEvaluator(FailingScorer()), max_batch_size=4) as server:
+            await search_async(tree, server, 4, max_pending=4)
+
+    with pytest.raises(RuntimeError, match="model failed"):
+        asyncio.run(main())
+    n = tree.node_count
+    assert np.all(tree.nodes.visits[:n] == 0)
+    assert np.allclose(tree.nodes.wins[:n], 0, atol=1e-4)
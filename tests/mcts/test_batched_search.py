@@ -0,0 +1,73 @@
+from connect4.batched_search import BatchedSearch
+from connect4.evaluator import RolloutEvaluator, ValueOnlyEvaluator, uniform_priors
+from connect4.mcts import MCTSTree
+import numpy as np
+
+X=1
+O=-1
+
+
+def test_virtual_loss_is_reverted(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, iterations=10)
+    tree.expand_node(0, empty_board_arr)
+    path = [0, 3]
+    tree.apply_virtual_loss(path, 0.5)
+    assert tree.nodes.visits[3] == 1 and tree.nodes.wins[3] == -0.5
+    tree.revert_virtual_loss(path, 0.5)
+    assert tree.nodes.visits[3] == 0 and tree.nodes.wins[3] == 0
+
+
+def test_backpropagate_counts_visits(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, player=X, iterations=10)
+    tree.expand_node(0, empty_board_arr)
+    tree.backpropagate([0, 2], 1)
+    tree.backpropagate([0, 2], 0.25)
+    assert tree.nodes.visits[0] == 2 and tree.nodes.visits[2] == 2
+    # Node 2 was reached by a player 1 move, the root by a player 2 move
+    assert tree.nodes.wins[2] == 1.25
+    assert tree.nodes.wins[0] == 0.75
+
+
+def test_batched_search_visit_counts(empty_board_arr, constant_scorer):
+    tree = MCTSTree(empty_board_arr, player=X, iterations=200)
+    scorer = constant_scorer(0.5)
+    search = BatchedSearch(tree, ValueOnlyEvaluator(scorer), batch_size=32)
+    search.run(200)
+
+    assert scorer.batch_sizes == [32] * 6 + [8]
+    assert tree.nodes.visits[0] == 200
+    # Virtual losses are gone: every visit carried exactly 0.5
+    assert tree.nodes.visits[tree.get_children(0)].sum() == 199
+    n = tree.node_count
+    assert np.allclose(tree.nodes.wins[:n], 0.5 * tree.nodes.visits[:n], atol=1e-4)
+
+
+def test_batched_search_spreads_batch_with_virtual_loss(empty_board_arr, constant_scorer):
+    tree = MCTSTree(empty_board_arr, player=X, iterations=8)
+    search = BatchedSearch(tree, ValueOnlyEvaluator(constant_scorer(0.5)), batch_size=8)
+    leaf_nodes, _, _ = search.run_batch(8)
+    # The first selection expands the root, the next seven visit distinct children
+    assert leaf_nodes[0] == 0
+    assert sorted(leaf_nodes[1:]) == list(tree.get_children(0))
+
+
+def test_terminal_leaves_use_exact_result(winning_board, constant_scorer):
+    tree = MCTSTree(winning_board, player=X, iterations=300)
+    # A scorer that always says player 2 wins
+    search = BatchedSearch(tree, ValueOnlyEvaluator(constant_scorer(0.0)), batch_size=16)
+    search.run(300)
+    winning_child = tree.children_map[(0, 3)]
+    assert tree.nodes.visits[winning_child] > 0
+    assert np.isclose(tree.nodes.wins[winning_child], tree.nodes.visits[winning_child])
+    assert tree.select_best_child() == 3
+
+
+def test_rollout_evaluator(empty_board_arr):
+    boards = np.stack([empty_board_arr] * 5)
+    boards[1, :, 0] = [X, O, X, O, X, O]
+    values, priors = RolloutEvaluator(n_rollouts=20, rng=np.random.default_rng(0)).score(boards)
+    assert values.shape == (5,)
+    assert np.all((values >= 0) & (values <= 1))
+    assert np.allclose(priors.sum(axis=1), 1)
+    assert priors[1, 0] == 0
+    assert np.array_equal(priors, uniform_priors(boards))
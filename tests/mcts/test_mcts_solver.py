@@ -0,0 +1,124 @@
+from connect4 import data_collector
+from connect4.batched_search import BatchedSearch
+from connect4.evaluator import ValueOnlyEvaluator
+from connect4.mcts import MCTSTree
+from connect4.solver import Solver
+import numpy as np
+import pytest
+import random
+
+X=1
+O=-1
+
+
+@pytest.mark.parametrize("transpositions", [False, True])
+def test_terminal_win_proves_parent(transpositions, winning_board):
+    tree = MCTSTree(winning_board, player=X, iterations=50, transpositions=transpositions)
+    # Unvisited children are tried first, the win is found within 8 iterations
+    for _ in range(8):
+        tree.mcts_step()
+    winning_child = tree.children_map[(0, 3)]
+    assert tree.nodes.visits[winning_child] >= 1
+    assert tree.nodes.proven[winning_child] == 1
+    # The player who moved into the root (O) has lost
+    assert tree.nodes.proven[0] == -1
+
+    # The proven root sends every further visit to the winning move
+    others = tree.get_children(0)[tree.nodes.action[tree.get_children(0)] != 3]
+    other_visits = tree.nodes.visits[others].copy()
+    winning_visits = tree.nodes.visits[winning_child]
+    for _ in range(50):
+        tree.mcts_step()
+    assert np.array_equal(tree.nodes.visits[others], other_visits)
+    assert tree.nodes.visits[winning_child] == winning_visits + 50
+    assert tree.nodes.visits[0] == 58
+    assert tree.select_best_child() == 3
+
+
+def test_all_losing_children_prove_parent(lost_board):
+    tree = MCTSTree(lost_board, player=X, iterations=500)
+    for _ in range(500):
+        tree.mcts_step()
+        if tree.nodes.proven[0] != 0:
+            break
+    children = tree.get_children(0)
+    assert np.all(tree.nodes.proven[children] == -1)
+    assert tree.nodes.proven[0] == 1
+    # Every X move loses, the search stopped long before the budget
+    assert tree.nodes.visits[0] < 200
+
+
+def test_select_best_child_avoids_proven_losses(winning_board):
+    tree = MCTSTree(winning_board, player=X, iterations=20)
+    tree.expand_node(0, tree.root_board)
+    children = tree.get_children(0)
+    tree.nodes.visits[children] = 1
+    tree.nodes.wins[children] = 0.5
+    tree.nodes.wins[children[1]] = 1
+    tree.nodes.proven[children[1]] = -1
+    assert tree.select_best_child() != 1
+    tree.nodes.proven[children[4]] = 1
+    assert tree.select_best_child() == 4
+
+
+def test_solver_leaves_become_proven(lost_board):
+    tree = MCTSTree(lost_board, player=X, iterations=20, solver=Solver(), solver_threshold=42)
+    for _ in range(8):
+        tree.mcts_step()
+    # Each child was solved as a loss on its first visit
+    assert np.all(tree.nodes.proven[tree.get_children(0)] == -1)
+    assert tree.nodes.proven[0] == 1
+
+
+def test_advance_into_solved_position(lost_board):
+    tree = MCTSTree(lost_board, player=X, iterations=200, solver=Solver(), solver_threshold=42)
+    for _ in range(20):
+        tree.mcts_step()
+    # Every X move is solved as a loss, so the position after it is a proven win for O
+    tree.advance(0)
+    assert tree.nodes.proven[0] == -1
+    for _ in range(200):
+        tree.mcts_step()
+    # The search went on below the proven root and found an O move proving the win
+    best = tree.select_best_child()
+    best_child = tree.children_map[(0, best)]
+    assert tree.nodes.proven[best_child] == 1
+    assert tree.nodes.visits[best_child] > 0
+    value, policy = data_collector.convert_mcts_nodes_data_to_target(tree.node_data,
+                                                                     player_perspective=O)
+    assert policy.tolist() == np.eye(7)[best].tolist()
+    # O wins, so player 1 loses
+    assert value == 0
+
+
+def proven_positions(random_state, n_positions, n_pieces, seed):
+    solver = Solver()
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < n_positions:
+        state = random_state(n_pieces, rng)
+        # Decided, but not by the first few moves, so the proof needs solved leaves
+        result = solver.solve(state)
+        if result.outcome != 0 and result.distance > 5:
+            positions.append(state)
+    return positions
+
+
+def test_batched_search_proves_like_sequential_search(constant_scorer, random_state):
+    evaluator = ValueOnlyEvaluator(constant_scorer(0.5))
+    for state in proven_positions(random_state, 5, 28, seed=2):
+        sequential = MCTSTree(state.board, player=state.player, iterations=400,
+                              solver=Solver(), solver_threshold=13)
+        batched = MCTSTree(state.board, player=state.player, iterations=400,
+                           solver=Solver(), solver_threshold=13)
+        search = BatchedSearch(batched, evaluator, batch_size=8)
+        for _ in range(50):
+            for _ in range(8):
+                sequential.mcts_step()
+            search.run_batch(8)
+            if sequential.nodes.proven[0] != 0 and batched.nodes.proven[0] != 0:
+                break
+        assert sequential.nodes.proven[0] != 0
+        assert batched.nodes.proven[0] == sequential.nodes.proven[0]
+        # Solved leaves are not expanded, so the proof stays cheap
+        assert batched.node_count < 200
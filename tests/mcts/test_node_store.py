@@ -0,0 +1,62 @@
+from connect4.node_store import FIELDS, NodeStore
+from connect4.mcts import MCTSTree, N_VISITS_COL, WINS_COL, EXPANDED_COL
+import numpy as np
+
+
+def test_field_dtypes():
+    store = NodeStore(capacity=4)
+    for name, dtype in FIELDS.items():
+        assert getattr(store, name).dtype == dtype
+    assert store.parent[0] == -1 and store.first_child[0] == -1
+
+
+def test_growth_doubles_and_keeps_data():
+    store = NodeStore(capacity=2)
+    first = store.add_nodes(2)
+    store.visits[first:first + 2] = [5, 7]
+    store.wins[first:first + 2] = [1.5, 2.5]
+
+    second = store.add_nodes(1)
+    assert second == 2
+    assert store.capacity == 4
+    assert store.visits[:2].tolist() == [5, 7]
+    assert store.wins[:2].tolist() == [1.5, 2.5]
+    assert store.parent[2] == -1
+
+    store.add_nodes(10)
+    assert store.capacity == 13
+    assert store.size == 13
+
+
+def test_memory_usage_reports_bytes():
+    store = NodeStore(capacity=100)
+    store.add_nodes(10)
+    usage = store.memory_usage()
+    bytes_per_node = sum(np.dtype(dtype).itemsize for dtype in FIELDS.values())
+    assert usage["total"] == 100 * bytes_per_node
+    assert usage["capacity"] == 100 and usage["size"] == 10
+    # Far less than the previous float64 (n, 6) table
+    assert bytes_per_node < 6 * 8
+
+
+def test_tree_grows_past_iteration_hint(empty_board_arr):
+    # The old fixed-size table raised IndexError here
+    tree = MCTSTree(empty_board_arr, iterations=1)
+    for i in range(50):
+        tree.mcts_step()
+    assert tree.node_count > 8
+    assert tree.memory_usage()["capacity"] >= tree.node_count
+
+
+def test_node_data_view(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, iterations=5)
+    tree.expand_node(0, empty_board_arr)
+    assert tree.node_data.shape == (8, 6)
+    assert tree.node_data[0, EXPANDED_COL] == 1
+
+    tree.node_data[3, N_VISITS_COL] = 4
+    tree.node_data[3, WINS_COL] = 2.5
+    assert tree.nodes.visits[3] == 4
+    assert tree.nodes.wins[3] == 2.5
+    assert np.asarray(tree.node_data)[3].tolist() == [0, 2, 4, 2.5, 0, 0]
+    assert tree.to_pandas().loc[3, "n_visits"] == 4
@@ -0,0 +1,80 @@
+from connect4.batched_search import BatchedSearch
+from connect4.mcts import MCTSTree, puct_scores
+import numpy as np
+import pytest
+
+X=1
+O=-1
+
+
+def test_puct_scores():
+    wins = np.array([0.0, 3.0, 1.0])
+    visits = np.array([0, 4, 1])
+    priors = np.array([0.2, 0.5, 0.3])
+    scores = puct_scores(wins, visits, priors, 4, 1.0)
+    expected = np.array([0.5 + 0.2 * 2 / 1, 0.75 + 0.5 * 2 / 5, 1.0 + 0.3 * 2 / 2])
+    assert np.allclose(scores, expected)
+
+
+def test_unknown_selection_rule(empty_board_arr):
+    with pytest.raises(ValueError):
+        MCTSTree(empty_board_arr, selection="ucb1")
+
+
+def test_expansion_sets_uniform_priors(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, selection="puct")
+    tree.expand_node(0, empty_board_arr)
+    assert np.allclose(tree.nodes.prior[tree.get_children(0)], 1 / 7)
+
+
+def test_set_priors_renormalizes_legal_columns(empty_board_arr):
+    board_arr = empty_board_arr.copy()
+    board_arr[:, 0] = [O, X, O, X, O, X]
+    tree = MCTSTree(board_arr, player=X, selection="puct")
+    tree.expand_node(0, board_arr)
+    tree.set_priors(0, np.array([0.5, 0.25, 0.25, 0, 0, 0, 0]))
+    children = tree.get_children(0)
+    assert list(tree.nodes.action[children]) == [1, 2, 3, 4, 5, 6]
+    assert np.allclose(tree.nodes.prior[children], [0.5, 0.5, 0, 0, 0, 0])
+
+    # All the mass on illegal columns falls back to uniform priors
+    tree.set_priors(0, np.eye(7)[0])
+    assert np.allclose(tree.nodes.prior[children], 1 / 6)
+
+
+def test_dirichlet_noise_at_root_only(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, selection="puct", dirichlet_alpha=0.3,
+                    rng=np.random.default_rng(0))
+    tree.expand_node(0, empty_board_arr)
+    root_priors = tree.nodes.prior[tree.get_children(0)]
+    assert np.isclose(root_priors.sum(), 1, atol=1e-6)
+    assert not np.allclose(root_priors, 1 / 7)
+    assert np.all(root_priors >= 0.75 / 7 - 1e-6)
+
+    tree.mcts_step()
+    tree.mcts_step()
+    child = tree.get_children(0)[np.argmax(tree.nodes.visits[tree.get_children(0)])]
+    assert np.allclose(tree.nodes.prior[tree.get_children(child)], 1 / 7)
+
+
+def test_evaluator_guides_search(winning_board, policy_scorer):
+    policy = np.full(7, 0.01)
+    policy[3] = 0.94
+    scorer = policy_scorer(policy)
+    tree = MCTSTree(winning_board, player=X, iterations=30, selection="puct", evaluator=scorer)
+    for _ in range(30):
+        tree.mcts_step()
+    assert scorer.calls > 0
+    winning_child = tree.children_map[(0, 3)]
+    assert np.isclose(tree.nodes.prior[winning_child], 0.94 / 1.0)
+    assert tree.nodes.visits[winning_child] > 15
+    assert tree.select_best_child() == 3
+
+
+def test_batched_search_stores_priors(empty_board_arr, policy_scorer):
+    policy = np.array([0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0])
+    tree = MCTSTree(empty_board_arr, player=X, iterations=64, selection="puct")
+    BatchedSearch(tree, policy_scorer(policy), batch_size=8).run(64)
+    children = tree.get_children(0)
+    assert np.allclose(tree.nodes.prior[children], policy)
+    assert tree.select_best_child() == 3
@@ -0,0 +1,80 @@
+from connect4.mcts import MCTSTree, rollout_batch
+from connect4 import board
+import numpy as np
+
+X=1
+O=-1
+
+
+def test_rollout_batch_empty_boards(empty_board_arr):
+    boards = np.stack([empty_board_arr] * 200)
+    results = rollout_batch(boards, X, rng=np.random.default_rng(0))
+    assert results.shape == (200,)
+    assert set(np.unique(results)) <= {-1, 0, 1}
+    # Random play from the empty board is won by both sides
+    assert np.any(results == 1) and np.any(results == -1)
+
+
+def test_rollout_batch_terminal_leaves():
+    x_won = np.zeros((6, 7), dtype=int)
+    x_won[5, 0:4] = X
+    x_won[4, 0:3] = O
+    o_won = -x_won
+    results = rollout_batch(np.stack([x_won, o_won]), np.array([O, X]))
+    assert results.tolist() == [1, -1]
+
+
+def test_rollout_batch_forced_outcomes():
+    draw_board = np.array([
+        [O, O, O, X, O, O, O],
+        [X, X, X, O, X, X, X],
+        [O, O, O, X, O, O, O],
+        [X, X, X, O, X, X, X],
+        [O, O, O, X, O, O, O],
+        [X, X, X, O, X, X, X]
+    ], dtype=int)
+    # One empty cell left: O fills it and completes the top row
+    last_cell_win = draw_board.copy()
+    last_cell_win[0, 3] = 0
+    # One empty cell left: X fills it without completing a line
+    last_cell_draw = draw_board.copy()
+    last_cell_draw[0, 0] = 0
+    assert not board.check_win(last_cell_win)
+    assert not board.check_win(last_cell_draw)
+
+    results = rollout_batch(np.stack([last_cell_win, last_cell_draw]), np.array([O, X]))
+    assert results.tolist() == [-1, 0]
+
+
+def test_rollout_batch_per_game_players():
+    # X to move wins immediately in column 3, O to move must block or lose
+    board_arr = np.zeros((6, 7), dtype=int)
+    board_arr[5, 0:3] = X
+    board_arr[4, 0:2] = O
+    boards = np.stack([board_arr] * 100)
+    players = np.array([X] * 50 + [O] * 50)
+    results = rollout_batch(boards, players, rng=np.random.default_rng(1))
+    assert np.all(np.isin(results, [-1, 0, 1]))
+
+
+def test_rollouts_per_leaf_backs_up_counts(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, player=X, iterations=20, rollouts_per_leaf=16,
+                    rng=np.random.default_rng(0))
+    for _ in range(20):
+        tree.mcts_step()
+    assert tree.nodes.visits[0] == 20 * 16
+    children = tree.get_children(0)
+    assert tree.nodes.visits[children].sum() == 19 * 16
+    # Backing up the average with its count adds 0, 0.5 or 1 per rollout
+    wins = tree.nodes.wins[:tree.node_count]
+    assert np.allclose(wins * 2, np.round(wins * 2))
+
+
+def test_rollouts_per_leaf_terminal_leaf(winning_board):
+    tree = MCTSTree(winning_board, player=X, iterations=100, rollouts_per_leaf=8)
+    for _ in range(100):
+        tree.mcts_step()
+    winning_child = tree.children_map[(0, 3)]
+    assert tree.nodes.visits[winning_child] % 8 == 0
+    assert np.isclose(tree.nodes.wins[winning_child], tree.nodes.visits[winning_child])
+    assert tree.select_best_child() == 3
@@ -1,4 +1,5 @@
-from connect4.mcts import rollout
+from connect4.mcts import MCTSTree, rollout, rollout_state
+from connect4.board import GameState
 import numpy as np
 
 
@@ -8,3 +9,23 @@ def test_rollout_valid(empty_board_arr):
     for i in range(10):
         rollout(empty_board_arr, player, debug=True) # Perform 10 rollouts, will fail if any boards are not valid
 
+
+
+def test_rollout_leaves_state_unchanged(empty_board_arr):
+    """The in-place rollout must take back every move it plays."""
+    state = GameState.from_array(empty_board_arr, 1)
+    state.play(3)
+    for i in range(10):
+        rollout_state(state)
+        assert state.moves == [3]
+        assert np.count_nonzero(state.board) == 1
+        assert state.heights == [0, 0, 0, 1, 0, 0, 0]
+
+
+def test_mcts_step_rewinds_root_state(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, player=1, iterations=50)
+    for i in range(50):
+        tree.mcts_step()
+    assert tree.root_state.moves == []
+    assert not np.any(tree.root_state.board)
+    assert not np.any(empty_board_arr)
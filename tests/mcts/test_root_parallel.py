@@ -0,0 +1,70 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from connect4.mcts import MCTSTree
+from connect4.root_parallel import RootStatistics, root_parallel_search, root_statistics, search_tree
+import numpy as np
+
+X=1
+O=-1
+
+
+def test_root_statistics_indexed_by_column(empty_board_arr):
+    board_arr = empty_board_arr.copy()
+    board_arr[:, 2] = [O, X, O, X, O, X]
+    tree = MCTSTree(board_arr, player=X, iterations=50)
+    for _ in range(50):
+        tree.mcts_step()
+    stats = root_statistics(tree)
+    assert stats.visits[2] == 0 and stats.wins[2] == 0
+    assert stats.visits.sum() == 49
+    child = tree.children_map[(0, 4)]
+    assert stats.visits[4] == tree.nodes.visits[child]
+    assert np.isclose(stats.wins[4], tree.nodes.wins[child])
+
+
+def test_same_seed_same_tree(winning_board):
+    a = search_tree(winning_board, X, 60, seed=7)
+    b = search_tree(winning_board, X, 60, seed=7)
+    assert np.array_equal(a.visits, b.visits)
+    assert np.array_equal(a.wins, b.wins)
+
+
+def test_merge_and_best_move():
+    a = RootStatistics(np.array([2, 0, 0, 0, 0, 0, 1]), np.array([1.0, 0, 0, 0, 0, 0, 1.0]), 1)
+    b = RootStatistics(np.array([2, 0, 0, 0, 0, 0, 3]), np.array([2.0, 0, 0, 0, 0, 0, 1.0]), 1)
+    merged = a.merge(b)
+    assert merged.n_trees == 2
+    assert merged.visits.tolist() == [4, 0, 0, 0, 0, 0, 4]
+    # 3/4 beats 2/4, unvisited columns are never chosen
+    assert merged.best_move() == 0
+
+
+def test_merge_keeps_proofs():
+    visits = np.array([2, 0, 0, 0, 0, 0, 1])
+    a = RootStatistics(visits, np.array([2.0, 0, 0, 0, 0, 0, 0]), 1,
+                       np.array([-1, 0, 0, 0, 0, 0, 0], dtype=np.int8))
+    b = RootStatistics(visits, np.array([2.0, 0, 0, 0, 0, 0, 0]), 1,
+                       np.array([0, 0, 0, 0, 0, 0, 1], dtype=np.int8))
+    # The proven loss in column 0 is avoided despite its win rate
+    assert a.best_move() == 6
+    merged = a.merge(b)
+    assert merged.proven.tolist() == [-1, 0, 0, 0, 0, 0, 1]
+    assert merged.best_move() == 6
+    assert RootStatistics(visits, np.zeros(7), 1).merge(a).proven.tolist() == a.proven.tolist()
+
+
+def test_root_parallel_search_merges_trees(winning_board):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        stats = root_parallel_search(winning_board, player=X, iterations=80, n_trees=3,
+                                     seed=1, executor=executor)
+    assert stats.n_trees == 3
+    assert stats.visits.sum() == 3 * 79
+    assert stats.best_move() == 3
+    assert stats.proven[3] == 1
+
+
+def test_root_parallel_search_in_processes(winning_board):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        stats = root_parallel_search(winning_board, player=X, iterations=80, n_trees=2,
+                                     seed=3, executor=executor)
+    assert stats.visits.sum() == 2 * 79
+    assert stats.best_move() == 3
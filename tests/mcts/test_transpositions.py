@@ -0,0 +1,96 @@
+from connect4.mcts import MCTSTree
+from connect4.transposition import TranspositionTable
+from connect4.board import GameState
+import numpy as np
+
+
+def node_key(tree, node_idx):
+    """Position key of a node, replaying the actions along its parent chain."""
+    actions = []
+    while node_idx != 0:
+        actions.append(int(tree.nodes.action[node_idx]))
+        node_idx = tree.nodes.parent[node_idx]
+    state = GameState.from_array(tree.root_board, tree.player)
+    for col in reversed(actions):
+        state.play(col)
+    return state.key()
+
+
+def test_table_evicts_least_recently_used():
+    table = TranspositionTable(capacity=2)
+    table.put(10, 1)
+    table.put(20, 2)
+    assert table.get(10) == 1  # 10 is now the most recently used
+    table.put(30, 3)
+    assert 20 not in table
+    assert table.get(10) == 1 and table.get(30) == 3
+    assert table.evictions == 1
+    assert table.get(20) is None
+    assert (table.hits, table.misses) == (3, 1)
+
+
+def test_table_remap():
+    table = TranspositionTable()
+    table.put(10, 4)
+    table.put(20, 7)
+    table.remap(np.array([-1, -1, -1, -1, 0, -1, -1, 1]))
+    assert table.entries == {10: 0, 20: 1}
+
+
+def test_position_key_detects_transposition(empty_board_arr):
+    a = GameState.from_array(empty_board_arr)
+    b = GameState.from_array(empty_board_arr)
+    for col in [3, 2, 4]:
+        a.play(col)
+    for col in [4, 2, 3]:
+        b.play(col)
+    assert a.key() == b.key()
+    b.undo()
+    b.play(2)
+    assert a.key() != b.key()
+
+
+def test_transposed_positions_share_one_node(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, player=1, iterations=1500, transpositions=True)
+    for i in range(1500):
+        tree.mcts_step()
+
+    n = tree.node_count
+    aliases = np.flatnonzero(tree.nodes.alias[:n] >= 0)
+    holders = np.flatnonzero(tree.nodes.alias[:n] < 0)
+    assert len(aliases) > 0
+
+    # Every position has exactly one holder, and aliases point at their position
+    holder_keys = [node_key(tree, i) for i in holders]
+    assert len(set(holder_keys)) == len(holder_keys)
+    for i in aliases[:50]:
+        holder = tree.nodes.alias[i]
+        assert tree.nodes.alias[holder] == -1
+        assert node_key(tree, i) == node_key(tree, holder)
+        # Aliases never collect statistics of their own
+        assert tree.nodes.visits[i] == 0 and not tree.nodes.expanded[i]
+
+
+def test_transposition_table_is_bounded(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, player=1, iterations=300, transpositions=True,
+                    transposition_capacity=100)
+    for i in range(300):
+        tree.mcts_step()
+    assert len(tree.transpositions) == 100
+    assert tree.transpositions.evictions > 0
+
+
+def test_advance_keeps_valid_links(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, player=1, iterations=800, transpositions=True)
+    for i in range(800):
+        tree.mcts_step()
+    tree.advance(3)
+
+    n = tree.node_count
+    alias = tree.nodes.alias[:n]
+    assert np.all(alias < n)
+    for key, node_idx in tree.transpositions.entries.items():
+        assert node_idx < n
+        assert node_key(tree, node_idx) == key
+    for i in range(200):
+        tree.mcts_step()
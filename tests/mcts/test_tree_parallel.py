@@ -0,0 +1,102 @@
+from connect4.evaluator import ValueOnlyEvaluator
+from connect4.mcts import MCTSTree
+from connect4.node_store import SharedNodeStore
+from connect4.solver import Solver
+from connect4.tree_parallel import SharedMCTSTree, tree_parallel_search
+import multiprocessing
+import numpy as np
+import pytest
+
+X=1
+O=-1
+
+
+def _write_nodes(name, capacity, lock):
+    store = SharedNodeStore(capacity, name=name, lock=lock)
+    start = store.add_nodes(2)
+    store.visits[start:start + 2] = 7
+    store.close()
+
+
+def test_shared_store_visible_across_processes():
+    store = SharedNodeStore(16)
+    try:
+        store.add_nodes(1)
+        worker = multiprocessing.Process(target=_write_nodes, args=(store.name, 16, store.lock))
+        worker.start()
+        worker.join()
+        assert worker.exitcode == 0
+        assert store.size == 3
+        assert store.visits[:3].tolist() == [0, 7, 7]
+        assert store.parent[:3].tolist() == [-1, -1, -1]
+        private = store.to_node_store()
+    finally:
+        store.close()
+    assert private.size == 3 and private.visits[1] == 7
+
+
+def test_shared_store_is_fixed_size():
+    store = SharedNodeStore(4)
+    try:
+        store.add_nodes(4)
+        with pytest.raises(MemoryError):
+            store.add_nodes(1)
+    finally:
+        store.close()
+
+
+def test_shared_tree_matches_tree_updates(empty_board_arr):
+    store = SharedNodeStore(64)
+    try:
+        locks = [multiprocessing.Lock() for _ in range(4)]
+        shared = SharedMCTSTree(empty_board_arr, locks, player=O, nodes=store)
+        tree = MCTSTree(empty_board_arr, player=O)
+        for t in (shared, tree):
+            t.expand_node(0, empty_board_arr)
+            t.apply_virtual_loss([0, 2], 0.5)
+            t.revert_virtual_loss([0, 2], 0.5)
+            t.backpropagate([0, 2], 0.25, count=2)
+        n = tree.node_count
+        assert shared.node_count == n
+        assert np.array_equal(store.visits[:n], tree.nodes.visits[:n])
+        assert np.allclose(store.wins[:n], tree.nodes.wins[:n])
+        assert np.array_equal(store.first_child[:n], tree.nodes.first_child[:n])
+    finally:
+        store.close()
+
+
+def test_tree_parallel_search(winning_board):
+    tree = tree_parallel_search(winning_board, player=X, iterations=300, n_workers=3, seed=0)
+    assert tree.nodes.visits[0] == 300
+    children = tree.get_children(0)
+    assert len(children) == 7
+    # Only the iterations that stopped at the unexpanded root skip the children
+    assert 300 - 3 <= tree.nodes.visits[children].sum() < 300
+    n = tree.node_count
+    # Virtual losses are gone and no update was lost
+    assert np.all(tree.nodes.wins[:n] >= -1e-4)
+    assert np.all(tree.nodes.wins[:n] <= tree.nodes.visits[:n] + 1e-4)
+    assert tree.nodes.proven[0] == -1
+    assert tree.select_best_child() == 3
+
+
+def test_tree_parallel_search_uses_tree_kwargs(empty_board_arr, constant_scorer):
+    tree = tree_parallel_search(empty_board_arr, player=X, iterations=40, n_workers=2, seed=0,
+                                rollouts_per_leaf=4)
+    assert tree.nodes.visits[0] == 4 * 40
+
+    evaluator = ValueOnlyEvaluator(constant_scorer(0.25))
+    tree = tree_parallel_search(empty_board_arr, player=X, iterations=40, n_workers=2, seed=0,
+                                evaluator=evaluator)
+    # Every leaf scored 0.25 for X, the root holds O's wins
+    assert np.isclose(tree.nodes.wins[0], 0.75 * 40, atol=1e-3)
+
+
+def test_tree_parallel_search_proves_with_solver(lost_board):
+    tree = tree_parallel_search(lost_board, player=X, iterations=40, n_workers=2, seed=0,
+                                solver=Solver(), solver_threshold=42)
+    assert tree.nodes.proven[0] == 1
+    children = tree.get_children(0)
+    assert np.all(tree.nodes.proven[children] == -1)
+    # Solved leaves are not expanded
+    assert np.all(tree.nodes.n_children[children] == 0)
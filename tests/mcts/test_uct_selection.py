@@ -0,0 +1,46 @@
+from connect4.mcts import MCTSTree, argmax_random_tie, uct_score, uct_scores, N_VISITS_COL, WINS_COL
+import numpy as np
+import math
+
+
+def test_uct_scores_matches_uct_score():
+    node_data = np.zeros((5, 6))
+    node_data[:, N_VISITS_COL] = [0, 3, 10, 1, 7]
+    node_data[:, WINS_COL] = [0, 2, 4.5, 1, 0.5]
+    scores = uct_scores(node_data[:, WINS_COL], node_data[:, N_VISITS_COL], 21, math.sqrt(2))
+    expected = [uct_score(node_data, i, 21, math.sqrt(2)) for i in range(5)]
+    assert np.allclose(scores, expected)
+
+
+def test_argmax_random_tie_breaks_ties_randomly():
+    scores = np.array([1.0, 3.0, 3.0, 2.0])
+    picks = {argmax_random_tie(scores) for _ in range(100)}
+    assert picks == {1, 2}
+    assert argmax_random_tie(np.array([0.5, 4.0, 1.0])) == 1
+
+
+def test_expanded_children_are_contiguous(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, iterations=20)
+    for i in range(20):
+        tree.mcts_step()
+
+    for node_idx in range(tree.node_count):
+        children = tree.get_children(node_idx)
+        assert len(children) == tree.nodes.n_children[node_idx]
+        assert np.all(tree.node_data[children, 0] == node_idx)
+    assert tree.children_map[(0, 3)] == tree.nodes.first_child[0] + 3
+
+
+def test_select_leaf_follows_best_child(empty_board_arr):
+    tree = MCTSTree(empty_board_arr, iterations=10)
+    tree.expand_node(0, empty_board_arr)
+    children = tree.get_children(0)
+    tree.node_data[0, N_VISITS_COL] = 70
+    tree.node_data[children, N_VISITS_COL] = 10
+    tree.node_data[children, WINS_COL] = 5
+    tree.node_data[children[4], WINS_COL] = 9
+
+    leaf_node, leaf_board, path = tree.select_leaf(0, empty_board_arr)
+    assert leaf_node == children[4]
+    assert path == [0, children[4]]
+    assert leaf_board[5, 4] == 1
@@ -0,0 +1,152 @@
+from connect4.async_search import search_many
+from connect4.batched_search import BatchedSearch
+from connect4.evaluator import ValueOnlyEvaluator
+from connect4.mcts import MCTSTree
+from connect4.opening_book import OpeningBook, build_opening_book, opening_positions
+from connect4.root_parallel import root_parallel_search
+from connect4.self_play import SelfPlayWorker, play_game
+from connect4.solver import Solver
+from connect4.tree_parallel import tree_parallel_search
+import asyncio
+import numpy as np
+import pickle
+import random
+
+X=1
+O=-1
+
+
+def test_opening_positions_merge_mirrors(empty_board_arr):
+    positions = opening_positions(empty_board_arr, X, depth=1)
+    # The empty board, then columns 0-3, each shared with its mirror image
+    assert len(positions) == 5
+    assert [state.n_pieces for state in positions] == [0, 1, 1, 1, 1]
+    assert len({state.canonical_hash() for state in positions}) == 5
+
+
+def test_solver_book_matches_solver(tmp_path, random_state):
+    root = random_state(34, random.Random(1))
+    solver = Solver()
+    n = build_opening_book(tmp_path, depth=2, solver=solver, root_board=root.board,
+                           player=root.player)
+    book = OpeningBook(tmp_path)
+    assert len(book) == n
+    assert np.all(np.diff(book.hashes.astype(np.float64)) >= 0)
+    for state in opening_positions(root.board, root.player, depth=2):
+        entry = book.lookup(state)
+        _, result = solver.best_move(state)
+        assert entry.value == (result.outcome * state.player + 1) / 2
+        # The book move keeps the exact value
+        child = state.copy()
+        child.play(entry.move)
+        if not child.is_terminal:
+            assert -solver.solve(child).score == result.score
+
+
+def test_lookup_mirrors_moves(tmp_path, empty_board_arr):
+    build_opening_book(tmp_path, depth=2, iterations=30, root_board=empty_board_arr, player=X)
+    book = OpeningBook(tmp_path)
+    board_arr = empty_board_arr.copy()
+    board_arr[5, 1] = X
+    board_arr[5, 3] = O
+    entry = book.lookup(board_arr, X)
+    mirrored = book.lookup(board_arr[:, ::-1], X)
+    assert entry is not None
+    assert mirrored.move == 6 - entry.move
+    assert mirrored.value == entry.value
+
+
+def test_lookup_misses(tmp_path, empty_board_arr):
+    build_opening_book(tmp_path, depth=1, iterations=10, root_board=empty_board_arr, player=X)
+    book = OpeningBook(tmp_path)
+    assert empty_board_arr in book
+    # Deeper than the book
+    board_arr = empty_board_arr.copy()
+    board_arr[5, 0] = X
+    board_arr[5, 1] = O
+    assert book.lookup(board_arr, X) is None
+    assert book.lookup(board_arr[:, ::-1], X) is None
+
+
+def test_play_game_uses_book(tmp_path, empty_board_arr):
+    build_opening_book(tmp_path, depth=1, iterations=10, root_board=empty_board_arr, player=X)
+    book = OpeningBook(tmp_path)
+    game = play_game(iterations=10, rng=np.random.default_rng(0), book=book)
+    first = book.lookup(empty_board_arr, X)
+    assert game.policies[0].tolist() == np.eye(7)[first.move].tolist()
+    assert game.values[0] == first.value
+    assert game.boards[1][5, first.move] == X
+    # Both first moves come from the book, the third is searched
+    assert game.policies[1].max() == 1
+    assert game.policies[2].max() < 1
+
+
+def test_tree_answers_from_book(tmp_path, empty_board_arr):
+    build_opening_book(tmp_path, depth=1, iterations=10, root_board=empty_board_arr, player=X)
+    book = pickle.loads(pickle.dumps(OpeningBook(tmp_path)))
+    first = book.lookup(empty_board_arr, X)
+    tree = MCTSTree(empty_board_arr, player=X, iterations=10, book=book)
+    assert tree.book_entry() == first
+    # Unsearched, the tree plays the book move
+    assert tree.select_best_child() == first.move
+    tree.advance(first.move)
+    tree.advance(0)
+    assert tree.book_entry() is None
+    for _ in range(10):
+        tree.mcts_step()
+    assert tree.select_best_child() in range(7)
+
+
+def test_exploration_moves_come_before_book(tmp_path, empty_board_arr):
+    build_opening_book(tmp_path, depth=2, iterations=10, root_board=empty_board_arr, player=X)
+    book = OpeningBook(tmp_path)
+    game = play_game(iterations=20, exploration_moves=1, rng=np.random.default_rng(0), book=book)
+    # The first move is sampled from a search, the next two are in the book
+    assert game.policies[0].max() < 1
+    assert game.policies[1].max() == 1 and game.policies[2].max() == 1
+    assert game.policies[3].max() < 1
+
+
+def test_worker_loads_book(tmp_path, empty_board_arr):
+    build_opening_book(tmp_path, depth=1, iterations=10, root_board=empty_board_arr, player=X)
+    worker = SelfPlayWorker(iterations=10, seed=0, book_path=str(tmp_path))
+    game, = worker.play(1)
+    first = worker.book.lookup(empty_board_arr, X)
+    assert game.policies[0].tolist() == np.eye(7)[first.move].tolist()
+
+
+class FailingScorer:
+    def score(self, boards):
+        raise AssertionError("book positions must not be searched")
+
+
+def test_drivers_skip_book_positions(tmp_path, empty_board_arr):
+    build_opening_book(tmp_path, depth=0, iterations=10, root_board=empty_board_arr, player=X)
+    book = OpeningBook(tmp_path)
+    move = book.lookup(empty_board_arr, X).move
+    evaluator = ValueOnlyEvaluator(FailingScorer())
+
+    tree = MCTSTree(empty_board_arr, player=X, iterations=32, book=book)
+    BatchedSearch(tree, evaluator, batch_size=8).run(32)
+    assert tree.nodes.visits[0] == 0 and tree.select_best_child() == move
+
+    tree = MCTSTree(empty_board_arr, player=X, iterations=32, book=book)
+    server = asyncio.run(search_many([tree], evaluator, 32))
+    assert server.n_requests == 0 and tree.select_best_child() == move
+
+    stats = root_parallel_search(empty_board_arr, player=X, iterations=32, n_trees=2, book=book)
+    assert stats.n_trees == 0 and stats.best_move() == move
+
+    tree = tree_parallel_search(empty_board_arr, player=X, iterations=32, n_workers=2, book=book)
+    assert tree.nodes.visits[0] == 0 and tree.select_best_child() == move
+
+
+def test_proven_win_beats_book(tmp_path, empty_board_arr):
+    build_opening_book(tmp_path, depth=0, iterations=10, root_board=empty_board_arr, player=X)
+    book = OpeningBook(tmp_path)
+    move = book.lookup(empty_board_arr, X).move
+    tree = MCTSTree(empty_board_arr, player=X, iterations=10, book=book)
+    tree.expand_node(0, empty_board_arr)
+    other = (move + 1) % 7
+    tree.nodes.proven[tree.children_map[(0, other)]] = 1
+    assert tree.select_best_child() == other
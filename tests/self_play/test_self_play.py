@@ -0,0 +1,165 @@
+from connect4.evaluator import ValueOnlyEvaluator
+from connect4.self_play import GameCollector, SelfPlayPool, SelfPlayWorker, play_game
+import functools
+import numpy as np
+import pytest
+import sys
+import types
+
+
+def constant_evaluator(scorer_cls, weights):
+    return ValueOnlyEvaluator(scorer_cls(weights["value"]))
+
+
+@pytest.fixture
+def evaluator_factory(constant_scorer):
+    # Module-level function and class, so process workers can unpickle it
+    return functools.partial(constant_evaluator, constant_scorer)
+
+
+def check_game(game):
+    n_moves = len(game.boards)
+    assert game.boards.dtype == np.int8
+    assert game.policies.shape == (n_moves, 7)
+    assert np.allclose(game.policies.sum(axis=1), 1)
+    assert np.all((game.values >= 0) & (game.values <= 1))
+    # Players alternate, starting with player 1, and each board has one more piece
+    assert game.players.tolist() == [1 if i % 2 == 0 else -1 for i in range(n_moves)]
+    assert np.count_nonzero(game.boards, axis=(1, 2)).tolist() == list(range(n_moves))
+    assert game.result in (-1, 0, 1)
+    if game.result != 0:
+        assert game.players[-1] == game.result
+
+
+def test_play_game():
+    game = play_game(iterations=20, exploration_moves=4, rng=np.random.default_rng(0))
+    check_game(game)
+    assert game.weights_version == 0
+
+
+def test_worker_streams_to_collector():
+    collector = GameCollector()
+    worker = SelfPlayWorker(iterations=10, seed=0)
+    assert worker.play(2, collector) == 2
+    assert collector.count() == 2
+    assert collector.n_positions == sum(len(game.boards) for game in collector.games)
+    games = collector.drain()
+    assert len(games) == 2 and collector.count() == 0
+
+
+def test_worker_set_weights(evaluator_factory):
+    worker = SelfPlayWorker(evaluator_factory=evaluator_factory, iterations=10, seed=0,
+                            tree_kwargs=dict(selection="puct"))
+    worker.set_weights({"value": 0.5}, version=3)
+    game, = worker.play(1)
+    check_game(game)
+    assert game.weights_version == 3
+
+
+def test_process_pool_backend(evaluator_factory):
+    with SelfPlayPool(n_workers=2, backend="process", evaluator_factory=evaluator_factory,
+                      iterations=10, seed=0) as pool:
+        games = pool.generate(3)
+        assert len(games) == 3 and all(game.weights_version == 0 for game in games)
+        assert pool.broadcast_weights({"value": 0.5}) == 1
+        games = pool.generate(2)
+    assert len(games) == 2
+    for game in games:
+        check_game(game)
+        assert game.weights_version == 1
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        SelfPlayPool(backend="threads")
+
+
+def test_ray_local_mode(evaluator_factory):
+    ray = pytest.importorskip("ray")
+    ray.init(local_mode=True, include_dashboard=False, ignore_reinit_error=True)
+    try:
+        with SelfPlayPool(n_workers=2, backend="auto", evaluator_factory=evaluator_factory,
+                          iterations=10, seed=0) as pool:
+            assert pool.backend == "ray"
+            pool.broadcast_weights({"value": 0.5})
+            games = pool.generate(3)
+        assert len(games) == 3
+        for game in games:
+            check_game(game)
+            assert game.weights_version == 1
+    finally:
+        ray.shutdown()
+
+
+class FakeRef:
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeActor:
+    """Runs every method call eagerly, in process, and returns a FakeRef."""
+
+    def __init__(self, instance, calls):
+        self.instance = instance
+        self.calls = calls
+        self.killed = False
+
+    def __getattr__(self, name):
+        method = getattr(self.instance, name)
+
+        def remote(*args, **kwargs):
+            assert not self.killed
+            self.calls.append(name)
+            # Like Ray, top-level object refs are resolved before the call
+            args = [arg.value if isinstance(arg, FakeRef) else arg for arg in args]
+            return FakeRef(method(*args, **kwargs))
+        return types.SimpleNamespace(remote=remote)
+
+
+@pytest.fixture
+def fake_ray(monkeypatch):
+    """A stand-in 'ray' module covering the calls made by SelfPlayPool."""
+    ray = types.ModuleType("ray")
+    ray.calls, ray.actors, ray.n_puts = [], [], 0
+
+    def remote(cls):
+        def create(*args, **kwargs):
+            actor = FakeActor(cls(*args, **kwargs), ray.calls)
+            ray.actors.append(actor)
+            return actor
+        return types.SimpleNamespace(remote=create)
+
+    def put(value):
+        ray.n_puts += 1
+        return FakeRef(value)
+
+    def get(refs):
+        if isinstance(refs, list):
+            return [ref.value for ref in refs]
+        return refs.value
+
+    def kill(actor):
+        actor.killed = True
+
+    ray.remote, ray.put, ray.get, ray.kill = remote, put, get, kill
+    ray.is_initialized = lambda: True
+    monkeypatch.setitem(sys.modules, "ray", ray)
+    return ray
+
+
+def test_ray_backend_with_stub(fake_ray, evaluator_factory):
+    with SelfPlayPool(n_workers=2, backend="auto", evaluator_factory=evaluator_factory,
+                      iterations=10, seed=0) as pool:
+        assert pool.backend == "ray"
+        assert pool.broadcast_weights({"value": 0.5}) == 1
+        # One object store copy of the weights for all workers
+        assert fake_ray.n_puts == 1
+        games = pool.generate(3)
+        assert pool.collector.instance.count() == 0
+    assert len(games) == 3
+    for game in games:
+        check_game(game)
+        assert game.weights_version == 1
+    # Every game was streamed to the collector actor, then drained once
+    assert fake_ray.calls.count("add") == 3 and fake_ray.calls.count("drain") == 1
+    assert all(actor.killed for actor in fake_ray.actors)
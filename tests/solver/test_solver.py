@@ -0,0 +1,119 @@
+from connect4.batched_search import BatchedSearch
+from connect4.evaluator import ValueOnlyEvaluator
+from connect4.mcts import MCTSTree
+from connect4.solver import Solver, SolveResult
+import numpy as np
+import random
+import pytest
+
+X=1
+O=-1
+
+
+def brute_force(state):
+    """Plain negamax over every move order, returns (score, distance)."""
+    best = None
+    for col in state.legal_moves():
+        state.play(col)
+        if state.is_terminal:
+            if state.result == 0:
+                result = (0, 1)
+            else:
+                result = ((43 - state.n_pieces + 1) // 2, 1)
+        else:
+            score, distance = brute_force(state)
+            result = (-score, distance + 1)
+        state.undo()
+        # Higher scores first, then win fast, lose slowly
+        if best is None or (result[0], -result[1] if result[0] > 0 else result[1]) > \
+                (best[0], -best[1] if best[0] > 0 else best[1]):
+            best = result
+    return best
+
+
+def test_matches_brute_force_on_endgames(random_state):
+    rng = random.Random(0)
+    solver = Solver()
+    for _ in range(30):
+        state = random_state(rng.choice([34, 35, 36]), rng)
+        score, distance = brute_force(state)
+        result = solver.solve(state)
+        assert result.score == score
+        assert result.outcome == np.sign(score)
+        if score == 0:
+            assert result.distance == 42 - state.n_pieces
+        else:
+            assert result.distance == distance
+
+
+def test_immediate_win_and_forced_loss(winning_board):
+    solver = Solver()
+    assert solver.solve(winning_board, X) == SolveResult(1, 18, 1)
+    col, result = solver.best_move(winning_board, X)
+    assert col == 3 and result.distance == 1
+
+    # O to move cannot block both ends of an open three
+    board_arr = np.zeros((6, 7), dtype=int)
+    board_arr[5, 2:5] = X
+    board_arr[4, 2:4] = O
+    result = solver.solve(board_arr, O)
+    assert result.outcome == -1 and result.distance == 2
+
+
+def test_terminal_positions():
+    board_arr = np.zeros((6, 7), dtype=int)
+    board_arr[5, 0:4] = X
+    board_arr[4, 0:3] = O
+    assert Solver().solve(board_arr, O) == SolveResult(-1, -18, 0)
+    with pytest.raises(ValueError):
+        Solver().best_move(board_arr, O)
+
+
+def test_state_is_left_unchanged(random_state):
+    state = random_state(28, random.Random(3))
+    board_before = state.board.copy()
+    Solver().best_move(state)
+    assert np.array_equal(state.board, board_before)
+
+
+def test_tree_solves_endgame_leaves(random_state):
+    rng = random.Random(5)
+    solver = Solver()
+    while True:
+        state = random_state(30, rng)
+        result = solver.solve(state)
+        if result.outcome == 1 and result.distance > 1:
+            break
+    tree = MCTSTree(state.board, player=state.player, iterations=20, solver=solver,
+                    solver_threshold=12)
+    for _ in range(1 + len(state.legal_moves())):
+        tree.mcts_step()
+    # Leaves were solved, so every visited child holds its exact value. Once
+    # a winning child proves the root, it gets all further visits
+    children = tree.get_children(0)
+    assert np.all(tree.nodes.visits[children] > 0) or np.any(tree.nodes.proven[children] == 1)
+    for child in children[tree.nodes.visits[children] > 0]:
+        # Solved leaves are not expanded
+        assert tree.nodes.n_children[child] == 0
+        state.play(int(tree.nodes.action[child]))
+        child_result = solver.solve(state)
+        state.undo()
+        assert np.isclose(tree.nodes.wins[child] / tree.nodes.visits[child],
+                          (1 - child_result.outcome) / 2)
+    col = tree.select_best_child()
+    state.play(col)
+    assert solver.solve(state).outcome == -1
+    state.undo()
+
+
+def test_batched_search_skips_evaluator_on_solved_leaves(random_state):
+    class FailingScorer:
+        def score(self, boards):
+            raise AssertionError("solved leaves must not reach the evaluator")
+
+    state = random_state(32, random.Random(1))
+    tree = MCTSTree(state.board, player=state.player, iterations=50, solver=Solver(),
+                    solver_threshold=10)
+    BatchedSearch(tree, ValueOnlyEvaluator(FailingScorer()), batch_size=8).run(50)
+    assert tree.nodes.visits[0] == 50
+    assert tree.solved_value(np.zeros((6, 7), dtype=int)) is None